@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timezone
 from typing import Protocol
 
@@ -6,7 +7,15 @@ class Clock(Protocol):
     def utc_now(self) -> datetime:
         ...
 
+    def perf_counter_ns(self) -> int:
+        """A monotonic clock in nanoseconds for measuring durations.
+        Only differences between two values are meaningful.
+        """
+
 
 class SystemClock:
     def utc_now(self) -> datetime:
         return datetime.now(tz=timezone.utc)
+
+    def perf_counter_ns(self) -> int:
+        return time.perf_counter_ns()
@@ -1,19 +1,37 @@
 from __future__ import annotations
 
+import atexit
 from logging import getLogger
-from typing import Any, Dict, Optional, Protocol, Type
+from typing import Any, Dict, List, Optional, Protocol, Type
 
 from flask import Flask, g
 
 from .database import Database
 from .entities import measurement_archive
 from .fallback_storage import MeasurementArchivistPlaceholder
-from .sqlite import Sqlite
+from .result_cache import ResultCache, ResultCacheSettings
+from .retention import PruningArchivist, RetentionJob, parse_retention
+from .sampling import SamplingPolicy, parse_sampling
+from .sqlite import ConnectionPool, Sqlite
+from .sqlite.partitions import Partitioning
+from .sqlite.tuning import parse_tuning
+from .write_behind import BatchArchivist, WriteBehindQueue, WriteBehindSettings
 
 logger = getLogger(__name__)
 
+WRITE_BEHIND_EXTENSION = "flask_profiler_write_behind"
+RETENTION_EXTENSION = "flask_profiler_retention"
+CONNECTION_POOL_EXTENSION = "flask_profiler_connection_pool"
+RESULT_CACHE_EXTENSION = "flask_profiler_result_cache"
 
-class MeasurementDatabase(measurement_archive.MeasurementArchivist, Database, Protocol):
+
+class MeasurementDatabase(
+    measurement_archive.MeasurementArchivist,
+    BatchArchivist,
+    PruningArchivist,
+    Database,
+    Protocol,
+):
     ...
 
 
@@ -21,12 +39,25 @@ class DeferredArchivist:
     def __init__(self, configuration: Configuration) -> None:
         self.configuration = configuration
 
-    def record_measurement(self, measurement: measurement_archive.Measurement) -> int:
+    def record_measurement(
+        self, measurement: measurement_archive.Measurement
+    ) -> Optional[int]:
+        if retention := self.configuration.retention_job:
+            retention.ensure_running()
+        if write_behind := self.configuration.write_behind_queue:
+            write_behind.record_measurement(measurement)
+            return None
         return self.configuration.collection.record_measurement(measurement)
 
     def get_records(self) -> measurement_archive.RecordedMeasurements:
         return self.configuration.collection.get_records()
 
+    def get_route_catalog(self) -> List[measurement_archive.RouteCatalogEntry]:
+        return self.configuration.collection.get_route_catalog()
+
+    def data_version(self) -> int:
+        return self.configuration.collection.data_version()
+
 
 class Configuration:
     def __init__(self, app: Flask) -> None:
@@ -60,12 +91,91 @@ class Configuration:
     def basic_auth_password(self) -> str:
         return self.read_config()["basicAuth"]["password"]
 
+    @property
+    def sampling(self) -> SamplingPolicy:
+        return parse_sampling(self.read_config().get("sampling"))
+
+    @property
+    def count_limit(self) -> Optional[int]:
+        return self.read_config().get("count_limit")
+
     @property
     def collection(self) -> MeasurementDatabase:
         if "flask_profiler_collection" not in g:
             g.flask_profiler_collection = self._create_storage()
         return g.flask_profiler_collection
 
+    @property
+    def connection_pool(self) -> ConnectionPool:
+        if CONNECTION_POOL_EXTENSION not in self.app.extensions:
+            conf = self.read_config().get("storage", {})
+            query_time_budget_ms = conf.get("query_time_budget_ms")
+            self.app.extensions.setdefault(
+                CONNECTION_POOL_EXTENSION,
+                ConnectionPool(
+                    sqlite_file=conf.get("FILE", "flask_profiler.sql"),
+                    max_idle_readers=conf.get("max_idle_readers", 4),
+                    tuning=parse_tuning(conf.get("tuning")),
+                    reader_time_budget=None
+                    if query_time_budget_ms is None
+                    else query_time_budget_ms / 1000,
+                ),
+            )
+        return self.app.extensions[CONNECTION_POOL_EXTENSION]
+
+    @property
+    def result_cache(self) -> Optional[ResultCache]:
+        conf = self.read_config().get("result_cache", {})
+        if not conf.get("enabled", False):
+            return None
+        if RESULT_CACHE_EXTENSION not in self.app.extensions:
+            self.app.extensions.setdefault(
+                RESULT_CACHE_EXTENSION,
+                ResultCache(
+                    ResultCacheSettings(
+                        max_entries=conf.get("max_entries", 128),
+                        ttl_secs=conf.get("ttl_secs", 10),
+                    )
+                ),
+            )
+        return self.app.extensions[RESULT_CACHE_EXTENSION]
+
+    @property
+    def write_behind_queue(self) -> Optional[WriteBehindQueue]:
+        return self.app.extensions.get(WRITE_BEHIND_EXTENSION)
+
+    def setup_write_behind(self) -> None:
+        conf = self.read_config().get("storage", {}).get("write_behind", {})
+        if not conf.get("enabled", False):
+            return
+        write_behind = WriteBehindQueue(
+            archivist_factory=self._create_storage,
+            settings=WriteBehindSettings(
+                batch_size=conf.get("batch_size", 500),
+                flush_interval_secs=conf.get("flush_interval_ms", 1000) / 1000,
+                max_queue_size=conf.get("max_queue_size", 10000),
+            ),
+        )
+        self.app.extensions[WRITE_BEHIND_EXTENSION] = write_behind
+        atexit.register(write_behind.stop)
+
+    @property
+    def retention_job(self) -> Optional[RetentionJob]:
+        return self.app.extensions.get(RETENTION_EXTENSION)
+
+    def setup_retention(self) -> None:
+        settings = parse_retention(
+            self.read_config().get("storage", {}).get("retention")
+        )
+        if not settings.is_enabled:
+            return
+        retention = RetentionJob(
+            archivist_factory=self._create_storage,
+            settings=settings,
+        )
+        self.app.extensions[RETENTION_EXTENSION] = retention
+        atexit.register(retention.stop)
+
     @classmethod
     def cleanup_appcontext(
         cls: Type[Configuration], exception: Optional[BaseException]
@@ -81,8 +191,13 @@ class Configuration:
         storage: MeasurementDatabase
         conf = self.read_config().get("storage", {})
         try:
+            partition_days = conf.get("partition_days")
             storage = Sqlite(
                 sqlite_file=conf.get("FILE", "flask_profiler.sql"),
+                pool=self.connection_pool,
+                partitioning=None
+                if partition_days is None
+                else Partitioning(days=partition_days),
             )
         except Exception as e:
             logger.error("Failed to initialize measurement storage")
@@ -23,6 +23,8 @@ class GetDetailsController:
             requested_before=form_data.requested_before,
             name_filter=form_data.name,
             method_filter=form_data.method,
+            after=self.pagination_context.after,
+            before=self.pagination_context.before,
         )
 
     @property
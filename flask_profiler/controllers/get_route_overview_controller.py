@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import timedelta
 
 from flask_profiler.clock import Clock
 from flask_profiler.request import HttpRequest
@@ -16,10 +15,28 @@ class GetRouteOverviewController:
     def handle_request(self) -> uc.Request:
         route_name = self.http_request.path_arguments()["route_name"]
         assert isinstance(route_name, str)
-        end_timestamp = self.clock.utc_now() + timedelta(days=1)
+        arguments = self.http_request.get_arguments()
+        interval = _INTERVALS.get(arguments.get("interval", ""), uc.Interval.daily)
+        statistic = _STATISTICS.get(
+            arguments.get("statistic", ""), uc.Statistic.average
+        )
+        # The end of the current interval stays the same for the whole
+        # interval, so repeated requests can be answered from the cache.
+        end_timestamp = interval.truncate(self.clock.utc_now()) + interval.length
         return uc.Request(
             route_name=route_name,
-            interval=uc.Interval.daily,
+            interval=interval,
             start_time=None,
             end_time=end_timestamp,
+            statistic=statistic,
         )
+
+
+_INTERVALS = {
+    "minute": uc.Interval.minutely,
+    "hour": uc.Interval.hourly,
+    "day": uc.Interval.daily,
+    "week": uc.Interval.weekly,
+}
+
+_STATISTICS = {statistic.name: statistic for statistic in uc.Statistic}
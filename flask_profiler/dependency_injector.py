@@ -4,7 +4,6 @@ from typing import Optional
 
 from flask import Flask, current_app
 
-from .calendar import Calendar
 from .clock import SystemClock
 from .configuration import Configuration, DeferredArchivist
 from .controllers.get_details_controller import GetDetailsController
@@ -14,6 +13,7 @@ from .measured_route import MeasuredRouteFactory
 from .presenters.get_details_presenter import GetDetailsPresenter
 from .presenters.get_route_overview_presenter import GetRouteOverviewPresenter
 from .presenters.get_summary_presenter import GetSummaryPresenter
+from .presenters.json_presenter import JsonPresenter
 from .request import WrappedRequest
 from .use_cases.get_details_use_case import GetDetailsUseCase
 from .use_cases.get_route_overview import GetRouteOverviewUseCase
@@ -21,6 +21,7 @@ from .use_cases.get_summary_use_case import GetSummaryUseCase
 from .views.get_details_view import GetDetailsView
 from .views.get_route_overview_view import GetRouteOverviewView
 from .views.get_summary_view import GetSummaryView
+from .views.json_view import JsonView
 
 
 class DependencyInjector:
@@ -38,7 +39,11 @@ class DependencyInjector:
         return Configuration(self.app)
 
     def get_summary_use_case(self) -> GetSummaryUseCase:
-        return GetSummaryUseCase(archivist=self.get_measurement_archivist())
+        return GetSummaryUseCase(
+            archivist=self.get_measurement_archivist(),
+            count_limit=self.get_configuration().count_limit,
+            cache=self.get_configuration().result_cache,
+        )
 
     def get_summary_controller(self) -> GetSummaryController:
         return GetSummaryController(
@@ -59,7 +64,11 @@ class DependencyInjector:
         )
 
     def get_details_use_case(self) -> GetDetailsUseCase:
-        return GetDetailsUseCase(archivist=self.get_measurement_archivist())
+        return GetDetailsUseCase(
+            archivist=self.get_measurement_archivist(),
+            count_limit=self.get_configuration().count_limit,
+            cache=self.get_configuration().result_cache,
+        )
 
     def get_details_presenter(self) -> GetDetailsPresenter:
         return GetDetailsPresenter(
@@ -77,12 +86,13 @@ class DependencyInjector:
             clock=self.get_clock(),
             config=self.get_configuration(),
             archivist=self.get_measurement_archivist(),
+            sampler=self.get_configuration().sampling,
         )
 
     def get_route_overview_use_case(self) -> GetRouteOverviewUseCase:
         return GetRouteOverviewUseCase(
             archivist=self.get_measurement_archivist(),
-            calendar=self.get_calendar(),
+            cache=self.get_configuration().result_cache,
         )
 
     def get_route_overview_controller(self) -> GetRouteOverviewController:
@@ -94,11 +104,16 @@ class DependencyInjector:
     def get_route_overview_presenter(self) -> GetRouteOverviewPresenter:
         return GetRouteOverviewPresenter()
 
-    def get_calendar(self) -> Calendar:
-        return Calendar()
-
     def get_route_overview_view(self) -> GetRouteOverviewView:
         return GetRouteOverviewView()
 
+    def get_json_presenter(self) -> JsonPresenter:
+        return JsonPresenter(
+            http_request=self.get_http_request(),
+        )
+
+    def get_json_view(self) -> JsonView:
+        return JsonView()
+
     def get_http_request(self) -> WrappedRequest:
         return WrappedRequest()
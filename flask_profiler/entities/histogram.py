@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional
+
+BUCKETS_PER_DOUBLING = 8
+# Values are clamped to the range of roughly 1 microsecond to 12 days.
+MIN_INDEX = -20 * BUCKETS_PER_DOUBLING
+MAX_INDEX = 20 * BUCKETS_PER_DOUBLING
+
+
+@dataclass
+class Histogram:
+    """Counts of durations in logarithmic buckets.  Every power of two
+    is split into BUCKETS_PER_DOUBLING buckets, so percentiles are
+    off by at most 5%.  Histograms of disjoint sets of measurements
+    are merged by adding up their counts.
+    """
+
+    counts: Dict[int, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_values(cls, values: Iterable[float]) -> Histogram:
+        histogram = cls()
+        for value in values:
+            histogram.add(value)
+        return histogram
+
+    @staticmethod
+    def bucket_index(value: float) -> int:
+        if value <= 0:
+            return MIN_INDEX
+        index = math.floor(math.log2(value) * BUCKETS_PER_DOUBLING)
+        return min(max(index, MIN_INDEX), MAX_INDEX)
+
+    @staticmethod
+    def bucket_value(index: int) -> float:
+        """The geometric center of the bucket."""
+        return 2 ** ((index + 0.5) / BUCKETS_PER_DOUBLING)
+
+    @property
+    def total(self) -> float:
+        return sum(self.counts.values())
+
+    def add(self, value: float, count: float = 1) -> None:
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other: Histogram) -> Histogram:
+        counts = dict(self.counts)
+        for index, count in other.counts.items():
+            counts[index] = counts.get(index, 0) + count
+        return Histogram(counts=counts)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Estimate the p-th percentile, p ranging from 0 to 100.
+        Returns None if the histogram is empty.
+        """
+        total = self.total
+        if not total:
+            return None
+        rank = total * p / 100
+        seen: float = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.counts))
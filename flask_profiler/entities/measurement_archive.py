@@ -1,29 +1,88 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Generic, Iterator, List, Optional, Protocol, TypeVar
+from datetime import datetime, timedelta
+from typing import Generic, Iterator, List, Optional, Protocol, Sequence, TypeVar
 
 from typing_extensions import Self
 
+from .histogram import Histogram
+
 FiledDataT = TypeVar("FiledDataT", bound="FiledData")
 T = TypeVar("T", covariant=True)
 
+NANOSECONDS_PER_SECOND = 1_000_000_000
+
 
 class MeasurementArchivist(Protocol):
-    def record_measurement(self, measurement: Measurement) -> int:
-        ...
+    def record_measurement(self, measurement: Measurement) -> Optional[int]:
+        """Returns the ID of the stored measurement or None if the
+        measurement was queued to be stored later.
+        """
 
     def get_records(self) -> RecordedMeasurements:
         ...
 
+    def get_route_catalog(self) -> List[RouteCatalogEntry]:
+        """One entry for every route and method with stored
+        measurements.
+        """
+
+    def data_version(self) -> int:
+        """A number that increases whenever measurements are stored or
+        deleted, unless all stored measurements have
+        changes_data_version unset.
+        """
+
 
 @dataclass
 class Measurement:
+    """A sampled measurement stands for weight requests.  elapsed_ns
+    is measured with a monotonic clock and is therefore independent
+    of changes to the wall clock time.  Storing a measurement with
+    changes_data_version unset leaves the data version as it is.
+    """
+
     route_name: str
     start_timestamp: datetime
-    end_timestamp: datetime
+    elapsed_ns: int
     method: str
+    weight: float = 1
+    changes_data_version: bool = True
+
+    @property
+    def elapsed(self) -> float:
+        return self.elapsed_ns / NANOSECONDS_PER_SECOND
+
+    @property
+    def end_timestamp(self) -> datetime:
+        return self.start_timestamp + timedelta(microseconds=self.elapsed_ns / 1000)
+
+
+@dataclass
+class RouteCatalogEntry:
+    """Totals of all stored measurements of one route and method.
+    total_count and total_elapsed are weighted by the sampling weight
+    of each measurement, total_elapsed is given in seconds.
+    """
+
+    name: str
+    method: str
+    first_seen: datetime
+    last_seen: datetime
+    total_count: float
+    total_elapsed: float
+
+
+@dataclass(frozen=True)
+class CountedItems(Generic[T]):
+    """Items of one page together with the number of items on all
+    pages.  If is_capped is set, total_count is a lower bound.
+    """
+
+    items: Sequence[T]
+    total_count: int
+    is_capped: bool = False
 
 
 class FiledData(Protocol, Generic[T]):
@@ -42,18 +101,29 @@ class FiledData(Protocol, Generic[T]):
     def __len__(self) -> int:
         ...
 
+    def counted(self, cap: Optional[int] = ...) -> CountedItems[T]:
+        """Fetch the items and count the items regardless of limit and
+        offset at the same time.  If cap is given, counting stops
+        after cap items.
+        """
+
 
 @dataclass
 class Record:
     id: int
     name: str
     start_timestamp: datetime
-    end_timestamp: datetime
+    elapsed_ns: int
     method: str
+    weight: float = 1
 
     @property
     def elapsed(self) -> float:
-        return self.end_timestamp.timestamp() - self.start_timestamp.timestamp()
+        return self.elapsed_ns / NANOSECONDS_PER_SECOND
+
+    @property
+    def end_timestamp(self) -> datetime:
+        return self.start_timestamp + timedelta(microseconds=self.elapsed_ns / 1000)
 
 
 class RecordedMeasurements(FiledData[Record], Protocol):
@@ -61,12 +131,12 @@ class RecordedMeasurements(FiledData[Record], Protocol):
         ...
 
     def summarize_by_interval(
-        self, timestamps: List[datetime]
+        self, since: datetime, until: datetime, interval_length: timedelta
     ) -> SummarizedMeasurements:
-        """The provided timestamp list must have at least 2 entries
-        marking the start and the end of the requested time intervals
-        that will be summarized.  The supplied list is assumed to be
-        ordered ascendingly.
+        """Summarize the measurements started in [since, until) separately
+        for consecutive intervals of interval_length beginning at
+        since.  Summaries are ordered by their interval and carry its
+        index.
         """
 
     def with_method(self, method: str) -> RecordedMeasurements:
@@ -87,12 +157,28 @@ class RecordedMeasurements(FiledData[Record], Protocol):
     def with_id(self, id_: int) -> RecordedMeasurements:
         ...
 
+    def preceding(self, start_timestamp: datetime, id_: int) -> RecordedMeasurements:
+        """Records that come before a record with the given start time
+        and ID when ordered by start time and ID.  No such record needs
+        to exist.
+        """
+
+    def following(self, start_timestamp: datetime, id_: int) -> RecordedMeasurements:
+        """Records that come after a record with the given start time
+        and ID when ordered by start time and ID.  No such record needs
+        to exist.
+        """
+
     def ordered_by_start_time(self, ascending: bool = ...) -> RecordedMeasurements:
-        ...
+        """Order by start time, ties are broken by ID."""
 
 
 @dataclass
 class Summary:
+    """interval_index is only given for summaries by interval, it counts
+    the intervals from the start of the summarized time window.
+    """
+
     method: str
     name: str
     count: int
@@ -101,6 +187,15 @@ class Summary:
     avg_elapsed: float
     first_measurement: datetime
     last_measurement: datetime
+    histogram: Histogram
+    interval_index: Optional[int] = None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Estimate the p-th percentile of the elapsed time."""
+        value = self.histogram.percentile(p)
+        if value is None:
+            return None
+        return min(max(value, self.min_elapsed), self.max_elapsed)
 
 
 class SummarizedMeasurements(FiledData[Summary], Protocol):
@@ -0,0 +1,9 @@
+from typing import Optional, Protocol
+
+
+class Sampler(Protocol):
+    def weight(self, route_name: str, elapsed_ns: int) -> Optional[float]:
+        """The weight to record a request of route_name with or None if
+        the request should not be recorded.  A weight of n means that
+        the measurement stands for n requests.
+        """
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Iterator, List, Optional
 
 from typing_extensions import Self
@@ -12,9 +12,27 @@ class MeasurementArchivistPlaceholder:
     def record_measurement(self, measurement: archive.Measurement) -> int:
         return 0
 
+    def record_measurements(self, measurements: List[archive.Measurement]) -> None:
+        pass
+
     def get_records(self) -> RecordedMeasurementsPlaceholder:
         return RecordedMeasurementsPlaceholder()
 
+    def get_route_catalog(self) -> List[archive.RouteCatalogEntry]:
+        return []
+
+    def data_version(self) -> int:
+        return 0
+
+    def nth_newest_start_timestamp(self, n: int) -> Optional[datetime]:
+        return None
+
+    def delete_measurements_until(self, timestamp: datetime, limit: int) -> int:
+        return 0
+
+    def reclaim_space(self) -> None:
+        pass
+
     def close_connection(self) -> None:
         pass
 
@@ -35,11 +53,16 @@ class RecordedMeasurementsPlaceholder:
     def __len__(self) -> int:
         return 0
 
+    def counted(
+        self, cap: Optional[int] = None
+    ) -> archive.CountedItems[archive.Record]:
+        return archive.CountedItems(items=[], total_count=0)
+
     def summarize(self) -> SummarizedMeasurementsPlaceholder:
         return SummarizedMeasurementsPlaceholder()
 
     def summarize_by_interval(
-        self, timestamps: List[datetime]
+        self, since: datetime, until: datetime, interval_length: timedelta
     ) -> SummarizedMeasurementsPlaceholder:
         return SummarizedMeasurementsPlaceholder()
 
@@ -61,6 +84,16 @@ class RecordedMeasurementsPlaceholder:
     def with_id(self, id_: int) -> RecordedMeasurementsPlaceholder:
         return self
 
+    def preceding(
+        self, start_timestamp: datetime, id_: int
+    ) -> RecordedMeasurementsPlaceholder:
+        return self
+
+    def following(
+        self, start_timestamp: datetime, id_: int
+    ) -> RecordedMeasurementsPlaceholder:
+        return self
+
     def first(self) -> Optional[archive.Record]:
         return None
 
@@ -83,6 +116,11 @@ class SummarizedMeasurementsPlaceholder:
     def __len__(self) -> int:
         return 0
 
+    def counted(
+        self, cap: Optional[int] = None
+    ) -> archive.CountedItems[archive.Summary]:
+        return archive.CountedItems(items=[], total_count=0)
+
     def first(self) -> Optional[archive.Summary]:
         return None
 
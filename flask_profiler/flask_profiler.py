@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import hashlib
 import logging
+from typing import Optional
 
 from flask import Blueprint
 from flask import Response as FlaskResponse
+from flask import request
 from flask_httpauth import HTTPBasicAuth
 
 from .dependency_injector import DependencyInjector
@@ -22,11 +25,38 @@ flask_profiler = Blueprint(
 )
 
 
-def render_response(response: HttpResponse) -> FlaskResponse:
-    return FlaskResponse(
+def render_response(
+    response: HttpResponse, etag: Optional[str] = None
+) -> FlaskResponse:
+    flask_response = FlaskResponse(
         response=response.content,
         status=response.status_code,
+        mimetype=response.mimetype,
     )
+    if etag is not None:
+        flask_response.set_etag(etag)
+        # Browsers have to ask whether the page changed every time.
+        flask_response.cache_control.no_cache = True
+    return flask_response
+
+
+def entity_tag(injector: DependencyInjector, uc_request: object) -> str:
+    """A page only changes with its URL, the use case request and the
+    stored measurements.  The data version stands in for the stored
+    measurements.
+    """
+    archivist = injector.get_measurement_archivist()
+    source = repr((request.full_path, uc_request, archivist.data_version()))
+    return hashlib.sha256(source.encode()).hexdigest()
+
+
+def not_modified(etag: str) -> Optional[FlaskResponse]:
+    if not request.if_none_match.contains(etag):
+        return None
+    response = FlaskResponse(status=304)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
 
 
 @auth.verify_password
@@ -53,10 +83,13 @@ def summary() -> FlaskResponse:
     presenter = injector.get_summary_presenter()
     view = injector.get_summary_view()
     uc_request = controller.process_request()
+    etag = entity_tag(injector, uc_request)
+    if response := not_modified(etag):
+        return response
     uc_response = use_case.get_summary(uc_request)
     view_model = presenter.render_summary(uc_response, controller.pagination_context)
     http_response = view.render_view_model(view_model)
-    return render_response(http_response)
+    return render_response(http_response, etag=etag)
 
 
 @flask_profiler.route("/details/")
@@ -68,10 +101,13 @@ def details() -> FlaskResponse:
     presenter = injector.get_details_presenter()
     view = injector.get_details_view()
     uc_request = controller.process_request()
+    etag = entity_tag(injector, uc_request)
+    if response := not_modified(etag):
+        return response
     uc_response = use_case.get_details(uc_request)
     view_model = presenter.present_response(uc_response, controller.pagination_context)
     http_response = view.render_view_model(view_model)
-    return render_response(http_response)
+    return render_response(http_response, etag=etag)
 
 
 @flask_profiler.route("/route/<route_name>")
@@ -83,9 +119,63 @@ def route_overview(route_name: str) -> FlaskResponse:
     presenter = injector.get_route_overview_presenter()
     view = injector.get_route_overview_view()
     uc_request = controller.handle_request()
+    etag = entity_tag(injector, uc_request)
+    if response := not_modified(etag):
+        return response
+    uc_response = use_case.get_route_overview(uc_request)
+    view_model = presenter.present_response(uc_response)
+    return render_response(view.render_view_model(view_model), etag=etag)
+
+
+@flask_profiler.route("/api/summary")
+@auth.login_required
+def summary_api() -> FlaskResponse:
+    injector = DependencyInjector()
+    controller = injector.get_summary_controller()
+    use_case = injector.get_summary_use_case()
+    presenter = injector.get_json_presenter()
+    view = injector.get_json_view()
+    uc_request = controller.process_request()
+    etag = entity_tag(injector, uc_request)
+    if response := not_modified(etag):
+        return response
+    uc_response = use_case.get_summary(uc_request)
+    view_model = presenter.present_response(uc_response)
+    return render_response(view.render_view_model(view_model), etag=etag)
+
+
+@flask_profiler.route("/api/details")
+@auth.login_required
+def details_api() -> FlaskResponse:
+    injector = DependencyInjector()
+    controller = injector.get_details_controller()
+    use_case = injector.get_details_use_case()
+    presenter = injector.get_json_presenter()
+    view = injector.get_json_view()
+    uc_request = controller.process_request()
+    etag = entity_tag(injector, uc_request)
+    if response := not_modified(etag):
+        return response
+    uc_response = use_case.get_details(uc_request)
+    view_model = presenter.present_response(uc_response)
+    return render_response(view.render_view_model(view_model), etag=etag)
+
+
+@flask_profiler.route("/api/route/<route_name>")
+@auth.login_required
+def route_overview_api(route_name: str) -> FlaskResponse:
+    injector = DependencyInjector()
+    controller = injector.get_route_overview_controller()
+    use_case = injector.get_route_overview_use_case()
+    presenter = injector.get_json_presenter()
+    view = injector.get_json_view()
+    uc_request = controller.handle_request()
+    etag = entity_tag(injector, uc_request)
+    if response := not_modified(etag):
+        return response
     uc_response = use_case.get_route_overview(uc_request)
     view_model = presenter.present_response(uc_response)
-    return render_response(view.render_view_model(view_model))
+    return render_response(view.render_view_model(view_model), etag=etag)
 
 
 @flask_profiler.after_request
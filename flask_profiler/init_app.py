@@ -27,6 +27,9 @@ class RouteWrapper:
             ] = self.measured_route_factory.create_measured_route(
                 original_route=func,
                 route_name=endpoint,
+                # Otherwise every visit of a profiler page would change
+                # the ETags of all profiler pages.
+                changes_data_version=not endpoint.startswith(flask_profiler.name + "."),
             )
 
 
@@ -47,6 +50,8 @@ def init_app(app: Flask) -> None:
     )
     with app.app_context():
         config.collection.create_database()
+    config.setup_write_behind()
+    config.setup_retention()
     if config.profile_self:
         app.register_blueprint(flask_profiler, url_prefix="/" + config.url_prefix)
         route_wrapper.wrap_all_routes(app)
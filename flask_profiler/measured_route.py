@@ -11,6 +11,7 @@ from flask import request
 from .clock import Clock
 from .configuration import Configuration
 from .entities.measurement_archive import MeasurementArchivist
+from .entities.sampling import Sampler
 from .use_cases import observe_request_handling_use_case as use_case
 
 ResponseT = Union[str, FlaskResponse]
@@ -53,9 +54,13 @@ class MeasuredRouteFactory:
     clock: Clock
     config: Configuration
     archivist: MeasurementArchivist
+    sampler: Sampler
 
     def create_measured_route(
-        self, route_name: str, original_route: Callable[..., ResponseT]
+        self,
+        route_name: str,
+        original_route: Callable[..., ResponseT],
+        changes_data_version: bool = True,
     ) -> MeasuredRoute:
         logger.debug("Measuring calls to route %s", route_name)
         request_handler = RequestHandler(
@@ -67,6 +72,8 @@ class MeasuredRouteFactory:
                     request_handler=request_handler,
                     clock=self.clock,
                     archivist=self.archivist,
+                    sampler=self.sampler,
+                    changes_data_version=changes_data_version,
                 ),
                 request_handler=request_handler,
             )
@@ -1,16 +1,31 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
 from flask_profiler.request import HttpRequest
+from flask_profiler.use_cases.get_details_use_case import Cursor
 
 PAGE_QUERY_ARGUMENT = "page"
+AFTER_QUERY_ARGUMENT = "after"
+BEFORE_QUERY_ARGUMENT = "before"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
 
 
 @dataclass
 class PaginationContext:
+    """Either a page number or a cursor.  A cursor is the position of
+    the record right before (after) or right after (before) the
+    requested page.
+    """
+
     current_page: int
     page_size: int
+    after: Optional[Cursor] = None
+    before: Optional[Cursor] = None
 
     def get_offset(self) -> int:
         return (self.current_page - 1) * self.page_size
@@ -32,4 +47,26 @@ class PaginationContext:
         return cls(
             current_page=current_page,
             page_size=page_size,
+            after=_parse_cursor(request_args.get(AFTER_QUERY_ARGUMENT)),
+            before=_parse_cursor(request_args.get(BEFORE_QUERY_ARGUMENT)),
+        )
+
+
+def format_cursor(cursor: Cursor) -> str:
+    """Encode a cursor as the start time in microseconds since the
+    epoch and the ID, e.g. 946684800000000_12.
+    """
+    microseconds = (cursor.start_timestamp - _EPOCH) // _MICROSECOND
+    return f"{microseconds}_{cursor.id}"
+
+
+def _parse_cursor(value: Optional[str]) -> Optional[Cursor]:
+    if not value:
+        return None
+    try:
+        microseconds, id_ = value.split("_")
+        return Cursor(
+            start_timestamp=_EPOCH + int(microseconds) * _MICROSECOND, id=int(id_)
         )
+    except (ValueError, OverflowError):
+        return None
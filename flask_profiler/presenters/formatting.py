@@ -1,3 +1,7 @@
 def format_duration_in_ms(duration: float) -> str:
     duration_in_ms = duration * 1000
     return f"{duration_in_ms:.3f} ms"
+
+
+def format_result_count(count: int, is_capped: bool = False) -> str:
+    return f"{count:,}{'+' if is_capped else ''} results"
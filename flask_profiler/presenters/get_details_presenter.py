@@ -9,8 +9,8 @@ from flask_profiler.request import HttpRequest
 from flask_profiler.use_cases import get_details_use_case as use_case
 
 from . import table
-from .formatting import format_duration_in_ms
-from .pagination import Paginator
+from .formatting import format_duration_in_ms, format_result_count
+from .pagination import CursorPaginator
 from .urls import get_url_with_query
 
 HEADERS = [
@@ -24,7 +24,8 @@ HEADERS = [
 @dataclass
 class ViewModel:
     table: table.Table
-    pagination: Paginator
+    pagination: CursorPaginator
+    result_count_text: str
     method_filter_text: str
     name_filter_text: str
     requested_after_filter_text: str
@@ -40,7 +41,6 @@ class GetDetailsPresenter:
         response: use_case.Response,
         pagination: PaginationContext,
     ) -> ViewModel:
-        current_page = response.request.offset // response.request.limit + 1
         view_model = ViewModel(
             table=table.Table(
                 headers=HEADERS,
@@ -61,14 +61,17 @@ class GetDetailsPresenter:
                     for measurement in response.measurements
                 ],
             ),
-            pagination=Paginator(
+            pagination=CursorPaginator(
                 target_link=get_url_with_query(
                     ".details", self.http_request.get_arguments()
                 ),
-                current_page=current_page,
-                total_page_count=pagination.get_total_pages_count(
-                    response.total_result_count
-                ),
+                previous_cursor=response.previous_cursor,
+                next_cursor=response.next_cursor,
+            ),
+            result_count_text=""
+            if response.total_result_count is None
+            else format_result_count(
+                response.total_result_count, response.total_result_count_capped
             ),
             method_filter_text=response.request.method_filter or "",
             name_filter_text=response.request.name_filter or "",
@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass, replace
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Iterable, List, Optional, Tuple
 
+from flask import url_for
+
 from flask_profiler.use_cases import get_route_overview as use_case
 
 
@@ -82,60 +84,100 @@ class Graph:
     plot: Plot
 
 
+@dataclass
+class OptionLink:
+    label: str
+    link_target: str
+    is_active: bool
+
+
 @dataclass
 class ViewModel:
     headline: str
     graphs: List[Graph]
+    interval_links: List[OptionLink]
+    statistic_links: List[OptionLink]
 
 
 class GetRouteOverviewPresenter:
     def present_response(self, response: use_case.Response) -> ViewModel:
-        graphs = [
-            self._render_graph(
-                width=400,
-                height=400,
-                left_border=100,
-                start_time=response.request.start_time,
-                end_time=response.request.end_time,
-                measurements=measurements,
-                title=method,
-            )
-            for method, measurements in response.timeseries.items()
-        ]
+        graphs = (
+            [
+                self._render_graph(
+                    width=400,
+                    height=400,
+                    left_border=100,
+                    start_time=response.start_time,
+                    end_time=response.end_time,
+                    interval_length=response.request.interval.length,
+                    measurements=measurements,
+                    title=method,
+                )
+                for method, measurements in response.timeseries.items()
+            ]
+            if response.start_time is not None and response.end_time is not None
+            else []
+        )
         view_model = ViewModel(
             headline=f"Route overview for {response.request.route_name}",
             graphs=graphs,
+            interval_links=[
+                OptionLink(
+                    label=label,
+                    link_target=self._get_link(response.request, interval=interval),
+                    is_active=interval == response.request.interval,
+                )
+                for interval, label in _INTERVAL_LABELS.items()
+            ],
+            statistic_links=[
+                OptionLink(
+                    label=label,
+                    link_target=self._get_link(response.request, statistic=statistic),
+                    is_active=statistic == response.request.statistic,
+                )
+                for statistic, label in _STATISTIC_LABELS.items()
+            ],
         )
         return view_model
 
+    def _get_link(
+        self,
+        request: use_case.Request,
+        interval: Optional[use_case.Interval] = None,
+        statistic: Optional[use_case.Statistic] = None,
+    ) -> str:
+        interval = interval or request.interval
+        statistic = statistic or request.statistic
+        return url_for(
+            ".route_overview",
+            route_name=request.route_name,
+            interval=_INTERVAL_ARGUMENTS[interval],
+            statistic=statistic.name,
+        )
+
     def _render_graph(
         self,
         *,
         width: float,
         height: float,
         left_border: float,
-        start_time: Optional[datetime],
+        start_time: datetime,
         end_time: datetime,
+        interval_length: timedelta,
         measurements: List[use_case.IntervalMeasurement],
         title: str,
     ) -> Graph:
-        start_time = start_time or self._get_earliest_measurement(measurements)
-        if start_time is None:
-            points = []
-        else:
-            interval_length_in_days = (end_time.date() - start_time.date()).days
-            points = [
-                Point(
-                    _x=(measurement.timestamp.date() - start_time.date()).days,
-                    _y=measurement.value,
-                )
-                for measurement in measurements
-                if measurement.value is not None
-            ]
+        interval_count = max(1, (end_time - start_time) / interval_length)
+        points = [
+            Point(
+                _x=(measurement.timestamp - start_time) / interval_length,
+                _y=measurement.value,
+            )
+            for measurement in measurements
+            if measurement.value is not None
+        ]
         max_value, markings_count = self._get_max_scale_value(max(p._y for p in points))
-        normalize_points = Conversion.stretch(
-            x=1 / interval_length_in_days, y=1 / max_value
-        )
+        normalize_points = Conversion.stretch(x=1 / interval_count, y=1 / max_value)
         normalized_points = [normalize_points.transform_point(p) for p in points]
         plot = Plot(
             data_points=normalized_points,
@@ -161,18 +203,6 @@ class GetRouteOverviewPresenter:
             plot=plot,
         )
 
-    def _get_earliest_measurement(
-        self, measurements: List[use_case.IntervalMeasurement]
-    ) -> Optional[datetime]:
-        try:
-            first_measurement, rest_of_measurements = measurements[0], measurements[1:]
-        except IndexError:
-            return None
-        earliest_timestamp = first_measurement.timestamp
-        for measurement in rest_of_measurements:
-            earliest_timestamp = min(earliest_timestamp, measurement.timestamp)
-        return earliest_timestamp
-
     def _generate_markings(
         self, scale_max_value: float, markings_count: int
     ) -> List[Line]:
@@ -195,6 +225,29 @@ class GetRouteOverviewPresenter:
         return factor * math.ceil(value), math.ceil(value)
 
 
+_INTERVAL_LABELS = {
+    use_case.Interval.minutely: "Per minute",
+    use_case.Interval.hourly: "Per hour",
+    use_case.Interval.daily: "Per day",
+    use_case.Interval.weekly: "Per week",
+}
+
+_INTERVAL_ARGUMENTS = {
+    use_case.Interval.minutely: "minute",
+    use_case.Interval.hourly: "hour",
+    use_case.Interval.daily: "day",
+    use_case.Interval.weekly: "week",
+}
+
+_STATISTIC_LABELS = {
+    use_case.Statistic.average: "Average",
+    use_case.Statistic.p50: "p50",
+    use_case.Statistic.p90: "p90",
+    use_case.Statistic.p95: "p95",
+    use_case.Statistic.p99: "p99",
+}
+
+
 @dataclass
 class Conversion:
     rows: List[List[float]]
@@ -12,7 +12,7 @@ from flask_profiler.request import HttpRequest
 from flask_profiler.use_cases import get_summary_use_case as use_case
 
 from . import table
-from .formatting import format_duration_in_ms
+from .formatting import format_duration_in_ms, format_result_count
 from .pagination import Paginator
 from .urls import get_url_with_query
 
@@ -21,6 +21,7 @@ from .urls import get_url_with_query
 class ViewModel:
     table: table.Table
     pagination: Paginator
+    result_count_text: str
     method_filter_text: str
     name_filter_text: str
     requested_after_filter_text: str
@@ -53,6 +54,9 @@ class GetSummaryPresenter:
                 ),
                 target_link=self.get_pagination_target_link(),
             ),
+            result_count_text=format_result_count(
+                response.total_results, response.total_results_capped
+            ),
             method_filter_text=response.request.method or "",
             name_filter_text=response.request.name_filter or "",
             requested_after_filter_text=self._render_optional_timestamp(
@@ -79,6 +83,10 @@ class GetSummaryPresenter:
                 label="Avg. response time",
                 link_target=self._get_sort_column_header_link("average_time"),
             ),
+            table.Header(label="p50"),
+            table.Header(label="p90"),
+            table.Header(label="p95"),
+            table.Header(label="p99"),
             table.Header(label="Min. response time"),
             table.Header(label="Max. response time"),
         ]
@@ -97,12 +105,27 @@ class GetSummaryPresenter:
             table.Cell(
                 text=format_duration_in_ms(measurement.average_response_time_secs)
             ),
+            table.Cell(
+                text=self._render_optional_duration(measurement.p50_response_time_secs)
+            ),
+            table.Cell(
+                text=self._render_optional_duration(measurement.p90_response_time_secs)
+            ),
+            table.Cell(
+                text=self._render_optional_duration(measurement.p95_response_time_secs)
+            ),
+            table.Cell(
+                text=self._render_optional_duration(measurement.p99_response_time_secs)
+            ),
             table.Cell(text=format_duration_in_ms(measurement.min_response_time_secs)),
             table.Cell(
                 text=format_duration_in_ms(measurement.max_response_time_secs),
             ),
         ]
 
+    def _render_optional_duration(self, duration: Optional[float]) -> str:
+        return "" if duration is None else format_duration_in_ms(duration)
+
     def _render_optional_timestamp(self, timestamp: Optional[datetime]) -> str:
         return "" if timestamp is None else timestamp.isoformat()
 
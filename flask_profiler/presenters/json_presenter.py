@@ -0,0 +1,55 @@
+"""Use case responses are sent to API clients as they are.  Datetimes
+are encoded in ISO 8601 and enums by their name.  With the argument
+format=columns every list of records is sent as one list per field,
+which is more compact for large results.
+"""
+from __future__ import annotations
+
+import enum
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import datetime
+from typing import Any
+
+from flask_profiler.request import HttpRequest
+
+
+@dataclass
+class ViewModel:
+    content: Any
+
+
+@dataclass
+class JsonPresenter:
+    http_request: HttpRequest
+
+    def present_response(self, response: Any) -> ViewModel:
+        column_oriented = self.http_request.get_arguments().get("format") == "columns"
+        return ViewModel(content=_to_json_value(response, column_oriented))
+
+
+def _to_json_value(value: Any, column_oriented: bool) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            field.name: _to_json_value(getattr(value, field.name), column_oriented)
+            for field in fields(value)
+        }
+    if isinstance(value, (list, tuple)):
+        if column_oriented and value and is_dataclass(value[0]):
+            return {
+                field.name: [
+                    _to_json_value(getattr(item, field.name), column_oriented)
+                    for item in value
+                ]
+                for field in fields(value[0])
+            }
+        return [_to_json_value(item, column_oriented) for item in value]
+    if isinstance(value, dict):
+        return {
+            str(key): _to_json_value(item, column_oriented)
+            for key, item in value.items()
+        }
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.name
+    return value
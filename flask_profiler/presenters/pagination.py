@@ -2,7 +2,13 @@ from dataclasses import dataclass
 from typing import Iterable, Iterator, Optional, Union
 from urllib.parse import ParseResult, parse_qs, urlencode
 
-from flask_profiler.pagination import PAGE_QUERY_ARGUMENT
+from flask_profiler.pagination import (
+    AFTER_QUERY_ARGUMENT,
+    BEFORE_QUERY_ARGUMENT,
+    PAGE_QUERY_ARGUMENT,
+    format_cursor,
+)
+from flask_profiler.use_cases.get_details_use_case import Cursor
 
 
 @dataclass
@@ -83,3 +89,37 @@ class Paginator:
         if self.current_page == page:
             classes.append("is-current")
         return " ".join(classes)
+
+
+class CursorPaginator:
+    def __init__(
+        self,
+        target_link: ParseResult,
+        previous_cursor: Optional[Cursor],
+        next_cursor: Optional[Cursor],
+    ) -> None:
+        self.target_link = target_link
+        self.previous_cursor = previous_cursor
+        self.next_cursor = next_cursor
+
+    @property
+    def previous_link(self) -> Optional[str]:
+        if self.previous_cursor is None:
+            return None
+        return self._get_cursor_link(BEFORE_QUERY_ARGUMENT, self.previous_cursor)
+
+    @property
+    def next_link(self) -> Optional[str]:
+        if self.next_cursor is None:
+            return None
+        return self._get_cursor_link(AFTER_QUERY_ARGUMENT, self.next_cursor)
+
+    def _get_cursor_link(self, argument: str, cursor: Cursor) -> str:
+        query = {
+            key: value[0]
+            for key, value in parse_qs(self.target_link.query).items()
+            if key
+            not in (PAGE_QUERY_ARGUMENT, AFTER_QUERY_ARGUMENT, BEFORE_QUERY_ARGUMENT)
+        }
+        query[argument] = format_cursor(cursor)
+        return self.target_link._replace(query=urlencode(query)).geturl()
@@ -10,36 +10,57 @@ class Expression(Protocol):
     def as_expression(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class FromClause(Protocol):
     def as_from_clause(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class SelectorClause(Protocol):
     def as_selector_clause(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class Query(Protocol):
     def as_query(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class Vector(Protocol):
     def as_vector(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class Selector(Protocol):
     def as_selector(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class Statement(Protocol):
     def as_statement(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class PragmaValue(Protocol):
     def as_pragma_value(self) -> str:
@@ -55,6 +76,9 @@ class JoinConstraint(Protocol):
     def as_join_constraint(self) -> str:
         ...
 
+    def parameters(self) -> List[Any]:
+        ...
+
 
 class Ordering(Expression, Protocol):
     def is_ascending(self) -> bool:
@@ -92,11 +116,25 @@ class Select:
     def _limit_clause(self) -> str:
         query = ""
         if self.limit_clause > 0 or self.offset_clause > 0:
-            query += f" LIMIT {self.limit_clause}"
+            query += " LIMIT ?"
         if self.offset_clause > 0:
-            query += f" OFFSET {self.offset_clause}"
+            query += " OFFSET ?"
         return query
 
+    def parameters(self) -> List[Any]:
+        parameters = self.selector.parameters() + self.from_clause.parameters()
+        if self.where_clause is not None:
+            parameters += self.where_clause.parameters()
+        if self.group_by is not None:
+            parameters += self.group_by.parameters()
+        for clause in self.order_by:
+            parameters += clause.parameters()
+        if self.limit_clause > 0 or self.offset_clause > 0:
+            parameters.append(self.limit_clause)
+        if self.offset_clause > 0:
+            parameters.append(self.offset_clause)
+        return parameters
+
     def as_vector(self) -> str:
         return self.as_query()
 
@@ -127,6 +165,7 @@ class Insert:
     rows: List[List[Expression]]
     columns: Optional[List[Identifier]] = None
     alias: Optional[Identifier] = None
+    on_conflict: Optional[OnConflict] = None
     returning: Optional[All] = None
 
     def __str__(self) -> str:
@@ -142,6 +181,8 @@ class Insert:
             "(" + ", ".join(value.as_expression() for value in row) + ")"
             for row in self.rows
         )
+        if self.on_conflict is not None:
+            statement += " " + str(self.on_conflict)
         if self.returning:
             statement += " RETURNING " + str(self.returning)
         return statement
@@ -149,6 +190,37 @@ class Insert:
     def as_statement(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        parameters = [
+            parameter
+            for row in self.rows
+            for value in row
+            for parameter in value.parameters()
+        ]
+        if self.on_conflict is not None:
+            parameters += self.on_conflict.parameters()
+        return parameters
+
+
+@dataclass
+class UnionAll:
+    queries: List[Select]
+
+    def as_query(self) -> str:
+        return " UNION ALL ".join(query.as_query() for query in self.queries)
+
+    def __str__(self) -> str:
+        return self.as_query()
+
+    def as_expression(self) -> str:
+        return str(self)
+
+    def as_from_clause(self) -> str:
+        return "(" + str(self) + ")"
+
+    def parameters(self) -> List[Any]:
+        return [p for query in self.queries for p in query.parameters()]
+
 
 @dataclass
 class Pragma:
@@ -168,6 +240,9 @@ class Pragma:
     def as_statement(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return []
+
 
 @dataclass
 class CreateTable:
@@ -185,6 +260,9 @@ class CreateTable:
     def as_statement(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return []
+
 
 @dataclass
 class CreateIndex:
@@ -194,13 +272,68 @@ class CreateIndex:
     if_not_exists: bool = False
 
     def __str__(self) -> str:
-        statement = f"CREATE INDEX {self.name} ON {self.on} ("
+        statement = "CREATE INDEX "
+        if self.if_not_exists:
+            statement += "IF NOT EXISTS "
+        statement += f"{self.name} ON {self.on} ("
         statement += ", ".join(map(str, self.indices)) + ")"
         return statement
 
     def as_statement(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return []
+
+
+@dataclass
+class DropTable:
+    name: Identifier
+    if_exists: bool = False
+
+    def __str__(self) -> str:
+        statement = "DROP TABLE "
+        if self.if_exists:
+            statement += "IF EXISTS "
+        return statement + str(self.name)
+
+    def as_statement(self) -> str:
+        return str(self)
+
+    def parameters(self) -> List[Any]:
+        return []
+
+
+@dataclass
+class Update:
+    table: Identifier
+    assignments: List[Tuple[Identifier, Expression]]
+    where: Optional[Expression] = None
+    returning: Optional[SelectorClause] = None
+
+    def __str__(self) -> str:
+        statement = f"UPDATE {self.table} SET "
+        statement += ", ".join(
+            f"{column.as_expression()} = {value.as_expression()}"
+            for column, value in self.assignments
+        )
+        if self.where is not None:
+            statement += f" WHERE {self.where.as_expression()}"
+        if self.returning is not None:
+            statement += " RETURNING " + self.returning.as_selector_clause()
+        return statement
+
+    def as_statement(self) -> str:
+        return str(self)
+
+    def parameters(self) -> List[Any]:
+        parameters = [p for _, value in self.assignments for p in value.parameters()]
+        if self.where is not None:
+            parameters += self.where.parameters()
+        if self.returning is not None:
+            parameters += self.returning.parameters()
+        return parameters
+
 
 @dataclass
 class Delete:
@@ -209,17 +342,48 @@ class Delete:
 
     def __str__(self) -> str:
         statement = f"DELETE FROM {self.table}"
-        if self.where:
-            statement += f" {self.where.as_expression()}"
+        if self.where is not None:
+            statement += f" WHERE {self.where.as_expression()}"
         return statement
 
     def as_statement(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        if self.where is not None:
+            return self.where.parameters()
+        return []
+
 
 # Details
 
 
+@dataclass
+class OnConflict:
+    """DO UPDATE clause of an upsert.  The values of the rejected row
+    are available via the "excluded" table.  Without updates the
+    rejected row is ignored.
+    """
+
+    target: List[Identifier]
+    updates: List[Tuple[Identifier, Expression]]
+
+    def __str__(self) -> str:
+        clause = "ON CONFLICT ("
+        clause += ", ".join(column.as_expression() for column in self.target)
+        if not self.updates:
+            return clause + ") DO NOTHING"
+        clause += ") DO UPDATE SET "
+        clause += ", ".join(
+            f"{column.as_expression()} = {value.as_expression()}"
+            for column, value in self.updates
+        )
+        return clause
+
+    def parameters(self) -> List[Any]:
+        return [p for _, value in self.updates for p in value.parameters()]
+
+
 @dataclass
 class IndexDefinition:
     column: Expression
@@ -272,6 +436,17 @@ class PrimaryKey:
         return str(self)
 
 
+class NotNull:
+    def __str__(self) -> str:
+        return "NOT NULL"
+
+    def as_column_constraint(self) -> str:
+        return str(self)
+
+
+not_null = NotNull()
+
+
 @dataclass
 class Function:
     name: str
@@ -283,6 +458,9 @@ class Function:
         expression += ")"
         return expression
 
+    def parameters(self) -> List[Any]:
+        return [p for operand in self.operands for p in operand.parameters()]
+
 
 @dataclass
 class BinaryOp:
@@ -296,27 +474,35 @@ class BinaryOp:
     def as_selector(self) -> str:
         return self.as_expression()
 
+    def parameters(self) -> List[Any]:
+        return self.x.parameters() + self.y.parameters()
+
 
 @dataclass
 class Literal:
+    """A value that is passed to the database as a bound parameter.
+    Since sqlite does not allow parameters in PRAGMA statements,
+    pragma values are rendered inline.
+    """
+
     value: Any
 
     def as_expression(self) -> str:
-        if isinstance(self.value, int):
-            return str(self.value)
-        elif isinstance(self.value, float):
-            return str(self.value)
-        elif isinstance(self.value, (datetime.date, datetime.datetime)):
-            return f"'{self.value.isoformat()}'"
-        else:
-            escaped = str(self.value).replace("'", "''")
-            return f"'{escaped}'"
+        return "?"
 
     def as_selector(self) -> str:
         return self.as_expression()
 
     def as_pragma_value(self) -> str:
-        return self.as_expression()
+        if isinstance(self.value, (int, float)):
+            return str(self.value)
+        escaped = str(self.value).replace("'", "''")
+        return f"'{escaped}'"
+
+    def parameters(self) -> List[Any]:
+        if isinstance(self.value, (datetime.date, datetime.datetime)):
+            return [self.value.isoformat()]
+        return [self.value]
 
 
 @dataclass
@@ -338,6 +524,9 @@ class Identifier:
     def as_selector(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return []
+
     @staticmethod
     def escape(value: str) -> str:
         escaped = value.replace('"', '""')
@@ -354,6 +543,9 @@ class ExpressionList:
         else:
             return str(null)
 
+    def parameters(self) -> List[Any]:
+        return [p for x in self.expressions for p in x.parameters()]
+
 
 class Null:
     def __str__(self) -> str:
@@ -365,6 +557,9 @@ class Null:
     def as_pragma_value(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return []
+
 
 null = Null()
 
@@ -386,6 +581,9 @@ class Alias:
     def as_selector_clause(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return self.expression.parameters()
+
 
 @dataclass
 class SelectorList:
@@ -394,6 +592,9 @@ class SelectorList:
     def as_selector_clause(self) -> str:
         return ", ".join(x.as_selector() for x in self.selectors)
 
+    def parameters(self) -> List[Any]:
+        return [p for x in self.selectors for p in x.parameters()]
+
 
 class All:
     def __str__(self) -> str:
@@ -405,6 +606,9 @@ class All:
     def as_selector_clause(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return []
+
 
 @dataclass
 class Aggregate:
@@ -429,6 +633,27 @@ class Aggregate:
     def as_expression(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        if isinstance(self.expression, All):
+            return []
+        return self.expression.parameters()
+
+
+@dataclass
+class Window:
+    """An aggregate over all rows of the result, e.g. COUNT(*) OVER ()."""
+
+    aggregate: Aggregate
+
+    def as_expression(self) -> str:
+        return f"{self.aggregate.as_expression()} OVER ()"
+
+    def as_selector(self) -> str:
+        return self.as_expression()
+
+    def parameters(self) -> List[Any]:
+        return self.aggregate.parameters()
+
 
 @dataclass
 class JoinSpec:
@@ -441,6 +666,9 @@ class JoinSpec:
             f"{self.operator} JOIN {self.table} {self.constraint.as_join_constraint()}"
         )
 
+    def parameters(self) -> List[Any]:
+        return self.constraint.parameters()
+
 
 def left(table: Identifier, constraint: JoinConstraint) -> JoinSpec:
     return JoinSpec(
@@ -476,14 +704,17 @@ class On:
     def as_join_constraint(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return self.expression.parameters()
+
 
 @dataclass
 class Join:
-    table: Identifier
+    table: FromClause
     spec: List[JoinSpec]
 
     def __str__(self) -> str:
-        clause = str(self.table)
+        clause = self.table.as_from_clause()
         if self.spec:
             for spec in self.spec:
                 clause += " " + str(spec)
@@ -492,6 +723,11 @@ class Join:
     def as_from_clause(self) -> str:
         return str(self)
 
+    def parameters(self) -> List[Any]:
+        return self.table.parameters() + [
+            p for spec in self.spec for p in spec.parameters()
+        ]
+
 
 @dataclass
 class If:
@@ -502,6 +738,13 @@ class If:
     def as_expression(self) -> str:
         return f"CASE WHEN {self.condition.as_expression()} THEN {self.consequence.as_expression()} ELSE {self.alternative.as_expression()} END"
 
+    def parameters(self) -> List[Any]:
+        return (
+            self.condition.parameters()
+            + self.consequence.parameters()
+            + self.alternative.parameters()
+        )
+
 
 @dataclass
 class Case:
@@ -520,6 +763,31 @@ class Case:
         )
         return "CASE " + " ".join(conditions) + " " + alternative + " END"
 
+    def parameters(self) -> List[Any]:
+        parameters = [
+            p
+            for condition, result in self.cases
+            for p in condition.parameters() + result.parameters()
+        ]
+        if self.alternative is not None:
+            parameters += self.alternative.parameters()
+        return parameters
+
+
+@dataclass
+class Cast:
+    expression: Expression
+    column_type: ColumnType
+
+    def as_expression(self) -> str:
+        return f"CAST(({self.expression.as_expression()}) AS {self.column_type.as_type_def()})"
+
+    def as_selector(self) -> str:
+        return self.as_expression()
+
+    def parameters(self) -> List[Any]:
+        return self.expression.parameters()
+
 
 @dataclass
 class Asc:
@@ -531,6 +799,9 @@ class Asc:
     def is_ascending(self) -> bool:
         return True
 
+    def parameters(self) -> List[Any]:
+        return self.expression.parameters()
+
 
 @dataclass
 class Desc:
@@ -541,3 +812,6 @@ class Desc:
 
     def is_ascending(self) -> bool:
         return False
+
+    def parameters(self) -> List[Any]:
+        return self.expression.parameters()
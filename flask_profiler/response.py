@@ -5,3 +5,4 @@ from dataclasses import dataclass
 class HttpResponse:
     status_code: int = 200
     content: str = ""
+    mimetype: str = "text/html"
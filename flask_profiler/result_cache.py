@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Protocol, TypeVar, cast
+
+from .clock import Clock, SystemClock
+from .entities.measurement_archive import NANOSECONDS_PER_SECOND
+
+T = TypeVar("T")
+
+
+class VersionedArchivist(Protocol):
+    def data_version(self) -> int:
+        ...
+
+
+@dataclass
+class ResultCacheSettings:
+    max_entries: int = 128
+    ttl_secs: float = 10
+
+
+@dataclass
+class _Entry:
+    value: Any
+    data_version: int
+    expires_at_ns: int
+
+
+class ResultCache:
+    """Process wide LRU cache for the responses of the use cases behind
+    the web interface.  An entry is reused for ttl_secs after it was
+    computed, even if measurements were stored or deleted meanwhile, so
+    results are at most ttl_secs out of date under constant traffic.
+    After that the entry is only reused, for another ttl_secs, if the
+    data version of the archivist did not change since.
+    """
+
+    def __init__(
+        self, settings: ResultCacheSettings, clock: Clock = SystemClock()
+    ) -> None:
+        self.settings = settings
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+
+    def get_or_compute(
+        self,
+        archivist: VersionedArchivist,
+        key: Hashable,
+        compute: Callable[[], T],
+    ) -> T:
+        now = self.clock.perf_counter_ns()
+        expires_at_ns = now + int(self.settings.ttl_secs * NANOSECONDS_PER_SECOND)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.expires_at_ns:
+                self._entries.move_to_end(key)
+                return cast(T, entry.value)
+        data_version = archivist.data_version()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.data_version == data_version:
+                entry.expires_at_ns = expires_at_ns
+                self._entries.move_to_end(key)
+                return cast(T, entry.value)
+        # Computing happens outside of the lock, so concurrent misses
+        # for the same key compute the value more than once.
+        value = compute()
+        with self._lock:
+            self._entries[key] = _Entry(
+                value=value,
+                data_version=data_version,
+                expires_at_ns=expires_at_ns,
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.settings.max_entries:
+                self._entries.popitem(last=False)
+        return value
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Protocol
+
+from .clock import Clock, SystemClock
+
+LOGGER = logging.getLogger(__name__)
+
+
+class PruningArchivist(Protocol):
+    def nth_newest_start_timestamp(self, n: int) -> Optional[datetime]:
+        """The start of the n-th newest measurement, counting from 0,
+        or None if there are at most n measurements.
+        """
+
+    def delete_measurements_until(self, timestamp: datetime, limit: int) -> int:
+        """Delete at most limit of the oldest measurements that started
+        at or before timestamp in one transaction.  Returns the number
+        of deleted measurements.
+        """
+
+    def reclaim_space(self) -> None:
+        ...
+
+    def close_connection(self) -> None:
+        ...
+
+
+@dataclass
+class RetentionSettings:
+    max_age: Optional[timedelta] = None
+    max_rows: Optional[int] = None
+    batch_size: int = 2000
+    interval_secs: float = 300
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.max_age is not None or self.max_rows is not None
+
+
+def parse_retention(config: Optional[Dict[str, Any]]) -> RetentionSettings:
+    """Parse the storage.retention setting."""
+    config = config or dict()
+    max_age_days = config.get("max_age_days")
+    return RetentionSettings(
+        max_age=None if max_age_days is None else timedelta(days=max_age_days),
+        max_rows=config.get("max_rows"),
+        batch_size=config.get("batch_size", 2000),
+        interval_secs=config.get("interval_secs", 300),
+    )
+
+
+class RetentionJob:
+    """Deletes measurements that are older than max_age or that exceed
+    max_rows from a background thread every interval_secs.  Rows are
+    deleted in transactions of at most batch_size rows so that writers
+    only ever wait for one small batch.  Like the write-behind queue
+    the thread is started lazily and restarted after a fork.
+    """
+
+    def __init__(
+        self,
+        archivist_factory: Callable[[], PruningArchivist],
+        settings: RetentionSettings,
+        clock: Clock = SystemClock(),
+    ) -> None:
+        self.archivist_factory = archivist_factory
+        self.settings = settings
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def ensure_running(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run, name="flask-profiler-retention", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._stopped.set()
+            thread.join()
+            self._thread = None
+
+    def prune(self, archivist: PruningArchivist) -> int:
+        """Delete everything that is outside of the retention limits.
+        Returns the number of deleted measurements.
+        """
+        cutoffs = []
+        if self.settings.max_age is not None:
+            cutoffs.append(self.clock.utc_now() - self.settings.max_age)
+        if self.settings.max_rows is not None:
+            timestamp = archivist.nth_newest_start_timestamp(self.settings.max_rows)
+            if timestamp is not None:
+                cutoffs.append(timestamp)
+        if not cutoffs:
+            return 0
+        cutoff = max(cutoffs)
+        deleted = 0
+        while not self._stopped.is_set():
+            count = archivist.delete_measurements_until(
+                cutoff, limit=self.settings.batch_size
+            )
+            deleted += count
+            if count < self.settings.batch_size:
+                break
+        if deleted:
+            LOGGER.info("Deleted %s measurements older than %s", deleted, cutoff)
+            archivist.reclaim_space()
+        return deleted
+
+    def _run(self) -> None:
+        archivist = self.archivist_factory()
+        try:
+            while True:
+                try:
+                    self.prune(archivist)
+                except Exception as e:
+                    LOGGER.error("Failed to delete old measurements")
+                    LOGGER.exception(e)
+                if self._stopped.wait(self.settings.interval_secs):
+                    return
+        finally:
+            archivist.close_connection()
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ThroughputEstimator:
+    """Estimates the requests per second of every route with a sliding
+    window.  Requests are counted in consecutive windows of
+    window_secs and the previous window contributes to the estimate
+    with the part that still overlaps the sliding window.
+    """
+
+    def __init__(
+        self, window_secs: float = 10, now: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.window_secs = window_secs
+        self.now = now
+        self._lock = threading.Lock()
+        # route name -> (window index, previous count, current count)
+        self._counts: Dict[str, Tuple[int, float, float]] = dict()
+
+    def observe(self, route_name: str) -> float:
+        """Count one request of route_name and return the estimated
+        requests per second including this one.
+        """
+        position = self.now() / self.window_secs
+        window = math.floor(position)
+        with self._lock:
+            last_window, previous, current = self._counts.get(
+                route_name, (window, 0, 0)
+            )
+            if window == last_window + 1:
+                previous, current = current, 0
+            elif window != last_window:
+                previous, current = 0, 0
+            current += 1
+            self._counts[route_name] = (window, previous, current)
+        overlap = 1 - (position - window)
+        return (previous * overlap + current) / self.window_secs
+
+
+@dataclass
+class SamplingPolicy:
+    """Requests of a route are recorded with probability rate and then
+    stand for 1 / rate requests.  Requests that take at least
+    always_record_slower_than_ns nanoseconds are recorded with a weight of 1, so the
+    weighted request counts stay unbiased.
+
+    If target_per_second is set, the rate of a route is lowered so
+    that about target_per_second requests per second of that route
+    are recorded, based on the throughput estimated by throughput.
+    """
+
+    rate: float = 1
+    route_rates: Dict[str, float] = field(default_factory=dict)
+    always_record_slower_than_ns: Optional[int] = None
+    target_per_second: Optional[float] = None
+    throughput: ThroughputEstimator = field(default_factory=ThroughputEstimator)
+    draw: Callable[[], float] = random.random
+
+    def weight(self, route_name: str, elapsed_ns: int) -> Optional[float]:
+        rate = self.rate_for(route_name)
+        if (
+            self.always_record_slower_than_ns is not None
+            and elapsed_ns >= self.always_record_slower_than_ns
+        ):
+            return 1
+        if rate >= 1:
+            return 1
+        if rate <= 0 or self.draw() >= rate:
+            return None
+        return 1 / rate
+
+    def rate_for(self, route_name: str) -> float:
+        rate = self.route_rates.get(route_name, self.rate)
+        if self.target_per_second is not None:
+            requests_per_second = self.throughput.observe(route_name)
+            if requests_per_second > self.target_per_second:
+                rate = min(rate, self.target_per_second / requests_per_second)
+        return rate
+
+
+def parse_sampling(config: Optional[Dict[str, Any]]) -> SamplingPolicy:
+    """Parse the sampling setting.  It has the keys rate, routes which
+    maps endpoint names to rates, always_record_slower_than_ms,
+    target_per_route_per_second and adaptive_window_secs.
+    """
+    config = dict(config or {})
+    rate = config.pop("rate", 1)
+    route_rates = dict(config.pop("routes", {}))
+    threshold_ms = config.pop("always_record_slower_than_ms", None)
+    target_per_second = config.pop("target_per_route_per_second", None)
+    window_secs = config.pop("adaptive_window_secs", 10)
+    if config:
+        raise ValueError(f"Unknown sampling settings: {', '.join(sorted(config))}")
+    for name, value in [("rate", rate)] + list(route_rates.items()):
+        if not 0 <= value <= 1:
+            raise ValueError(
+                f"Sampling rate for {name} must be between 0 and 1, got {value}"
+            )
+    if target_per_second is not None and target_per_second <= 0:
+        raise ValueError(
+            f"target_per_route_per_second must be positive, got {target_per_second}"
+        )
+    if window_secs <= 0:
+        raise ValueError(f"adaptive_window_secs must be positive, got {window_secs}")
+    return SamplingPolicy(
+        rate=rate,
+        route_rates=route_rates,
+        always_record_slower_than_ns=None
+        if threshold_ms is None
+        else int(threshold_ms * 1_000_000),
+        target_per_second=target_per_second,
+        throughput=ThroughputEstimator(window_secs=window_secs),
+    )
@@ -1,3 +1,4 @@
+from .connection_pool import ConnectionPool
 from .database import Sqlite
 
-__all__ = ["Sqlite"]
+__all__ = ["ConnectionPool", "Sqlite"]
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Optional
+
+from flask_profiler import query as q
+
+from . import functions
+from .partitions import PartitionCache
+from .routes import RouteCache
+from .tuning import Tuning
+
+LOGGER = logging.getLogger(__name__)
+# Number of virtual machine instructions between two checks of the
+# query time budget.
+BUDGET_CHECK_INTERVAL = 1000
+
+
+class Row(sqlite3.Row):
+    def __str__(self) -> str:
+        values = [f"{key}: {self[key]}" for key in self.keys()]
+        return f'<Row {", ".join(values)}>'
+
+
+class QueryBudget:
+    """Progress handler that interrupts queries which run for more than
+    seconds inside of running().  Interrupted queries fail with
+    sqlite3.OperationalError.  Queries outside of running() are never
+    interrupted.  Nested calls of running() share the deadline of the
+    outermost one.
+    """
+
+    def __init__(
+        self, seconds: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.seconds = seconds
+        self.clock = clock
+        self.deadline: Optional[float] = None
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        if self.deadline is not None:
+            yield
+            return
+        self.deadline = self.clock() + self.seconds
+        try:
+            yield
+        finally:
+            self.deadline = None
+
+    def __call__(self) -> int:
+        return int(self.deadline is not None and self.clock() > self.deadline)
+
+
+class Connection(sqlite3.Connection):
+    budget: Optional[QueryBudget] = None
+
+
+class ConnectionPool:
+    """Process wide set of connections to one sqlite database.
+
+    There is exactly one writer connection which is shared between
+    all threads and guarded by a lock.  Reader connections are handed
+    out to one user at a time and kept open after they are released so
+    that following requests do not have to connect again.  After a
+    fork the connections of the parent process are discarded and new
+    ones are opened lazily in the child process.  The given tuning is
+    applied to every connection when it is opened.  Reader connections
+    cannot write to the database and, given a reader_time_budget in
+    seconds, interrupt queries that take longer than that.  The pool
+    also holds the caches of route ids and of existing partitions since
+    they are shared by everyone using the same database.
+    """
+
+    def __init__(
+        self,
+        sqlite_file: str,
+        max_idle_readers: int = 4,
+        tuning: Optional[Tuning] = None,
+        reader_time_budget: Optional[float] = None,
+    ) -> None:
+        self.sqlite_file = sqlite_file
+        self.max_idle_readers = max_idle_readers
+        self.tuning = tuning
+        self.reader_time_budget = reader_time_budget
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._pid = os.getpid()
+        self._writer: Optional[Connection] = None
+        self._idle_readers: List[Connection] = []
+        self.routes = RouteCache()
+        self.partitions = PartitionCache()
+
+    @property
+    def is_in_memory(self) -> bool:
+        return self.sqlite_file in ("", ":memory:")
+
+    @contextmanager
+    def writer(self) -> Iterator[Connection]:
+        self._check_for_fork()
+        with self._write_lock:
+            yield self._get_writer()
+
+    def acquire_reader(self) -> Connection:
+        self._check_for_fork()
+        if self.is_in_memory:
+            # Every connection to :memory: opens a different database,
+            # so readers share the writer and cannot be read-only.
+            return self._get_writer()
+        with self._lock:
+            if self._idle_readers:
+                return self._idle_readers.pop()
+        LOGGER.debug("Opening new reader connection to %s", self.sqlite_file)
+        return self._connect(is_writer=False)
+
+    def release_reader(self, connection: Connection) -> None:
+        self._check_for_fork()
+        if self.is_in_memory:
+            return
+        with self._lock:
+            if len(self._idle_readers) < self.max_idle_readers:
+                connection.rollback()
+                self._idle_readers.append(connection)
+                return
+        connection.close()
+
+    def close(self) -> None:
+        self._check_for_fork()
+        with self._write_lock, self._lock:
+            for connection in self._idle_readers:
+                connection.close()
+            if self._writer is not None:
+                self._writer.close()
+            self._idle_readers = []
+            self._writer = None
+
+    def _get_writer(self) -> Connection:
+        with self._lock:
+            if self._writer is None:
+                LOGGER.debug("Opening writer connection to %s", self.sqlite_file)
+                self._writer = self._connect(is_writer=True)
+            return self._writer
+
+    def _check_for_fork(self) -> None:
+        if self._pid == os.getpid():
+            return
+        LOGGER.debug("Process was forked, discarding inherited connections")
+        # Connections must not be used or closed across a fork and the
+        # locks might have been held by a thread that does not exist
+        # in this process, so we start over.
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._writer = None
+        self._idle_readers = []
+
+    def _connect(self, is_writer: bool) -> Connection:
+        connection = sqlite3.connect(
+            self.sqlite_file, check_same_thread=False, factory=Connection
+        )
+        connection.row_factory = Row
+        functions.register(connection)
+        if self.tuning is not None:
+            self.tuning.apply(connection, is_writer=is_writer)
+        if not is_writer:
+            connection.execute(
+                q.Pragma(name="query_only", value=q.Literal("ON")).as_statement()
+            )
+            if self.reader_time_budget is not None:
+                connection.budget = QueryBudget(self.reader_time_budget)
+                connection.set_progress_handler(
+                    connection.budget, BUDGET_CHECK_INTERVAL
+                )
+        return connection
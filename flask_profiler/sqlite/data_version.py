@@ -0,0 +1,29 @@
+"""The data_version table holds a single counter that every transaction
+storing or deleting measurements increases.  Results computed from the
+measurements are unchanged as long as the counter is, apart from
+measurements that were stored with changes_data_version unset.
+"""
+from __future__ import annotations
+
+from flask_profiler import query as q
+
+TABLE = q.Identifier("data_version")
+
+
+def increment_statement() -> q.Update:
+    return q.Update(
+        table=TABLE,
+        assignments=[
+            (
+                q.Identifier("version"),
+                q.BinaryOp("+", q.Identifier("version"), q.Literal(1)),
+            )
+        ],
+    )
+
+
+def select_statement() -> q.Select:
+    return q.Select(
+        selector=q.SelectorList([q.Identifier("version")]),
+        from_clause=TABLE,
+    )
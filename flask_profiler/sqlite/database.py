@@ -2,92 +2,556 @@ from __future__ import annotations
 
 import logging
 import sqlite3
+from collections import defaultdict
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from urllib.parse import quote, unquote
+from typing import Dict, List, Mapping, Optional, Tuple
 
 from flask_profiler import query as q
 from flask_profiler.entities import measurement_archive as interface
 
+from . import data_version, partitions, rollups, route_catalog
+from .connection_pool import ConnectionPool
 from .migrations import Migrations
+from .routes import Route
 from .select_query import RecordResult
 
 LOGGER = logging.getLogger(__name__)
+# Every row has 5 values, stay below the default limit of 999 bound
+# parameters per statement of older sqlite versions.
+MAX_ROWS_PER_INSERT = 190
+AUTO_VACUUM_INCREMENTAL = 2
 
 
-class Row(sqlite3.Row):
-    def __str__(self) -> str:
-        values = [f"{key}: {self[key]}" for key in self.keys()]
-        return f'<Row {", ".join(values)}>'
+@dataclass(frozen=True)
+class DeletedMeasurements:
+    """count measurements were deleted, the oldest and newest of them
+    started at the given timestamps.
+    """
+
+    count: int = 0
+    oldest: Optional[float] = None
+    newest: Optional[float] = None
+
+    def merge(self, other: DeletedMeasurements) -> DeletedMeasurements:
+        return DeletedMeasurements(
+            count=self.count + other.count,
+            oldest=min(
+                (
+                    timestamp
+                    for timestamp in [self.oldest, other.oldest]
+                    if timestamp is not None
+                ),
+                default=None,
+            ),
+            newest=max(
+                (
+                    timestamp
+                    for timestamp in [self.newest, other.newest]
+                    if timestamp is not None
+                ),
+                default=None,
+            ),
+        )
 
 
 class Sqlite:
-    def __init__(self, sqlite_file: str) -> None:
+    """Measurement storage backed by a sqlite database.  Connections
+    are borrowed from the given connection pool.  If no pool is
+    given, the instance creates its own pool and closes it together
+    with the connection.
+    """
+
+    def __init__(
+        self,
+        sqlite_file: str,
+        pool: Optional[ConnectionPool] = None,
+        partitioning: Optional[partitions.Partitioning] = None,
+    ) -> None:
         self.sqlite_file = sqlite_file
-        self.connection = sqlite3.connect(self.sqlite_file, check_same_thread=False)
-        self.connection.row_factory = Row
+        self.owns_pool = pool is None
+        self.pool = pool or ConnectionPool(sqlite_file)
+        self.partitioning = partitioning
+        self.routes = self.pool.routes
+        self.connection = self.pool.acquire_reader()
         self.cursor = self.connection.cursor()
 
     def create_database(self) -> None:
         LOGGER.info("Check if DB migrations need to be run")
-        migrations = Migrations(self.connection)
-        migrations.run_necessary_migrations()
+        with self.pool.writer() as connection:
+            migrations = Migrations(connection)
+            migrations.run_necessary_migrations()
 
     def record_measurement(self, measurement: interface.Measurement) -> int:
         LOGGER.debug("Recording measurement %s", measurement)
-        query = q.Insert(
-            into=q.Identifier("measurements"),
-            columns=[
-                q.Identifier("route_name"),
-                q.Identifier("start_timestamp"),
-                q.Identifier("end_timestamp"),
-                q.Identifier("method"),
-            ],
-            rows=[
+        (id_,) = self._record([measurement])
+        return id_
+
+    def record_measurements(self, measurements: List[interface.Measurement]) -> None:
+        LOGGER.debug("Recording %s measurements", len(measurements))
+        if not measurements:
+            return
+        self._record(measurements)
+
+    def _record(self, measurements: List[interface.Measurement]) -> List[int]:
+        with self.pool.writer() as connection:
+            route_ids = self._route_ids(connection, measurements)
+            try:
+                with connection:
+                    ids = self._insert_measurements(connection, measurements, route_ids)
+                    self._update_rollups(connection, measurements, route_ids)
+                    self._update_route_catalog(connection, measurements, route_ids)
+                    if any(m.changes_data_version for m in measurements):
+                        self._increment_data_version(connection)
+            except sqlite3.Error:
+                # Partitions created by the failed transaction are gone.
+                self.pool.partitions.clear()
+                raise
+        return ids
+
+    def _route_ids(
+        self,
+        connection: sqlite3.Connection,
+        measurements: List[interface.Measurement],
+    ) -> Mapping[Route, int]:
+        return self.routes.ids_of(
+            connection,
+            {
+                (measurement.route_name, measurement.method)
+                for measurement in measurements
+            },
+        )
+
+    def _update_rollups(
+        self,
+        connection: sqlite3.Connection,
+        measurements: List[interface.Measurement],
+        route_ids: Mapping[Route, int],
+    ) -> None:
+        for level in rollups.LEVELS:
+            for statement in rollups.upsert_statements(level, measurements, route_ids):
+                connection.execute(str(statement), statement.parameters())
+
+    def _update_route_catalog(
+        self,
+        connection: sqlite3.Connection,
+        measurements: List[interface.Measurement],
+        route_ids: Mapping[Route, int],
+    ) -> None:
+        for statement in route_catalog.upsert_statements(measurements, route_ids):
+            connection.execute(str(statement), statement.parameters())
+
+    def _increment_data_version(self, connection: sqlite3.Connection) -> None:
+        statement = data_version.increment_statement()
+        connection.execute(str(statement), statement.parameters())
+
+    def _insert_measurements(
+        self,
+        connection: sqlite3.Connection,
+        measurements: List[interface.Measurement],
+        route_ids: Mapping[Route, int],
+    ) -> List[int]:
+        """Insert the measurements into the partitions they belong to
+        and return their ids.
+        """
+        first_id = self._allocate_ids(connection, len(measurements))
+        ids = list(range(first_id, first_id + len(measurements)))
+        rows: Dict[partitions.Partition, List[List[q.Expression]]] = defaultdict(list)
+        for id_, measurement in zip(ids, measurements):
+            rows[self._partition_for(measurement)].append(
                 [
-                    q.Literal(quote(measurement.route_name)),
+                    q.Literal(id_),
+                    q.Literal(route_ids[measurement.route_name, measurement.method]),
                     q.Literal(measurement.start_timestamp.timestamp()),
-                    q.Literal(measurement.end_timestamp.timestamp()),
-                    q.Literal(quote(measurement.method)),
+                    q.Literal(measurement.elapsed_ns),
+                    q.Literal(measurement.weight),
                 ]
+            )
+        if self.partitioning is not None:
+            # Allocating the ids began the transaction, so no other
+            # connection changes the schema until it ends.
+            self.pool.partitions.create_missing(connection, rows)
+        for partition, table_rows in rows.items():
+            for start in range(0, len(table_rows), MAX_ROWS_PER_INSERT):
+                end = start + MAX_ROWS_PER_INSERT
+                statement = q.Insert(
+                    into=q.Identifier(partition.table),
+                    columns=[
+                        q.Identifier("ID"),
+                        q.Identifier("route_id"),
+                        q.Identifier("start_timestamp"),
+                        q.Identifier("elapsed_ns"),
+                        q.Identifier("weight"),
+                    ],
+                    rows=table_rows[start:end],
+                )
+                connection.execute(str(statement), statement.parameters())
+        return ids
+
+    def _allocate_ids(self, connection: sqlite3.Connection, count: int) -> int:
+        """Reserve count consecutive ids from the sequence of the
+        measurements table so that ids are unique across partitions.
+        Returns the first of them.
+        """
+        statement = q.Update(
+            table=q.Identifier("sqlite_sequence"),
+            assignments=[
+                (
+                    q.Identifier("seq"),
+                    q.BinaryOp("+", q.Identifier("seq"), q.Literal(count)),
+                )
             ],
-            returning=q.All(),
+            where=q.BinaryOp(
+                "=", q.Identifier("name"), q.Literal(partitions.MEASUREMENTS)
+            ),
+            returning=q.SelectorList([q.Identifier("seq")]),
         )
-        result = self.cursor.execute(str(query)).fetchone()
-        self.connection.commit()
-        return result["ID"]
+        rows = connection.execute(str(statement), statement.parameters()).fetchall()
+        if rows:
+            return rows[0]["seq"] - count + 1
+        # The sequence is created by the first insert into the table.
+        insert = q.Insert(
+            into=q.Identifier("sqlite_sequence"),
+            columns=[q.Identifier("name"), q.Identifier("seq")],
+            rows=[[q.Literal(partitions.MEASUREMENTS), q.Literal(count)]],
+        )
+        connection.execute(str(insert), insert.parameters())
+        return 1
 
-    def get_records(self) -> RecordResult:
-        return RecordResult(
-            db=self.cursor,
-            mapping=self._row_to_record,
-            query=q.Select(
-                selector=q.SelectorList(
-                    [
-                        q.All(),
-                        q.Alias(
-                            expression=q.BinaryOp(
-                                "-",
-                                q.Identifier("end_timestamp"),
-                                q.Identifier("start_timestamp"),
+    def _partition_for(
+        self, measurement: interface.Measurement
+    ) -> partitions.Partition:
+        if self.partitioning is None:
+            return partitions.UNPARTITIONED
+        return self.partitioning.partition_for(measurement.start_timestamp.timestamp())
+
+    def nth_newest_start_timestamp(self, n: int) -> Optional[datetime]:
+        query = q.Select(
+            selector=q.SelectorList([q.Identifier("start_timestamp")]),
+            from_clause=partitions.load(self.connection),
+            order_by=[q.Desc(q.Identifier("start_timestamp"))],
+            limit_clause=1,
+            offset_clause=n,
+        )
+        row = self.connection.execute(str(query), query.parameters()).fetchone()
+        if row is None:
+            return None
+        return datetime.fromtimestamp(row["start_timestamp"], tz=timezone.utc)
+
+    def delete_measurements_until(self, timestamp: datetime, limit: int) -> int:
+        """Partitions that only hold measurements up to timestamp are
+        dropped as a whole, regardless of limit.  Rollup buckets that
+        held deleted measurements are rebuilt from the remaining ones,
+        so summaries stay equal to those of the raw measurements.  The
+        route catalog is kept exact.
+        """
+        until = timestamp.timestamp()
+        deleted = DeletedMeasurements()
+        with self.pool.writer() as connection, connection:
+            for partition in partitions.load(connection).partitions:
+                if deleted.count >= limit:
+                    break
+                if partition.ends_until(until):
+                    deleted = deleted.merge(self._drop_partition(connection, partition))
+                elif partition.intersects(None, until):
+                    deleted = deleted.merge(
+                        self._delete_oldest(
+                            connection, partition, until, limit - deleted.count
+                        )
+                    )
+            if deleted.oldest is not None and deleted.newest is not None:
+                self._rebuild_rollups(connection, deleted.oldest, deleted.newest)
+                self._refresh_first_seen(connection, until)
+                self._increment_data_version(connection)
+        return deleted.count
+
+    def _drop_partition(
+        self, connection: sqlite3.Connection, partition: partitions.Partition
+    ) -> DeletedMeasurements:
+        table = q.Identifier(partition.table)
+        deleted = self._measurements_in(connection, table)
+        self._subtract_from_route_catalog(connection, table)
+        LOGGER.info("Dropping partition %s", partition.table)
+        for statement in partitions.drop_statements(partition):
+            connection.execute(statement.as_statement(), statement.parameters())
+        return deleted
+
+    def _delete_oldest(
+        self,
+        connection: sqlite3.Connection,
+        partition: partitions.Partition,
+        until: float,
+        limit: int,
+    ) -> DeletedMeasurements:
+        table = q.Identifier(partition.table)
+        # Ties are broken by ID so that the catalog, the rollups and the
+        # deletion see the same rows.
+        oldest = q.Select(
+            selector=q.SelectorList([q.Identifier("ID")]),
+            from_clause=table,
+            where_clause=q.BinaryOp(
+                "<=", q.Identifier("start_timestamp"), q.Literal(until)
+            ),
+            order_by=[
+                q.Asc(q.Identifier("start_timestamp")),
+                q.Asc(q.Identifier("ID")),
+            ],
+            limit_clause=limit,
+        )
+        condition = q.BinaryOp("IN", q.Identifier("ID"), oldest)
+        deleted = self._measurements_in(connection, table, condition)
+        self._subtract_from_route_catalog(connection, table, condition)
+        statement = q.Delete(table=table, where=condition)
+        connection.execute(str(statement), statement.parameters())
+        return deleted
+
+    def _measurements_in(
+        self,
+        connection: sqlite3.Connection,
+        table: q.Identifier,
+        condition: Optional[q.Expression] = None,
+    ) -> DeletedMeasurements:
+        query = q.Select(
+            selector=q.SelectorList(
+                [
+                    q.Aggregate("COUNT", q.All()),
+                    q.Aggregate("MIN", q.Identifier("start_timestamp")),
+                    q.Aggregate("MAX", q.Identifier("start_timestamp")),
+                ]
+            ),
+            from_clause=table,
+            where_clause=condition,
+        )
+        count, oldest, newest = connection.execute(
+            str(query), query.parameters()
+        ).fetchone()
+        return DeletedMeasurements(count=count, oldest=oldest, newest=newest)
+
+    def _rebuild_rollups(
+        self, connection: sqlite3.Connection, oldest: float, newest: float
+    ) -> None:
+        """Rebuild the buckets of every rollup level that overlap
+        [oldest, newest].  The finest level is rebuilt from the
+        remaining measurements, every coarser level from the level
+        below it, so only the edges of the range are read from raw
+        rows.
+        """
+        finer: Optional[rollups.RollupLevel] = None
+        for level in reversed(rollups.LEVELS):
+            since = level.floor(oldest)
+            until = level.floor(newest) + level.width
+            if finer is None:
+                parts = self._measurement_parts(connection, since, until)
+            else:
+                parts = self._rollup_parts(connection, finer, since, until)
+            buckets = rollups.aggregate(level, parts)
+            for statement in rollups.rebuild_statements(level, since, until, buckets):
+                connection.execute(statement.as_statement(), statement.parameters())
+            finer = level
+
+    def _measurement_parts(
+        self, connection: sqlite3.Connection, since: float, until: float
+    ) -> List[Tuple[int, float, rollups.Bucket]]:
+        query = q.Select(
+            selector=q.SelectorList(
+                [
+                    q.Identifier("route_id"),
+                    q.Identifier("start_timestamp"),
+                    q.Identifier("elapsed_ns"),
+                    q.Identifier("weight"),
+                ]
+            ),
+            from_clause=partitions.load(connection).intersecting(since, until),
+            where_clause=_in_range(q.Identifier("start_timestamp"), since, until),
+        )
+        return [
+            (
+                row["route_id"],
+                row["start_timestamp"],
+                rollups.Bucket.from_values(
+                    start=row["start_timestamp"],
+                    elapsed=row["elapsed_ns"] / interface.NANOSECONDS_PER_SECOND,
+                    weight=row["weight"],
+                ),
+            )
+            for row in connection.execute(str(query), query.parameters())
+        ]
+
+    def _rollup_parts(
+        self,
+        connection: sqlite3.Connection,
+        level: rollups.RollupLevel,
+        since: float,
+        until: float,
+    ) -> List[Tuple[int, float, rollups.Bucket]]:
+        query = q.Select(
+            selector=q.All(),
+            from_clause=q.Identifier(level.table),
+            where_clause=_in_range(q.Identifier("bucket"), since, until),
+        )
+        return [
+            (row["route_id"], row["bucket"], rollups.Bucket.from_row(row))
+            for row in connection.execute(str(query), query.parameters())
+        ]
+
+    def _subtract_from_route_catalog(
+        self,
+        connection: sqlite3.Connection,
+        table: q.Identifier,
+        condition: Optional[q.Expression] = None,
+    ) -> None:
+        """Subtract the measurements of table that match condition from
+        the totals of their routes.
+        """
+        query = q.Select(
+            selector=q.SelectorList(
+                [
+                    q.Identifier("route_id"),
+                    q.Alias(
+                        q.Aggregate("SUM", q.Identifier("weight")),
+                        q.Identifier("count"),
+                    ),
+                    q.Alias(
+                        q.Aggregate(
+                            "SUM",
+                            q.BinaryOp(
+                                "*", q.Identifier("elapsed_ns"), q.Identifier("weight")
                             ),
-                            name=q.Identifier("elapsed"),
                         ),
-                    ]
+                        q.Identifier("elapsed_ns"),
+                    ),
+                ]
+            ),
+            from_clause=table,
+            where_clause=condition,
+            group_by=q.ExpressionList([q.Identifier("route_id")]),
+        )
+        for row in connection.execute(str(query), query.parameters()).fetchall():
+            statement = route_catalog.subtract_statement(
+                row["route_id"],
+                route_catalog.Totals(
+                    count=row["count"],
+                    elapsed=row["elapsed_ns"] / interface.NANOSECONDS_PER_SECOND,
+                ),
+            )
+            connection.execute(str(statement), statement.parameters())
+
+    def _refresh_first_seen(self, connection: sqlite3.Connection, until: float) -> None:
+        """Only routes first seen up to until can have lost their first
+        measurement.  Their new first measurement is looked up in the
+        route_id index of every partition.
+        """
+        query = q.Select(
+            selector=q.SelectorList([q.Identifier("route_id")]),
+            from_clause=route_catalog.TABLE,
+            where_clause=q.BinaryOp("<=", q.Identifier("first_seen"), q.Literal(until)),
+        )
+        route_ids = [
+            row["route_id"]
+            for row in connection.execute(str(query), query.parameters()).fetchall()
+        ]
+        remaining = partitions.load(connection).partitions
+        for route_id in route_ids:
+            first_seen = min(
+                (
+                    timestamp
+                    for partition in remaining
+                    if (
+                        timestamp := self._first_seen_in(
+                            connection, partition, route_id
+                        )
+                    )
+                    is not None
                 ),
-                from_clause=q.Identifier("measurements"),
+                default=None,
+            )
+            statement = route_catalog.first_seen_statement(route_id, first_seen)
+            connection.execute(statement.as_statement(), statement.parameters())
+
+    def _first_seen_in(
+        self,
+        connection: sqlite3.Connection,
+        partition: partitions.Partition,
+        route_id: int,
+    ) -> Optional[float]:
+        query = q.Select(
+            selector=q.SelectorList(
+                [q.Aggregate("MIN", q.Identifier("start_timestamp"))]
             ),
+            from_clause=q.Identifier(partition.table),
+            where_clause=q.BinaryOp("=", q.Identifier("route_id"), q.Literal(route_id)),
+        )
+        return connection.execute(str(query), query.parameters()).fetchone()[0]
+
+    def reclaim_space(self) -> None:
+        """Give the pages of deleted rows back to the file system.  This
+        is only possible for databases that were created with
+        incremental auto vacuum, others reuse the pages for new rows.
+        """
+        with self.pool.writer() as connection:
+            mode = connection.execute(str(q.Pragma(name="auto_vacuum"))).fetchone()[0]
+            if mode != AUTO_VACUUM_INCREMENTAL:
+                return
+            # The pragma frees one page per step of the statement, but
+            # execute() only steps once, executescript() runs it to the end.
+            connection.executescript(q.Pragma(name="incremental_vacuum").as_statement())
+
+    def get_records(self) -> RecordResult:
+        all_partitions = partitions.load(self.connection)
+        return RecordResult(
+            db=self.cursor,
+            budget=self.connection.budget,
+            mapping=self._row_to_record,
+            query=q.Select(selector=q.All(), from_clause=all_partitions),
+            partitions=all_partitions,
         )
 
+    def get_route_catalog(self) -> List[interface.RouteCatalogEntry]:
+        query = q.Select(selector=q.All(), from_clause=route_catalog.TABLE)
+        entries = []
+        for row in self.connection.execute(str(query), query.parameters()).fetchall():
+            name, method = self.routes.route_of(self.connection, row["route_id"])
+            entries.append(
+                interface.RouteCatalogEntry(
+                    name=name,
+                    method=method,
+                    first_seen=datetime.fromtimestamp(
+                        row["first_seen"], tz=timezone.utc
+                    ),
+                    last_seen=datetime.fromtimestamp(row["last_seen"], tz=timezone.utc),
+                    total_count=row["total_count"],
+                    total_elapsed=row["total_elapsed"],
+                )
+            )
+        return entries
+
+    def data_version(self) -> int:
+        query = data_version.select_statement()
+        return self.connection.execute(str(query), query.parameters()).fetchone()[0]
+
     def close_connection(self) -> None:
-        self.connection.close()
+        if self.owns_pool:
+            self.pool.close()
+        else:
+            self.pool.release_reader(self.connection)
 
     def _row_to_record(self, row: sqlite3.Row) -> interface.Record:
+        name, method = self.routes.route_of(self.connection, row["route_id"])
         return interface.Record(
             id=row["ID"],
             start_timestamp=datetime.fromtimestamp(
                 row["start_timestamp"], tz=timezone.utc
             ),
-            end_timestamp=datetime.fromtimestamp(row["end_timestamp"], tz=timezone.utc),
-            method=unquote(row["method"]),
-            name=unquote(row["route_name"]),
+            elapsed_ns=row["elapsed_ns"],
+            method=method,
+            name=name,
+            weight=row["weight"],
         )
+
+
+def _in_range(column: q.Expression, since: float, until: float) -> q.Expression:
+    return q.BinaryOp(
+        "AND",
+        q.BinaryOp(">=", column, q.Literal(since)),
+        q.BinaryOp("<", column, q.Literal(until)),
+    )
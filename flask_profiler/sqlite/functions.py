@@ -0,0 +1,78 @@
+"""Functions that are registered on every connection to the database
+so that histograms can be built and merged in SQL and migrations can
+decode values that older versions stored URL quoted.
+"""
+from __future__ import annotations
+
+import sqlite3
+import struct
+from typing import Optional
+from urllib.parse import unquote
+
+from flask_profiler.entities.histogram import Histogram
+
+_BUCKET = struct.Struct("<hd")
+
+
+def encode_histogram(histogram: Histogram) -> bytes:
+    return b"".join(
+        _BUCKET.pack(index, histogram.counts[index])
+        for index in sorted(histogram.counts)
+    )
+
+
+def decode_histogram(data: Optional[bytes]) -> Histogram:
+    if not data:
+        return Histogram()
+    return Histogram(counts=dict(_BUCKET.iter_unpack(data)))
+
+
+def combine_histograms(a: Optional[bytes], b: Optional[bytes]) -> bytes:
+    return encode_histogram(decode_histogram(a).merge(decode_histogram(b)))
+
+
+def url_unquote(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    return unquote(value)
+
+
+class HistogramAggregate:
+    """histogram(elapsed[, weight]): Build a histogram from raw
+    durations, each counted weight times.
+    """
+
+    def __init__(self) -> None:
+        self.histogram = Histogram()
+
+    def step(self, value: Optional[float], weight: float = 1) -> None:
+        if value is not None:
+            self.histogram.add(value, count=weight)
+
+    def finalize(self) -> bytes:
+        return encode_histogram(self.histogram)
+
+
+class HistogramMergeAggregate:
+    """histogram_merge(histogram): Merge encoded histograms."""
+
+    def __init__(self) -> None:
+        self.histogram = Histogram()
+
+    def step(self, data: Optional[bytes]) -> None:
+        self.histogram = self.histogram.merge(decode_histogram(data))
+
+    def finalize(self) -> bytes:
+        return encode_histogram(self.histogram)
+
+
+def register(connection: sqlite3.Connection) -> None:
+    connection.create_aggregate("histogram", 1, HistogramAggregate)  # type: ignore
+    connection.create_aggregate("histogram", 2, HistogramAggregate)  # type: ignore
+    connection.create_aggregate(
+        "histogram_merge", 1, HistogramMergeAggregate  # type: ignore
+    )
+    connection.create_function(
+        "histogram_combine", 2, combine_histograms, deterministic=True
+    )
+    connection.create_function("url_unquote", 1, url_unquote, deterministic=True)
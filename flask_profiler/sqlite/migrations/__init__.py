@@ -8,6 +8,8 @@ from typing import Iterator
 
 from flask_profiler import query as q
 
+from .. import functions
+
 LOGGER = logging.getLogger(__name__)
 
 
@@ -29,10 +31,31 @@ class Migration:
 class Migrations:
     def __init__(self, connection: Connection) -> None:
         self.connection = connection
-        self.migration_files = ["migration_1"]
+        self.migration_files = [
+            "migration_1",
+            "migration_2",
+            "migration_3",
+            "migration_4",
+            "migration_5",
+            "migration_6",
+            "migration_7",
+            "migration_8",
+            "migration_9",
+            "migration_10",
+        ]
 
     def run_necessary_migrations(self) -> None:
+        # Migrations might need the custom functions to backfill data.
+        functions.register(self.connection)
         cursor = self.connection.cursor()
+        if self.get_current_version(cursor) == 0:
+            # Can only be changed before the first table is created.
+            # Allows giving the space of deleted rows back to the OS.
+            cursor.execute(
+                q.Pragma(
+                    name="auto_vacuum", value=q.Literal("INCREMENTAL")
+                ).as_statement()
+            )
         for migration in self.get_relevant_versions(cursor):
             migration.run(cursor)
 
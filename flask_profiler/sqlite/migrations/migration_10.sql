@@ -0,0 +1,8 @@
+BEGIN TRANSACTION;
+CREATE TABLE "data_version" (
+    "ID" INTEGER PRIMARY KEY CHECK ("ID" = 1),
+    "version" INTEGER NOT NULL
+);
+INSERT INTO "data_version" VALUES (1, 0);
+PRAGMA user_version = 10;
+COMMIT TRANSACTION;
@@ -0,0 +1,13 @@
+BEGIN TRANSACTION;
+DROP INDEX "measurement_index";
+CREATE INDEX "measurements_start_timestamp" ON "measurements" (
+    "start_timestamp"
+);
+CREATE INDEX "measurements_route_name_start_timestamp" ON "measurements" (
+    "route_name", "start_timestamp"
+);
+CREATE INDEX "measurements_summary" ON "measurements" (
+    "route_name", "method", "start_timestamp", "end_timestamp"
+);
+PRAGMA user_version = 2;
+COMMIT TRANSACTION;
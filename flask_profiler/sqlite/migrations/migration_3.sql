@@ -0,0 +1,82 @@
+BEGIN TRANSACTION;
+CREATE TABLE "rollup_minute" (
+    "route_name" TEXT NOT NULL,
+    "bucket" INTEGER NOT NULL,
+    "method" TEXT NOT NULL,
+    "count" INTEGER NOT NULL,
+    "elapsed_sum" REAL NOT NULL,
+    "elapsed_min" REAL NOT NULL,
+    "elapsed_max" REAL NOT NULL,
+    "first_start_timestamp" REAL NOT NULL,
+    "last_start_timestamp" REAL NOT NULL,
+    PRIMARY KEY ("route_name", "bucket", "method")
+) WITHOUT ROWID;
+CREATE INDEX "rollup_minute_bucket" ON "rollup_minute" ("bucket");
+CREATE TABLE "rollup_hour" (
+    "route_name" TEXT NOT NULL,
+    "bucket" INTEGER NOT NULL,
+    "method" TEXT NOT NULL,
+    "count" INTEGER NOT NULL,
+    "elapsed_sum" REAL NOT NULL,
+    "elapsed_min" REAL NOT NULL,
+    "elapsed_max" REAL NOT NULL,
+    "first_start_timestamp" REAL NOT NULL,
+    "last_start_timestamp" REAL NOT NULL,
+    PRIMARY KEY ("route_name", "bucket", "method")
+) WITHOUT ROWID;
+CREATE INDEX "rollup_hour_bucket" ON "rollup_hour" ("bucket");
+CREATE TABLE "rollup_day" (
+    "route_name" TEXT NOT NULL,
+    "bucket" INTEGER NOT NULL,
+    "method" TEXT NOT NULL,
+    "count" INTEGER NOT NULL,
+    "elapsed_sum" REAL NOT NULL,
+    "elapsed_min" REAL NOT NULL,
+    "elapsed_max" REAL NOT NULL,
+    "first_start_timestamp" REAL NOT NULL,
+    "last_start_timestamp" REAL NOT NULL,
+    PRIMARY KEY ("route_name", "bucket", "method")
+) WITHOUT ROWID;
+CREATE INDEX "rollup_day_bucket" ON "rollup_day" ("bucket");
+INSERT INTO "rollup_minute"
+SELECT
+    "route_name",
+    CAST("start_timestamp" / 60 AS INTEGER) * 60,
+    "method",
+    COUNT(*),
+    SUM("end_timestamp" - "start_timestamp"),
+    MIN("end_timestamp" - "start_timestamp"),
+    MAX("end_timestamp" - "start_timestamp"),
+    MIN("start_timestamp"),
+    MAX("start_timestamp")
+FROM "measurements"
+WHERE "route_name" IS NOT NULL AND "method" IS NOT NULL
+GROUP BY 1, 2, 3;
+INSERT INTO "rollup_hour"
+SELECT
+    "route_name",
+    "bucket" / 3600 * 3600,
+    "method",
+    SUM("count"),
+    SUM("elapsed_sum"),
+    MIN("elapsed_min"),
+    MAX("elapsed_max"),
+    MIN("first_start_timestamp"),
+    MAX("last_start_timestamp")
+FROM "rollup_minute"
+GROUP BY 1, 2, 3;
+INSERT INTO "rollup_day"
+SELECT
+    "route_name",
+    "bucket" / 86400 * 86400,
+    "method",
+    SUM("count"),
+    SUM("elapsed_sum"),
+    MIN("elapsed_min"),
+    MAX("elapsed_max"),
+    MIN("first_start_timestamp"),
+    MAX("last_start_timestamp")
+FROM "rollup_hour"
+GROUP BY 1, 2, 3;
+PRAGMA user_version = 3;
+COMMIT TRANSACTION;
@@ -0,0 +1,30 @@
+BEGIN TRANSACTION;
+ALTER TABLE "rollup_minute" ADD COLUMN "histogram" BLOB;
+ALTER TABLE "rollup_hour" ADD COLUMN "histogram" BLOB;
+ALTER TABLE "rollup_day" ADD COLUMN "histogram" BLOB;
+UPDATE "rollup_minute" SET "histogram" = (
+    SELECT histogram("end_timestamp" - "start_timestamp")
+    FROM "measurements"
+    WHERE "measurements"."route_name" = "rollup_minute"."route_name"
+    AND "measurements"."method" = "rollup_minute"."method"
+    AND "measurements"."start_timestamp" >= "rollup_minute"."bucket"
+    AND "measurements"."start_timestamp" < "rollup_minute"."bucket" + 60
+);
+UPDATE "rollup_hour" SET "histogram" = (
+    SELECT histogram_merge("finer"."histogram")
+    FROM "rollup_minute" AS "finer"
+    WHERE "finer"."route_name" = "rollup_hour"."route_name"
+    AND "finer"."method" = "rollup_hour"."method"
+    AND "finer"."bucket" >= "rollup_hour"."bucket"
+    AND "finer"."bucket" < "rollup_hour"."bucket" + 3600
+);
+UPDATE "rollup_day" SET "histogram" = (
+    SELECT histogram_merge("finer"."histogram")
+    FROM "rollup_hour" AS "finer"
+    WHERE "finer"."route_name" = "rollup_day"."route_name"
+    AND "finer"."method" = "rollup_day"."method"
+    AND "finer"."bucket" >= "rollup_day"."bucket"
+    AND "finer"."bucket" < "rollup_day"."bucket" + 86400
+);
+PRAGMA user_version = 4;
+COMMIT TRANSACTION;
@@ -0,0 +1,8 @@
+BEGIN TRANSACTION;
+ALTER TABLE "measurements" ADD COLUMN "weight" REAL NOT NULL DEFAULT 1;
+DROP INDEX "measurements_summary";
+CREATE INDEX "measurements_summary" ON "measurements" (
+    "route_name", "method", "start_timestamp", "end_timestamp", "weight"
+);
+PRAGMA user_version = 5;
+COMMIT TRANSACTION;
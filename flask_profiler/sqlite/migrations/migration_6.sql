@@ -0,0 +1,13 @@
+BEGIN TRANSACTION;
+ALTER TABLE "measurements" ADD COLUMN "elapsed_ns" INTEGER NOT NULL DEFAULT 0;
+UPDATE "measurements"
+SET "elapsed_ns" = CAST(
+    ROUND(("end_timestamp" - "start_timestamp") * 1000000000) AS INTEGER
+)
+WHERE "end_timestamp" IS NOT NULL AND "start_timestamp" IS NOT NULL;
+DROP INDEX "measurements_summary";
+CREATE INDEX "measurements_summary" ON "measurements" (
+    "route_name", "method", "start_timestamp", "elapsed_ns", "weight"
+);
+PRAGMA user_version = 6;
+COMMIT TRANSACTION;
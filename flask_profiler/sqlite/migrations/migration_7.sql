@@ -0,0 +1,130 @@
+BEGIN TRANSACTION;
+CREATE TABLE "routes" (
+    "ID" INTEGER PRIMARY KEY,
+    "route_name" TEXT NOT NULL,
+    "method" TEXT NOT NULL,
+    UNIQUE ("route_name", "method")
+);
+INSERT INTO "routes" ("route_name", "method")
+SELECT DISTINCT url_unquote("route_name"), url_unquote("method")
+FROM "measurements"
+WHERE "route_name" IS NOT NULL AND "method" IS NOT NULL;
+CREATE TABLE "measurements_new" (
+    "ID" INTEGER PRIMARY KEY AUTOINCREMENT,
+    "route_id" INTEGER NOT NULL,
+    "start_timestamp" REAL NOT NULL,
+    "elapsed_ns" INTEGER NOT NULL,
+    "weight" REAL NOT NULL DEFAULT 1
+);
+INSERT INTO "measurements_new"
+SELECT
+    "measurements"."ID",
+    "routes"."ID",
+    "measurements"."start_timestamp",
+    "measurements"."elapsed_ns",
+    "measurements"."weight"
+FROM "measurements"
+JOIN "routes"
+ON "routes"."route_name" = url_unquote("measurements"."route_name")
+AND "routes"."method" = url_unquote("measurements"."method")
+WHERE "measurements"."start_timestamp" IS NOT NULL;
+DROP TABLE "measurements";
+ALTER TABLE "measurements_new" RENAME TO "measurements";
+CREATE INDEX "measurements_start_timestamp" ON "measurements" (
+    "start_timestamp"
+);
+CREATE INDEX "measurements_summary" ON "measurements" (
+    "route_id", "start_timestamp", "elapsed_ns", "weight"
+);
+CREATE TABLE "rollup_minute_new" (
+    "route_id" INTEGER NOT NULL,
+    "bucket" INTEGER NOT NULL,
+    "count" REAL NOT NULL,
+    "elapsed_sum" REAL NOT NULL,
+    "elapsed_min" REAL NOT NULL,
+    "elapsed_max" REAL NOT NULL,
+    "first_start_timestamp" REAL NOT NULL,
+    "last_start_timestamp" REAL NOT NULL,
+    "histogram" BLOB,
+    PRIMARY KEY ("route_id", "bucket")
+) WITHOUT ROWID;
+INSERT INTO "rollup_minute_new"
+SELECT
+    "routes"."ID",
+    "rollup_minute"."bucket",
+    "rollup_minute"."count",
+    "rollup_minute"."elapsed_sum",
+    "rollup_minute"."elapsed_min",
+    "rollup_minute"."elapsed_max",
+    "rollup_minute"."first_start_timestamp",
+    "rollup_minute"."last_start_timestamp",
+    "rollup_minute"."histogram"
+FROM "rollup_minute"
+JOIN "routes"
+ON "routes"."route_name" = url_unquote("rollup_minute"."route_name")
+AND "routes"."method" = url_unquote("rollup_minute"."method");
+DROP TABLE "rollup_minute";
+ALTER TABLE "rollup_minute_new" RENAME TO "rollup_minute";
+CREATE INDEX "rollup_minute_bucket" ON "rollup_minute" ("bucket");
+CREATE TABLE "rollup_hour_new" (
+    "route_id" INTEGER NOT NULL,
+    "bucket" INTEGER NOT NULL,
+    "count" REAL NOT NULL,
+    "elapsed_sum" REAL NOT NULL,
+    "elapsed_min" REAL NOT NULL,
+    "elapsed_max" REAL NOT NULL,
+    "first_start_timestamp" REAL NOT NULL,
+    "last_start_timestamp" REAL NOT NULL,
+    "histogram" BLOB,
+    PRIMARY KEY ("route_id", "bucket")
+) WITHOUT ROWID;
+INSERT INTO "rollup_hour_new"
+SELECT
+    "routes"."ID",
+    "rollup_hour"."bucket",
+    "rollup_hour"."count",
+    "rollup_hour"."elapsed_sum",
+    "rollup_hour"."elapsed_min",
+    "rollup_hour"."elapsed_max",
+    "rollup_hour"."first_start_timestamp",
+    "rollup_hour"."last_start_timestamp",
+    "rollup_hour"."histogram"
+FROM "rollup_hour"
+JOIN "routes"
+ON "routes"."route_name" = url_unquote("rollup_hour"."route_name")
+AND "routes"."method" = url_unquote("rollup_hour"."method");
+DROP TABLE "rollup_hour";
+ALTER TABLE "rollup_hour_new" RENAME TO "rollup_hour";
+CREATE INDEX "rollup_hour_bucket" ON "rollup_hour" ("bucket");
+CREATE TABLE "rollup_day_new" (
+    "route_id" INTEGER NOT NULL,
+    "bucket" INTEGER NOT NULL,
+    "count" REAL NOT NULL,
+    "elapsed_sum" REAL NOT NULL,
+    "elapsed_min" REAL NOT NULL,
+    "elapsed_max" REAL NOT NULL,
+    "first_start_timestamp" REAL NOT NULL,
+    "last_start_timestamp" REAL NOT NULL,
+    "histogram" BLOB,
+    PRIMARY KEY ("route_id", "bucket")
+) WITHOUT ROWID;
+INSERT INTO "rollup_day_new"
+SELECT
+    "routes"."ID",
+    "rollup_day"."bucket",
+    "rollup_day"."count",
+    "rollup_day"."elapsed_sum",
+    "rollup_day"."elapsed_min",
+    "rollup_day"."elapsed_max",
+    "rollup_day"."first_start_timestamp",
+    "rollup_day"."last_start_timestamp",
+    "rollup_day"."histogram"
+FROM "rollup_day"
+JOIN "routes"
+ON "routes"."route_name" = url_unquote("rollup_day"."route_name")
+AND "routes"."method" = url_unquote("rollup_day"."method");
+DROP TABLE "rollup_day";
+ALTER TABLE "rollup_day_new" RENAME TO "rollup_day";
+CREATE INDEX "rollup_day_bucket" ON "rollup_day" ("bucket");
+PRAGMA user_version = 7;
+COMMIT TRANSACTION;
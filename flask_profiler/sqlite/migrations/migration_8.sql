@@ -0,0 +1,10 @@
+BEGIN TRANSACTION;
+CREATE TABLE "partitions" (
+    "name" TEXT PRIMARY KEY,
+    "since" REAL,
+    "until" REAL
+);
+INSERT INTO "partitions" ("name", "since", "until")
+VALUES ('measurements', NULL, NULL);
+PRAGMA user_version = 8;
+COMMIT TRANSACTION;
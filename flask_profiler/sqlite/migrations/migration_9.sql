@@ -0,0 +1,19 @@
+BEGIN TRANSACTION;
+CREATE TABLE "route_catalog" (
+    "route_id" INTEGER PRIMARY KEY,
+    "first_seen" REAL NOT NULL,
+    "last_seen" REAL NOT NULL,
+    "total_count" REAL NOT NULL,
+    "total_elapsed" REAL NOT NULL
+);
+INSERT INTO "route_catalog"
+SELECT
+    "route_id",
+    MIN("first_start_timestamp"),
+    MAX("last_start_timestamp"),
+    SUM("count"),
+    SUM("elapsed_sum")
+FROM "rollup_minute"
+GROUP BY "route_id";
+PRAGMA user_version = 9;
+COMMIT TRANSACTION;
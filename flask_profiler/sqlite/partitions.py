@@ -0,0 +1,233 @@
+"""Measurements can be spread over several tables, each holding the
+measurements of one period of time.  Every such partition is listed in
+the "partitions" table.  The "measurements" table itself is a partition
+without bounds so that databases without partitioning need no special
+treatment.  All partitions have the same columns in the same order.
+"""
+from __future__ import annotations
+
+import math
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable, List, Optional, Set
+
+from flask_profiler import query as q
+
+MEASUREMENTS = "measurements"
+
+
+@dataclass(frozen=True)
+class Partition:
+    """A table holding the measurements that started in [since, until).
+    A bound of None means that the partition is unbounded on that side.
+    """
+
+    table: str
+    since: Optional[float] = None
+    until: Optional[float] = None
+
+    def intersects(self, since: Optional[float], until: Optional[float]) -> bool:
+        return (since is None or self.until is None or since < self.until) and (
+            until is None or self.since is None or self.since < until
+        )
+
+    def ends_until(self, timestamp: float) -> bool:
+        """True if every measurement of the partition started at or
+        before timestamp.
+        """
+        return self.until is not None and self.until <= timestamp
+
+
+UNPARTITIONED = Partition(table=MEASUREMENTS)
+
+
+@dataclass(frozen=True)
+class Partitions:
+    """Reads the union of the given partitions under the name
+    "measurements" so that queries do not need to know about them.
+    """
+
+    partitions: List[Partition]
+
+    def intersecting(
+        self, since: Optional[float], until: Optional[float]
+    ) -> Partitions:
+        return Partitions(
+            [
+                partition
+                for partition in self.partitions
+                if partition.intersects(since, until)
+            ]
+        )
+
+    def as_from_clause(self) -> str:
+        name = q.Identifier(MEASUREMENTS)
+        if len(self.partitions) == 1:
+            (partition,) = self.partitions
+            if partition.table == MEASUREMENTS:
+                return name.as_from_clause()
+            return f"{q.Identifier(partition.table)} AS {name}"
+        # An empty list never happens since the measurements table is
+        # unbounded, it is read like any other partition.
+        union = q.UnionAll(
+            [
+                q.Select(selector=q.All(), from_clause=q.Identifier(partition.table))
+                for partition in self.partitions
+            ]
+        )
+        return q.Alias(union, name).as_from_clause()
+
+    def parameters(self) -> List[Any]:
+        return []
+
+
+@dataclass(frozen=True)
+class Partitioning:
+    """Write measurements into one table per period of the given number
+    of days.  Periods are aligned to the unix epoch.  The length of the
+    period is part of the table name, so changing it later creates
+    new partitions that may overlap with the existing ones.
+    """
+
+    days: int
+
+    @property
+    def width(self) -> int:
+        return self.days * 24 * 60 * 60
+
+    def partition_for(self, timestamp: float) -> Partition:
+        since = math.floor(timestamp / self.width) * self.width
+        day = datetime.fromtimestamp(since, tz=timezone.utc).strftime("%Y%m%d")
+        return Partition(
+            table=f"{MEASUREMENTS}_{day}_{self.days}d",
+            since=since,
+            until=since + self.width,
+        )
+
+
+class PartitionCache:
+    """Process wide record of the partitions that are known to exist, so
+    that a partition is only created the first time measurements are
+    written to it.  Other processes and retention may drop partitions,
+    so the record is discarded whenever the schema version of the
+    database changed since it was last checked.
+    """
+
+    def __init__(self) -> None:
+        self._schema_version: Optional[int] = None
+        self._tables: Set[str] = set()
+
+    def create_missing(
+        self, connection: sqlite3.Connection, required: Iterable[Partition]
+    ) -> None:
+        """Create the required partitions that are not known to exist.
+        Must be called with the writer connection in the transaction
+        that writes to them.
+        """
+        if _schema_version(connection) != self._schema_version:
+            self._tables = set()
+        for partition in required:
+            if partition.table in self._tables:
+                continue
+            # Dropped partitions are created again if a late
+            # measurement still belongs to them.
+            for statement in create_statements(partition):
+                connection.execute(statement.as_statement(), statement.parameters())
+            self._tables.add(partition.table)
+        self._schema_version = _schema_version(connection)
+
+    def clear(self) -> None:
+        """Forget all partitions, for example after the transaction that
+        created some of them was rolled back.
+        """
+        self._schema_version = None
+        self._tables = set()
+
+
+def _schema_version(connection: sqlite3.Connection) -> int:
+    return connection.execute(
+        q.Pragma(name="schema_version").as_statement()
+    ).fetchone()[0]
+
+
+def load(connection: sqlite3.Connection) -> Partitions:
+    query = q.Select(
+        selector=q.All(),
+        from_clause=q.Identifier("partitions"),
+        order_by=[q.Asc(q.Identifier("since"))],
+    )
+    return Partitions(
+        [
+            Partition(table=row["name"], since=row["since"], until=row["until"])
+            for row in connection.execute(str(query), query.parameters())
+        ]
+    )
+
+
+def create_statements(partition: Partition) -> List[q.Statement]:
+    table = q.Identifier(partition.table)
+    return [
+        q.CreateTable(
+            name=table,
+            columns=[
+                q.ColumnDefinition(
+                    q.Identifier("ID"), q.ColumnType.INTEGER, [q.PrimaryKey()]
+                ),
+                q.ColumnDefinition(
+                    q.Identifier("route_id"), q.ColumnType.INTEGER, [q.not_null]
+                ),
+                q.ColumnDefinition(
+                    q.Identifier("start_timestamp"), q.ColumnType.REAL, [q.not_null]
+                ),
+                q.ColumnDefinition(
+                    q.Identifier("elapsed_ns"), q.ColumnType.INTEGER, [q.not_null]
+                ),
+                q.ColumnDefinition(
+                    q.Identifier("weight"), q.ColumnType.REAL, [q.not_null]
+                ),
+            ],
+            if_not_exists=True,
+        ),
+        q.CreateIndex(
+            name=q.Identifier(f"{partition.table}_start_timestamp"),
+            on=table,
+            indices=[q.IndexDefinition(q.Identifier("start_timestamp"))],
+            if_not_exists=True,
+        ),
+        q.CreateIndex(
+            name=q.Identifier(f"{partition.table}_summary"),
+            on=table,
+            indices=[
+                q.IndexDefinition(q.Identifier(column))
+                for column in ["route_id", "start_timestamp", "elapsed_ns", "weight"]
+            ],
+            if_not_exists=True,
+        ),
+        q.Insert(
+            into=q.Identifier("partitions"),
+            columns=[
+                q.Identifier("name"),
+                q.Identifier("since"),
+                q.Identifier("until"),
+            ],
+            rows=[
+                [
+                    q.Literal(partition.table),
+                    q.Literal(partition.since),
+                    q.Literal(partition.until),
+                ]
+            ],
+            on_conflict=q.OnConflict(target=[q.Identifier("name")], updates=[]),
+        ),
+    ]
+
+
+def drop_statements(partition: Partition) -> List[q.Statement]:
+    return [
+        q.DropTable(q.Identifier(partition.table), if_exists=True),
+        q.Delete(
+            table=q.Identifier("partitions"),
+            where=q.BinaryOp("=", q.Identifier("name"), q.Literal(partition.table)),
+        ),
+    ]
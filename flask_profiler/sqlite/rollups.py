@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from flask_profiler import query as q
+from flask_profiler.entities import measurement_archive as interface
+from flask_profiler.entities.histogram import Histogram
+
+from .functions import decode_histogram, encode_histogram
+from .routes import Route
+
+# Every row has 9 values, stay below the default limit of 999 bound
+# parameters per statement of older sqlite versions.
+MAX_ROWS_PER_UPSERT = 110
+
+
+@dataclass(frozen=True)
+class RollupLevel:
+    """A table that holds one aggregated row per route id and time
+    bucket.  Buckets are width seconds long and aligned to the
+    unix epoch.
+    """
+
+    table: str
+    width: int
+
+    def floor(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.width) * self.width
+
+    def ceil(self, timestamp: float) -> int:
+        return math.ceil(timestamp / self.width) * self.width
+
+
+DAY = RollupLevel(table="rollup_day", width=24 * 60 * 60)
+HOUR = RollupLevel(table="rollup_hour", width=60 * 60)
+MINUTE = RollupLevel(table="rollup_minute", width=60)
+# Ordered from coarsest to finest
+LEVELS = [DAY, HOUR, MINUTE]
+
+
+@dataclass
+class Bucket:
+    """Aggregates of the measurements in one bucket.  count and
+    elapsed_sum are weighted by the sampling weight of each
+    measurement.
+    """
+
+    count: float
+    elapsed_sum: float
+    elapsed_min: float
+    elapsed_max: float
+    first_start_timestamp: float
+    last_start_timestamp: float
+    histogram: Histogram
+
+    @classmethod
+    def from_measurement(cls, measurement: interface.Measurement) -> Bucket:
+        return cls.from_values(
+            start=measurement.start_timestamp.timestamp(),
+            elapsed=measurement.elapsed,
+            weight=measurement.weight,
+        )
+
+    @classmethod
+    def from_values(cls, start: float, elapsed: float, weight: float) -> Bucket:
+        histogram = Histogram()
+        histogram.add(elapsed, count=weight)
+        return cls(
+            count=weight,
+            elapsed_sum=elapsed * weight,
+            elapsed_min=elapsed,
+            elapsed_max=elapsed,
+            first_start_timestamp=start,
+            last_start_timestamp=start,
+            histogram=histogram,
+        )
+
+    @classmethod
+    def from_row(cls, row: Any) -> Bucket:
+        """Read a bucket from a row of a rollup table."""
+        return cls(
+            count=row["count"],
+            elapsed_sum=row["elapsed_sum"],
+            elapsed_min=row["elapsed_min"],
+            elapsed_max=row["elapsed_max"],
+            first_start_timestamp=row["first_start_timestamp"],
+            last_start_timestamp=row["last_start_timestamp"],
+            histogram=decode_histogram(row["histogram"]),
+        )
+
+    def merge(self, other: Bucket) -> Bucket:
+        return Bucket(
+            count=self.count + other.count,
+            elapsed_sum=self.elapsed_sum + other.elapsed_sum,
+            elapsed_min=min(self.elapsed_min, other.elapsed_min),
+            elapsed_max=max(self.elapsed_max, other.elapsed_max),
+            first_start_timestamp=min(
+                self.first_start_timestamp, other.first_start_timestamp
+            ),
+            last_start_timestamp=max(
+                self.last_start_timestamp, other.last_start_timestamp
+            ),
+            histogram=self.histogram.merge(other.histogram),
+        )
+
+
+BucketKey = Tuple[int, int]
+
+
+def upsert_statements(
+    level: RollupLevel,
+    measurements: List[interface.Measurement],
+    route_ids: Mapping[Route, int],
+) -> List[q.Insert]:
+    """Statements that add the given measurements to the rollup table
+    of level.  Measurements are aggregated before they are written so
+    that every bucket is updated at most once.
+    """
+    buckets = aggregate(
+        level,
+        (
+            (
+                route_ids[measurement.route_name, measurement.method],
+                measurement.start_timestamp.timestamp(),
+                Bucket.from_measurement(measurement),
+            )
+            for measurement in measurements
+        ),
+    )
+    return _upserts(level, buckets)
+
+
+def rebuild_statements(
+    level: RollupLevel, since: float, until: float, buckets: Dict[BucketKey, Bucket]
+) -> List[q.Statement]:
+    """Statements that replace the buckets of level that start in
+    [since, until) with the given buckets.
+    """
+    statements: List[q.Statement] = [
+        q.Delete(
+            table=q.Identifier(level.table),
+            where=q.BinaryOp(
+                "AND",
+                q.BinaryOp(">=", q.Identifier("bucket"), q.Literal(since)),
+                q.BinaryOp("<", q.Identifier("bucket"), q.Literal(until)),
+            ),
+        )
+    ]
+    statements += _upserts(level, buckets)
+    return statements
+
+
+def aggregate(
+    level: RollupLevel, parts: Iterable[Tuple[int, float, Bucket]]
+) -> Dict[BucketKey, Bucket]:
+    """Merge the given (route id, start timestamp, bucket) parts into the
+    buckets of level they belong to.
+    """
+    buckets: Dict[BucketKey, Bucket] = dict()
+    for route_id, start, bucket in parts:
+        key = (route_id, level.floor(start))
+        if key in buckets:
+            bucket = buckets[key].merge(bucket)
+        buckets[key] = bucket
+    return buckets
+
+
+def _upserts(level: RollupLevel, buckets: Dict[BucketKey, Bucket]) -> List[q.Insert]:
+    rows = list(buckets.items())
+    statements = []
+    for start in range(0, len(rows), MAX_ROWS_PER_UPSERT):
+        end = start + MAX_ROWS_PER_UPSERT
+        statements.append(_upsert(level, rows[start:end]))
+    return statements
+
+
+def _upsert(level: RollupLevel, rows: List[Tuple[BucketKey, Bucket]]) -> q.Insert:
+    def excluded(column: str) -> q.Identifier:
+        return q.Identifier(["excluded", column])
+
+    def merged(function: str, column: str) -> Tuple[q.Identifier, q.Expression]:
+        return (
+            q.Identifier(column),
+            q.Function(function, [q.Identifier(column), excluded(column)]),
+        )
+
+    def added(column: str) -> Tuple[q.Identifier, q.Expression]:
+        return (
+            q.Identifier(column),
+            q.BinaryOp("+", q.Identifier(column), excluded(column)),
+        )
+
+    return q.Insert(
+        into=q.Identifier(level.table),
+        columns=[
+            q.Identifier("route_id"),
+            q.Identifier("bucket"),
+            q.Identifier("count"),
+            q.Identifier("elapsed_sum"),
+            q.Identifier("elapsed_min"),
+            q.Identifier("elapsed_max"),
+            q.Identifier("first_start_timestamp"),
+            q.Identifier("last_start_timestamp"),
+            q.Identifier("histogram"),
+        ],
+        rows=[
+            [
+                q.Literal(route_id),
+                q.Literal(bucket_start),
+                q.Literal(bucket.count),
+                q.Literal(bucket.elapsed_sum),
+                q.Literal(bucket.elapsed_min),
+                q.Literal(bucket.elapsed_max),
+                q.Literal(bucket.first_start_timestamp),
+                q.Literal(bucket.last_start_timestamp),
+                q.Literal(encode_histogram(bucket.histogram)),
+            ]
+            for (route_id, bucket_start), bucket in rows
+        ],
+        on_conflict=q.OnConflict(
+            target=[q.Identifier("route_id"), q.Identifier("bucket")],
+            updates=[
+                added("count"),
+                added("elapsed_sum"),
+                merged("MIN", "elapsed_min"),
+                merged("MAX", "elapsed_max"),
+                merged("MIN", "first_start_timestamp"),
+                merged("MAX", "last_start_timestamp"),
+                merged("histogram_combine", "histogram"),
+            ],
+        ),
+    )
+
+
+@dataclass(frozen=True)
+class TimeRange:
+    """Part of a time window [since, until) that is read from the given
+    rollup level or from the raw measurements if level is None.  A
+    bound of None means that the range is unbounded on that side.
+    """
+
+    since: Optional[float]
+    until: Optional[float]
+    level: Optional[RollupLevel] = None
+
+
+def cover(
+    since: Optional[float], until: Optional[float], levels: List[RollupLevel]
+) -> List[TimeRange]:
+    """Split [since, until) into ranges so that as much as possible is
+    read from the coarsest of the given levels.  Only the edges that
+    are not aligned to any level are read from raw measurements.
+    """
+    if not levels or (since is not None and until is not None and since >= until):
+        return [TimeRange(since=since, until=until)]
+    level, finer_levels = levels[0], levels[1:]
+    aligned_since = None if since is None else level.ceil(since)
+    aligned_until = None if until is None else level.floor(until)
+    if (
+        aligned_since is not None
+        and aligned_until is not None
+        and aligned_since >= aligned_until
+    ):
+        return cover(since, until, finer_levels)
+    ranges = []
+    if since is not None and aligned_since != since:
+        ranges += cover(since, aligned_since, finer_levels)
+    ranges.append(TimeRange(since=aligned_since, until=aligned_until, level=level))
+    if until is not None and aligned_until != until:
+        ranges += cover(aligned_until, until, finer_levels)
+    return ranges
@@ -0,0 +1,125 @@
+"""The route_catalog table holds running totals of the stored
+measurements of every route id so that questions about whole routes
+are answered without reading measurements or rollups.  Totals are
+updated in the transaction that writes or deletes the measurements.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from flask_profiler import query as q
+from flask_profiler.entities import measurement_archive as interface
+
+from .routes import Route
+
+TABLE = q.Identifier("route_catalog")
+
+
+@dataclass
+class Totals:
+    """count and elapsed are weighted by the sampling weight of each
+    measurement.  elapsed is given in seconds.
+    """
+
+    count: float
+    elapsed: float
+
+
+def upsert_statements(
+    measurements: List[interface.Measurement], route_ids: Mapping[Route, int]
+) -> List[q.Insert]:
+    rows: Dict[int, List[float]] = dict()
+    for measurement in measurements:
+        route_id = route_ids[measurement.route_name, measurement.method]
+        start = measurement.start_timestamp.timestamp()
+        weight = measurement.weight
+        if route_id in rows:
+            first_seen, last_seen, count, elapsed = rows[route_id]
+            rows[route_id] = [
+                min(first_seen, start),
+                max(last_seen, start),
+                count + weight,
+                elapsed + measurement.elapsed * weight,
+            ]
+        else:
+            rows[route_id] = [start, start, weight, measurement.elapsed * weight]
+    # There are few routes, so a single statement never exceeds the
+    # limit of bound parameters.
+    return [
+        q.Insert(
+            into=TABLE,
+            columns=[
+                q.Identifier("route_id"),
+                q.Identifier("first_seen"),
+                q.Identifier("last_seen"),
+                q.Identifier("total_count"),
+                q.Identifier("total_elapsed"),
+            ],
+            rows=[
+                [q.Literal(value) for value in [route_id, *values]]
+                for route_id, values in rows.items()
+            ],
+            on_conflict=q.OnConflict(
+                target=[q.Identifier("route_id")],
+                updates=[
+                    _merged("MIN", "first_seen"),
+                    _merged("MAX", "last_seen"),
+                    _added("total_count"),
+                    _added("total_elapsed"),
+                ],
+            ),
+        )
+    ]
+
+
+def subtract_statement(route_id: int, totals: Totals) -> q.Update:
+    return q.Update(
+        table=TABLE,
+        assignments=[
+            (
+                q.Identifier("total_count"),
+                q.BinaryOp("-", q.Identifier("total_count"), q.Literal(totals.count)),
+            ),
+            (
+                q.Identifier("total_elapsed"),
+                q.BinaryOp(
+                    "-", q.Identifier("total_elapsed"), q.Literal(totals.elapsed)
+                ),
+            ),
+        ],
+        where=_is_route(route_id),
+    )
+
+
+def first_seen_statement(route_id: int, first_seen: Optional[float]) -> q.Statement:
+    """Move the first_seen of the route to the given timestamp, or
+    remove the route from the catalog if it has no measurements left.
+    """
+    if first_seen is None:
+        return q.Delete(table=TABLE, where=_is_route(route_id))
+    return q.Update(
+        table=TABLE,
+        assignments=[(q.Identifier("first_seen"), q.Literal(first_seen))],
+        where=_is_route(route_id),
+    )
+
+
+def _is_route(route_id: int) -> q.Expression:
+    return q.BinaryOp("=", q.Identifier("route_id"), q.Literal(route_id))
+
+
+def _merged(function: str, column: str) -> Tuple[q.Identifier, q.Expression]:
+    return (
+        q.Identifier(column),
+        q.Function(
+            function, [q.Identifier(column), q.Identifier(["excluded", column])]
+        ),
+    )
+
+
+def _added(column: str) -> Tuple[q.Identifier, q.Expression]:
+    return (
+        q.Identifier(column),
+        q.BinaryOp("+", q.Identifier(column), q.Identifier(["excluded", column])),
+    )
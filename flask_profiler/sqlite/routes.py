@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Dict, Iterable, Tuple
+
+from flask_profiler import query as q
+
+Route = Tuple[str, str]
+
+
+class RouteCache:
+    """Process wide cache of the routes table which maps every pair of
+    route name and method to an integer id.  Rows of that table are
+    never changed once they are committed, so ids are only looked up
+    in the database the first time a route is seen.
+    """
+
+    def __init__(self) -> None:
+        self._ids: Dict[Route, int] = dict()
+        self._routes: Dict[int, Route] = dict()
+
+    def ids_of(
+        self, connection: sqlite3.Connection, routes: Iterable[Route]
+    ) -> Dict[Route, int]:
+        """Look up the ids of the given routes and insert the routes
+        that are not yet known.  Must be called with the writer
+        connection outside of a transaction since new routes are
+        committed right away.
+        """
+        routes = list(routes)
+        missing = {route for route in routes if route not in self._ids}
+        if missing:
+            fetched = dict()
+            for route in missing:
+                query = self._upsert(route)
+                row = connection.execute(str(query), query.parameters()).fetchone()
+                fetched[route] = row["ID"]
+            connection.commit()
+            # Only ids that are committed may be cached.
+            for route, id_ in fetched.items():
+                self._remember(id_, route)
+        return {route: self._ids[route] for route in routes}
+
+    def route_of(self, connection: sqlite3.Connection, id_: int) -> Route:
+        if id_ not in self._routes:
+            # There are few routes, so all of them are loaded at once.
+            query = q.Select(selector=q.All(), from_clause=q.Identifier("routes"))
+            for row in connection.execute(str(query), query.parameters()):
+                self._remember(row["ID"], (row["route_name"], row["method"]))
+        return self._routes[id_]
+
+    def _remember(self, id_: int, route: Route) -> None:
+        self._ids[route] = id_
+        self._routes[id_] = route
+
+    @staticmethod
+    def _upsert(route: Route) -> q.Insert:
+        # The no-op update makes RETURNING yield the id of an
+        # existing row as well.
+        return q.Insert(
+            into=q.Identifier("routes"),
+            columns=[q.Identifier("route_name"), q.Identifier("method")],
+            rows=[[q.Literal(route[0]), q.Literal(route[1])]],
+            on_conflict=q.OnConflict(
+                target=[q.Identifier("route_name"), q.Identifier("method")],
+                updates=[
+                    (
+                        q.Identifier("route_name"),
+                        q.Identifier(["excluded", "route_name"]),
+                    )
+                ],
+            ),
+            returning=q.All(),
+        )
@@ -1,29 +1,50 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass, replace
-from datetime import datetime, timezone
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
 from sqlite3 import Cursor
-from typing import Any, Callable, Generic, Iterator, List, Optional, TypeVar
-from urllib.parse import quote, unquote
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Generic,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from typing_extensions import Self
 
 from flask_profiler import query as q
 from flask_profiler.entities import measurement_archive as interface
 
+from . import rollups
+from .connection_pool import QueryBudget
+from .functions import decode_histogram
+from .partitions import UNPARTITIONED, Partitions
+
 T = TypeVar("T")
 SelectQueryT = TypeVar("SelectQueryT", bound="SelectQuery")
 
 
 LOGGER = logging.getLogger(__name__)
+FETCH_BATCH_SIZE = 500
 
 
 @dataclass
 class SelectQuery(Generic[T]):
+    """Lazily executed query.  If a budget is given, every access to
+    the database runs within that budget.
+    """
+
     mapping: Callable[[Any], T]
     db: Cursor
     query: q.Select
+    budget: Optional[QueryBudget] = None
 
     def _with_modified_query(
         self: SelectQueryT,
@@ -32,18 +53,100 @@ class SelectQuery(Generic[T]):
         return replace(self, query=modification(self.query))
 
     def __iter__(self) -> Iterator[T]:
-        LOGGER.debug("Running query %s", self.query)
-        results = self.db.execute(str(self.query))
-        yield from map(self.mapping, results.fetchall())
+        # Rows are streamed from a cursor of their own so that other
+        # queries can use the shared cursor while iterating.  Only the
+        # database work runs within the budget, the time the caller
+        # spends between batches does not count.
+        with self._budgeted():
+            results = self._execute(self.query, cursor=self.db.connection.cursor())
+        try:
+            while True:
+                with self._budgeted():
+                    rows = results.fetchmany(FETCH_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from map(self.mapping, rows)
+        finally:
+            results.close()
 
     def __len__(self) -> int:
         count_query = q.Select(
             from_clause=q.Alias(self.query, name=q.Identifier("subquery")),
             selector=q.SelectorList([q.Aggregate("COUNT", q.All())]),
         )
-        LOGGER.debug("Running query %s", count_query)
-        result = self.db.execute(str(count_query))
-        return result.fetchone()[0]
+        with self._budgeted():
+            return self._execute(count_query).fetchone()[0]
+
+    def counted(self, cap: Optional[int] = None) -> interface.CountedItems[T]:
+        """The total is computed by a COUNT(*) OVER () column of the
+        page query.  With a cap the window only sees the first rows of
+        the unpaginated query, so counting stops early.  This saves
+        running a grouped query twice, but it keeps an ORDER BY from
+        being answered by an index, so plain records are better
+        counted with len.
+        """
+        with self._budgeted():
+            rows = self._execute(self._counting_query(cap)).fetchall()
+            if rows:
+                total_count = rows[0]["total_count"]
+            else:
+                # The page is empty, so there is no row that could carry
+                # the total.  This only happens for pages past the end.
+                total_count = self._execute(
+                    self._counting_query(cap, page=False)
+                ).fetchone()[0]
+        is_capped = False
+        if cap is not None and total_count > cap:
+            total_count, is_capped = cap, True
+        return interface.CountedItems(
+            items=[self.mapping(row) for row in rows],
+            total_count=total_count,
+            is_capped=is_capped,
+        )
+
+    def _counting_query(self, cap: Optional[int], page: bool = True) -> q.Select:
+        unpaginated = replace(
+            self.query, limit_clause=-1, offset_clause=-1, order_by=[]
+        )
+        if cap is not None:
+            offset = max(0, self.query.offset_clause)
+            if self.query.limit_clause < 0 and page:
+                window_size = -1
+            else:
+                window_size = max(cap + 1, offset + self.query.limit_clause)
+            unpaginated = replace(
+                unpaginated, limit_clause=window_size, order_by=self.query.order_by
+            )
+        if not page:
+            return q.Select(
+                from_clause=q.Alias(unpaginated, name=q.Identifier("subquery")),
+                selector=q.SelectorList([q.Aggregate("COUNT", q.All())]),
+            )
+        return replace(
+            self.query,
+            selector=q.SelectorList(
+                [
+                    q.All(),
+                    q.Alias(
+                        q.Window(q.Aggregate("COUNT", q.All())),
+                        q.Identifier("total_count"),
+                    ),
+                ]
+            ),
+            from_clause=q.Alias(unpaginated, name=q.Identifier("subquery")),
+            where_clause=None,
+            group_by=None,
+        )
+
+    def _budgeted(self) -> ContextManager[None]:
+        if self.budget is None:
+            return nullcontext()
+        return self.budget.running()
+
+    def _execute(self, query: q.Select, cursor: Optional[Cursor] = None) -> Cursor:
+        parameters = query.parameters()
+        LOGGER.debug("Running query %s with parameters %s", query, parameters)
+        return (cursor or self.db).execute(query.as_query(), parameters)
 
     def limit(self: SelectQueryT, n: int) -> SelectQueryT:
         if self.query.limit_clause < 0:
@@ -72,145 +175,265 @@ class SelectQuery(Generic[T]):
         )
 
     def first(self) -> Optional[T]:
-        LOGGER.debug("Running query %s", self.query)
-        results = self.db.execute(str(self.query))
-        if (row := results.fetchone()) is not None:
+        with self._budgeted():
+            row = self._execute(self.query).fetchone()
+        if row is not None:
             return self.mapping(row)
         else:
             return None
 
 
+@dataclass
 class RecordResult(SelectQuery[interface.Record]):
+    """Besides the query for raw measurements this keeps track of the
+    route and method conditions and the requested time window so that
+    summaries can be read from the rollup tables.  rollup_conditions
+    is None if the records were filtered in a way that the rollup
+    tables cannot reproduce.  The query only reads the partitions
+    that intersect the requested time window.
+    """
+
+    rollup_conditions: Optional[List[q.Expression]] = field(default_factory=list)
+    since: Optional[float] = None
+    until: Optional[float] = None
+    partitions: Partitions = field(default_factory=lambda: Partitions([UNPARTITIONED]))
+
     def summarize(self) -> SummarizedMeasurementsImpl:
-        return SummarizedMeasurementsImpl(
-            query=q.Select(
-                selector=q.All(),
-                from_clause=q.Select(
-                    selector=q.SelectorList(
-                        [
-                            q.Identifier("method"),
-                            q.Identifier("route_name"),
-                            q.Alias(
-                                q.Aggregate("MIN", q.Identifier("start_timestamp")),
-                                q.Identifier("first_measurement_timestamp"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("MAX", q.Identifier("start_timestamp")),
-                                q.Identifier("last_measurement_timestamp"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("COUNT", q.Identifier("id")),
-                                q.Identifier("count"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("MIN", q.Identifier("elapsed")),
-                                q.Identifier("min"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("MAX", q.Identifier("elapsed")),
-                                q.Identifier("max"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("AVG", q.Identifier("elapsed")),
-                                q.Identifier("avg"),
-                            ),
-                        ]
-                    ),
-                    from_clause=q.Alias(self.query, name=q.Identifier("records")),
-                    group_by=q.ExpressionList(
-                        [
-                            q.Identifier("method"),
-                            q.Identifier("route_name"),
-                        ]
-                    ),
-                ),
-            ),
-            mapping=self.summary_mapping,
-            db=self.db,
+        return self._summarize_parts(
+            rollups.cover(self.since, self.until, self._usable_rollup_levels())
         )
 
     def summarize_by_interval(
-        self, timestamps: List[datetime]
+        self, since: datetime, until: datetime, interval_length: timedelta
     ) -> SummarizedMeasurementsImpl:
-        first_timestamp = timestamps[0]
-        last_timestamp = timestamps[-1]
-        interval_op = q.Case(
-            cases=[
-                (
-                    q.BinaryOp(
-                        ">=",
-                        q.Identifier("start_timestamp"),
-                        q.Literal(subinterval_start.timestamp()),
-                    ),
-                    q.Literal(n + 1),
-                )
-                for n, subinterval_start in reversed(list(enumerate(timestamps)))
-            ],
-            alternative=q.Literal(0),
+        origin = since.timestamp()
+        width = interval_length.total_seconds()
+        records = self.requested_after(since).requested_before(until)
+        levels = [
+            level
+            for level in self._usable_rollup_levels()
+            if width % level.width == 0 and origin % level.width == 0
+        ]
+        return records._summarize_parts(
+            rollups.cover(records.since, records.until, levels),
+            interval=(origin, width),
+        )
+
+    def _usable_rollup_levels(self) -> List[rollups.RollupLevel]:
+        if (
+            self.rollup_conditions is None
+            or self.query.limit_clause >= 0
+            or self.query.offset_clause >= 0
+        ):
+            return []
+        return rollups.LEVELS
+
+    def _summarize_parts(
+        self,
+        ranges: List[rollups.TimeRange],
+        interval: Optional[Tuple[float, float]] = None,
+    ) -> SummarizedMeasurementsImpl:
+        group_by: List[q.Expression] = [q.Identifier("route_id")]
+        selectors: List[q.Selector] = [
+            q.Identifier("route_id"),
+            q.Alias(
+                q.Aggregate("MIN", q.Identifier("first_start_timestamp")),
+                q.Identifier("first_measurement_timestamp"),
+            ),
+            q.Alias(
+                q.Aggregate("MAX", q.Identifier("last_start_timestamp")),
+                q.Identifier("last_measurement_timestamp"),
+            ),
+            q.Alias(
+                q.Aggregate("SUM", q.Identifier("count")),
+                q.Identifier("count"),
+            ),
+            q.Alias(
+                q.Aggregate("MIN", q.Identifier("elapsed_min")),
+                q.Identifier("min"),
+            ),
+            q.Alias(
+                q.Aggregate("MAX", q.Identifier("elapsed_max")),
+                q.Identifier("max"),
+            ),
+            q.Alias(
+                q.BinaryOp(
+                    "/",
+                    q.Aggregate("SUM", q.Identifier("elapsed_sum")),
+                    q.Aggregate("SUM", q.Identifier("count")),
+                ),
+                q.Identifier("avg"),
+            ),
+            q.Alias(
+                q.Aggregate("histogram_merge", q.Identifier("histogram")),
+                q.Identifier("histogram"),
+            ),
+        ]
+        order_by: List[q.Ordering] = []
+        if interval is not None:
+            group_by.append(q.Identifier("interval_count"))
+            selectors.append(q.Identifier("interval_count"))
+            order_by.append(q.Asc(q.Identifier("interval_count")))
+        parts = q.UnionAll(
+            [self._summarize_range(time_range, interval) for time_range in ranges]
+        )
+        summaries = q.Select(
+            selector=q.SelectorList(selectors),
+            from_clause=q.Alias(parts, name=q.Identifier("parts")),
+            group_by=q.ExpressionList(group_by),
         )
         return SummarizedMeasurementsImpl(
             db=self.db,
+            budget=self.budget,
             query=q.Select(
                 selector=q.All(),
-                from_clause=q.Select(
-                    selector=q.SelectorList(
-                        [
-                            q.Identifier("method"),
-                            q.Identifier("route_name"),
-                            q.Alias(
-                                q.Aggregate("MIN", q.Identifier("start_timestamp")),
-                                q.Identifier("first_measurement_timestamp"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("MAX", q.Identifier("start_timestamp")),
-                                q.Identifier("last_measurement_timestamp"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("COUNT", q.Identifier("id")),
-                                q.Identifier("count"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("MIN", q.Identifier("elapsed")),
-                                q.Identifier("min"),
+                from_clause=q.Join(
+                    table=q.Alias(summaries, name=q.Identifier("summaries")),
+                    spec=[
+                        q.inner(
+                            q.Identifier("routes"),
+                            q.On(
+                                q.BinaryOp(
+                                    "=",
+                                    q.Identifier(["routes", "ID"]),
+                                    q.Identifier(["summaries", "route_id"]),
+                                )
                             ),
-                            q.Alias(
-                                q.Aggregate("MAX", q.Identifier("elapsed")),
-                                q.Identifier("max"),
-                            ),
-                            q.Alias(
-                                q.Aggregate("AVG", q.Identifier("elapsed")),
-                                q.Identifier("avg"),
+                        )
+                    ],
+                ),
+                order_by=order_by,
+            ),
+            mapping=(
+                self.summary_mapping
+                if interval is None
+                else self.interval_summary_mapping
+            ),
+        )
+
+    def _summarize_range(
+        self,
+        time_range: rollups.TimeRange,
+        interval: Optional[Tuple[float, float]],
+    ) -> q.Select:
+        """Partial aggregates of one part of the requested time window,
+        read either from a rollup table or from raw measurements.
+        """
+        if time_range.level is None:
+            timestamp_column = q.Identifier("start_timestamp")
+        else:
+            timestamp_column = q.Identifier("bucket")
+        dimensions: List[q.Selector] = [q.Identifier("route_id")]
+        if interval is not None:
+            origin, width = interval
+            dimensions.append(
+                q.Alias(
+                    q.Cast(
+                        q.BinaryOp(
+                            "/",
+                            q.BinaryOp("-", timestamp_column, q.Literal(origin)),
+                            q.Literal(width),
+                        ),
+                        q.ColumnType.INTEGER,
+                    ),
+                    q.Identifier("interval_count"),
+                )
+            )
+        if time_range.level is None:
+            group_by: List[q.Expression] = [q.Identifier("route_id")]
+            if interval is not None:
+                group_by.append(q.Identifier("interval_count"))
+            records = self
+            if time_range.since is not None:
+                records = records.requested_after_timestamp(time_range.since)
+            if time_range.until is not None:
+                records = records.requested_before_timestamp(time_range.until)
+            return q.Select(
+                selector=q.SelectorList(
+                    dimensions
+                    + [
+                        q.Alias(
+                            q.Aggregate("SUM", q.Identifier("weight")),
+                            q.Identifier("count"),
+                        ),
+                        q.Alias(
+                            in_seconds(
+                                q.Aggregate(
+                                    "SUM",
+                                    q.BinaryOp(
+                                        "*",
+                                        q.Identifier("elapsed_ns"),
+                                        q.Identifier("weight"),
+                                    ),
+                                )
                             ),
-                            q.Alias(
-                                interval_op,
-                                q.Identifier("interval_count"),
+                            q.Identifier("elapsed_sum"),
+                        ),
+                        q.Alias(
+                            in_seconds(q.Aggregate("MIN", q.Identifier("elapsed_ns"))),
+                            q.Identifier("elapsed_min"),
+                        ),
+                        q.Alias(
+                            in_seconds(q.Aggregate("MAX", q.Identifier("elapsed_ns"))),
+                            q.Identifier("elapsed_max"),
+                        ),
+                        q.Alias(
+                            q.Aggregate("MIN", q.Identifier("start_timestamp")),
+                            q.Identifier("first_start_timestamp"),
+                        ),
+                        q.Alias(
+                            q.Aggregate("MAX", q.Identifier("start_timestamp")),
+                            q.Identifier("last_start_timestamp"),
+                        ),
+                        q.Alias(
+                            q.Function(
+                                "histogram",
+                                [
+                                    in_seconds(q.Identifier("elapsed_ns")),
+                                    q.Identifier("weight"),
+                                ],
                             ),
-                        ]
-                    ),
-                    from_clause=q.Alias(
-                        self.requested_after(first_timestamp)
-                        .requested_before(last_timestamp)
-                        .query,
-                        name=q.Identifier("records"),
-                    ),
-                    group_by=q.ExpressionList(
-                        [
-                            q.Identifier("method"),
-                            q.Identifier("route_name"),
-                            q.Identifier("interval_count"),
-                        ]
-                    ),
+                            q.Identifier("histogram"),
+                        ),
+                    ]
                 ),
+                from_clause=q.Alias(records.query, name=q.Identifier("records")),
+                group_by=q.ExpressionList(group_by),
+            )
+        conditions = list(self.rollup_conditions or [])
+        if time_range.since is not None:
+            conditions.append(
+                q.BinaryOp(">=", timestamp_column, q.Literal(time_range.since))
+            )
+        if time_range.until is not None:
+            conditions.append(
+                q.BinaryOp("<", timestamp_column, q.Literal(time_range.until))
+            )
+        query = q.Select(
+            selector=q.SelectorList(
+                dimensions
+                + [
+                    q.Identifier("count"),
+                    q.Identifier("elapsed_sum"),
+                    q.Identifier("elapsed_min"),
+                    q.Identifier("elapsed_max"),
+                    q.Identifier("first_start_timestamp"),
+                    q.Identifier("last_start_timestamp"),
+                    q.Identifier("histogram"),
+                ]
             ),
-            mapping=self.summary_mapping,
+            from_clause=q.Identifier(time_range.level.table),
         )
+        for condition in conditions:
+            query = query.and_where(condition)
+        return query
 
     @classmethod
     def summary_mapping(cls, row: Any) -> interface.Summary:
         return interface.Summary(
             method=row["method"],
-            name=unquote(row["route_name"]),
-            count=row["count"],
+            name=row["route_name"],
+            count=round(row["count"]),
             min_elapsed=row["min"],
             max_elapsed=row["max"],
             avg_elapsed=row["avg"],
@@ -220,56 +443,128 @@ class RecordResult(SelectQuery[interface.Record]):
             last_measurement=datetime.fromtimestamp(
                 row["last_measurement_timestamp"], tz=timezone.utc
             ),
+            histogram=decode_histogram(row["histogram"]),
         )
 
+    @classmethod
+    def interval_summary_mapping(cls, row: Any) -> interface.Summary:
+        return replace(cls.summary_mapping(row), interval_index=row["interval_count"])
+
     def with_method(self, method: str) -> RecordResult:
-        return self._with_modified_query(
-            lambda query: query.and_where(
-                q.BinaryOp("=", q.Identifier("method"), q.Literal(quote(method)))
-            )
+        return self._with_route_condition(
+            q.BinaryOp("=", q.Identifier("method"), q.Literal(method))
         )
 
     def with_name(self, name: str) -> RecordResult:
-        return self._with_modified_query(
-            lambda query: query.and_where(
-                q.BinaryOp("=", q.Identifier("route_name"), q.Literal(quote(name)))
-            )
+        return self._with_route_condition(
+            q.BinaryOp("=", q.Identifier("route_name"), q.Literal(name))
         )
 
     def with_name_containing(self, substring: str) -> RecordResult:
-        return self._with_modified_query(
-            lambda query: query.and_where(
-                q.BinaryOp(
-                    "LIKE",
-                    q.Identifier("route_name"),
-                    q.Literal(f"%{quote(substring)}%"),
-                )
+        """Like the LIKE operator this ignores the case of ASCII letters,
+        but '%' and '_' only match themselves.
+        """
+        return self._with_route_condition(
+            q.BinaryOp(
+                ">",
+                q.Function(
+                    "instr",
+                    [
+                        q.Function("lower", [q.Identifier("route_name")]),
+                        q.Function("lower", [q.Literal(substring)]),
+                    ],
+                ),
+                q.Literal(0),
             )
         )
 
-    def requested_after(self, t: datetime) -> RecordResult:
-        return self._with_modified_query(
-            lambda query: query.and_where(
-                q.BinaryOp(
-                    ">=", q.Identifier("start_timestamp"), q.Literal(t.timestamp())
-                )
-            )
+    def _with_route_condition(self, condition: q.Expression) -> RecordResult:
+        """Only keep rows whose route matches condition.  The condition
+        refers to the columns of the routes table and is turned into a
+        condition on the route_id column which the measurements and
+        rollup tables have in common.
+        """
+        condition = q.BinaryOp(
+            "IN",
+            q.Identifier("route_id"),
+            q.Select(
+                selector=q.SelectorList([q.Identifier("ID")]),
+                from_clause=q.Identifier("routes"),
+                where_clause=condition,
+            ),
+        )
+        return replace(
+            self,
+            query=self.query.and_where(condition),
+            rollup_conditions=None
+            if self.rollup_conditions is None
+            else self.rollup_conditions + [condition],
         )
 
+    def requested_after(self, t: datetime) -> RecordResult:
+        return self.requested_after_timestamp(t.timestamp())
+
     def requested_before(self, t: datetime) -> RecordResult:
-        return self._with_modified_query(
-            lambda query: query.and_where(
-                q.BinaryOp(
-                    "<", q.Identifier("start_timestamp"), q.Literal(t.timestamp())
-                )
-            )
+        return self.requested_before_timestamp(t.timestamp())
+
+    def requested_after_timestamp(self, timestamp: float) -> RecordResult:
+        return replace(
+            self,
+            query=self.query.and_where(
+                q.BinaryOp(">=", q.Identifier("start_timestamp"), q.Literal(timestamp))
+            ),
+            since=timestamp if self.since is None else max(self.since, timestamp),
+        )._with_pruned_partitions()
+
+    def requested_before_timestamp(self, timestamp: float) -> RecordResult:
+        return replace(
+            self,
+            query=self.query.and_where(
+                q.BinaryOp("<", q.Identifier("start_timestamp"), q.Literal(timestamp))
+            ),
+            until=timestamp if self.until is None else min(self.until, timestamp),
+        )._with_pruned_partitions()
+
+    def _with_pruned_partitions(self) -> RecordResult:
+        return replace(
+            self,
+            query=replace(
+                self.query,
+                from_clause=self.partitions.intersecting(self.since, self.until),
+            ),
         )
 
     def with_id(self, id_: int) -> RecordResult:
-        return self._with_modified_query(
-            lambda query: query.and_where(
+        return replace(
+            self,
+            query=self.query.and_where(
                 q.BinaryOp("=", q.Identifier("ID"), q.Literal(id_))
-            )
+            ),
+            rollup_conditions=None,
+        )
+
+    def preceding(self, start_timestamp: datetime, id_: int) -> RecordResult:
+        return self._relative_to(start_timestamp.timestamp(), id_, "<")
+
+    def following(self, start_timestamp: datetime, id_: int) -> RecordResult:
+        return self._relative_to(start_timestamp.timestamp(), id_, ">")
+
+    def _relative_to(self, timestamp: float, id_: int, operator: str) -> RecordResult:
+        """Compare (start_timestamp, ID) as a row value so that the
+        condition can be answered by the start_timestamp index.
+        """
+        return replace(
+            self,
+            query=self.query.and_where(
+                q.BinaryOp(
+                    operator,
+                    q.ExpressionList(
+                        [q.Identifier("start_timestamp"), q.Identifier("ID")]
+                    ),
+                    q.ExpressionList([q.Literal(timestamp), q.Literal(id_)]),
+                )
+            ),
+            rollup_conditions=None,
         )
 
     def ordered_by_start_time(self, ascending: bool = True) -> RecordResult:
@@ -277,11 +572,21 @@ class RecordResult(SelectQuery[interface.Record]):
         return self._with_modified_query(
             lambda query: replace(
                 query,
-                order_by=[Order(q.Identifier("start_timestamp"))] + query.order_by,
+                order_by=[
+                    Order(q.Identifier("start_timestamp")),
+                    Order(q.Identifier("ID")),
+                ]
+                + query.order_by,
             )
         )
 
 
+def in_seconds(nanoseconds: q.Expression) -> q.Expression:
+    return q.BinaryOp(
+        "/", nanoseconds, q.Literal(float(interface.NANOSECONDS_PER_SECOND))
+    )
+
+
 class SummarizedMeasurementsImpl(SelectQuery[interface.Summary]):
     def sorted_by_avg_elapsed(self, ascending: bool = True) -> Self:
         Order = q.Asc if ascending else q.Desc
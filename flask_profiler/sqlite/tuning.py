@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, List, Optional, Union
+
+from flask_profiler import query as q
+
+
+@dataclass(frozen=True)
+class Tuning:
+    """Pragmas that are applied to every connection when it is opened.
+    Settings that are None are left at sqlite's defaults.  The journal
+    mode is persisted in the database file and is therefore only set
+    on the writer connection.
+    """
+
+    journal_mode: Optional[str] = None
+    synchronous: Optional[str] = None
+    mmap_size: Optional[int] = None
+    cache_size: Optional[int] = None
+
+    def apply(self, connection: sqlite3.Connection, is_writer: bool) -> None:
+        for pragma in self.pragmas(is_writer=is_writer):
+            connection.execute(str(pragma))
+
+    def pragmas(self, is_writer: bool) -> List[q.Pragma]:
+        settings: Dict[str, Any] = dict(
+            synchronous=self.synchronous,
+            mmap_size=self.mmap_size,
+            cache_size=self.cache_size,
+        )
+        if is_writer:
+            settings = dict(journal_mode=self.journal_mode, **settings)
+        return [
+            q.Pragma(name=name, value=q.Literal(value))
+            for name, value in settings.items()
+            if value is not None
+        ]
+
+
+PROFILES: Dict[str, Tuning] = {
+    "durable": Tuning(
+        journal_mode="DELETE",
+        synchronous="FULL",
+        mmap_size=0,
+        cache_size=-2000,
+    ),
+    "balanced": Tuning(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        mmap_size=64 * 1024 * 1024,
+        cache_size=-16000,
+    ),
+    "fast": Tuning(
+        journal_mode="WAL",
+        synchronous="OFF",
+        mmap_size=256 * 1024 * 1024,
+        cache_size=-64000,
+    ),
+}
+
+
+def parse_tuning(config: Union[str, Dict[str, Any], None]) -> Optional[Tuning]:
+    """Parse the storage.tuning setting.  It is either the name of a
+    profile or a dictionary with an optional "profile" key whose
+    settings are overridden by the remaining keys.
+    """
+    if config is None:
+        return None
+    if isinstance(config, str):
+        config = dict(profile=config)
+    config = dict(config)
+    profile_name = config.pop("profile", None)
+    if profile_name is None:
+        tuning = Tuning()
+    elif profile_name in PROFILES:
+        tuning = PROFILES[profile_name]
+    else:
+        raise ValueError(
+            f"Unknown storage tuning profile {profile_name}, expected one of {', '.join(PROFILES)}"
+        )
+    known_settings = {field.name for field in fields(Tuning)}
+    if unknown_settings := set(config) - known_settings:
+        raise ValueError(
+            f"Unknown storage tuning settings: {', '.join(sorted(unknown_settings))}"
+        )
+    return replace(tuning, **config)
@@ -5,6 +5,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from flask_profiler.entities import measurement_archive
+from flask_profiler.result_cache import ResultCache
 
 
 @dataclass
@@ -15,7 +16,17 @@ class Measurement:
     started_at: datetime
 
 
-@dataclass
+@dataclass(frozen=True)
+class Cursor:
+    """Position of a record when ordered by start time and ID.  The
+    position stays valid after the record itself was deleted.
+    """
+
+    start_timestamp: datetime
+    id: int
+
+
+@dataclass(frozen=True)
 class Request:
     limit: int
     offset: int
@@ -23,20 +34,46 @@ class Request:
     method_filter: Optional[str] = None
     requested_after: Optional[datetime] = None
     requested_before: Optional[datetime] = None
+    after: Optional[Cursor] = None
+    before: Optional[Cursor] = None
 
 
 @dataclass
 class Response:
+    """next_cursor and previous_cursor are the cursors to pass as after
+    and before to get the following and preceding page, None if there
+    is no such page.  Pages reached via a cursor are not counted, their
+    total_result_count is None.
+    """
+
     measurements: List[Measurement]
     request: Request
-    total_result_count: int
+    total_result_count: Optional[int]
+    next_cursor: Optional[Cursor] = None
+    previous_cursor: Optional[Cursor] = None
+    total_result_count_capped: bool = False
 
 
 @dataclass
 class GetDetailsUseCase:
+    """If count_limit is set, measurements are only counted up to
+    that number.  Responses are reused from the cache if one is given.
+    """
+
     archivist: measurement_archive.MeasurementArchivist
+    count_limit: Optional[int] = None
+    cache: Optional[ResultCache] = None
 
     def get_details(self, request: Request) -> Response:
+        if self.cache is None:
+            return self._get_details(request)
+        return self.cache.get_or_compute(
+            self.archivist,
+            key=(GetDetailsUseCase, request),
+            compute=lambda: self._get_details(request),
+        )
+
+    def _get_details(self, request: Request) -> Response:
         results = self.archivist.get_records()
         if request.method_filter is not None:
             results = results.with_method(request.method_filter)
@@ -46,8 +83,51 @@ class GetDetailsUseCase:
             results = results.requested_after(request.requested_after)
         if request.requested_before is not None:
             results = results.requested_before(request.requested_before)
-        total_result_count = len(results)
-        results = results.offset(request.offset).limit(request.limit)
+        next_cursor: Optional[Cursor] = None
+        previous_cursor: Optional[Cursor] = None
+        total_result_count: Optional[int] = None
+        total_result_count_capped = False
+        if request.before is not None:
+            records = list(
+                results.preceding(request.before.start_timestamp, request.before.id)
+                .ordered_by_start_time(ascending=False)
+                .limit(request.limit + 1)
+            )
+        elif request.after is not None:
+            records = list(
+                results.following(request.after.start_timestamp, request.after.id)
+                .ordered_by_start_time()
+                .limit(request.limit + 1)
+            )
+        else:
+            # The page and the total are queried separately, a count
+            # column on the page query would keep it from reading the
+            # page in start time order from the index.
+            records = list(
+                results.ordered_by_start_time()
+                .offset(request.offset)
+                .limit(request.limit + 1)
+            )
+            if self.count_limit is None:
+                total_result_count = len(results)
+            else:
+                total_result_count = len(results.limit(self.count_limit + 1))
+                if total_result_count > self.count_limit:
+                    total_result_count = self.count_limit
+                    total_result_count_capped = True
+        has_more = len(records) > request.limit
+        records = records[: request.limit]
+        if request.before is not None:
+            records.reverse()
+            if records:
+                next_cursor = _cursor_of(records[-1])
+                if has_more:
+                    previous_cursor = _cursor_of(records[0])
+        elif records:
+            if has_more:
+                next_cursor = _cursor_of(records[-1])
+            if request.after is not None or request.offset > 0:
+                previous_cursor = _cursor_of(records[0])
         return Response(
             measurements=[
                 Measurement(
@@ -56,8 +136,15 @@ class GetDetailsUseCase:
                     response_time_secs=measurement.elapsed,
                     started_at=measurement.start_timestamp,
                 )
-                for measurement in results
+                for measurement in records
             ],
             total_result_count=total_result_count,
+            total_result_count_capped=total_result_count_capped,
             request=request,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
         )
+
+
+def _cursor_of(record: measurement_archive.Record) -> Cursor:
+    return Cursor(start_timestamp=record.start_timestamp, id=record.id)
@@ -3,22 +3,36 @@ from __future__ import annotations
 import enum
 from collections import defaultdict
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta, timezone
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
-from flask_profiler.calendar import Calendar
 from flask_profiler.entities.measurement_archive import (
     MeasurementArchivist,
     RecordedMeasurements,
+    RouteCatalogEntry,
 )
+from flask_profiler.result_cache import ResultCache
+
+MAX_INTERVAL_COUNT = 500
 
 
 @dataclass
 class GetRouteOverviewUseCase:
+    """Responses are reused from the cache if one is given."""
+
     archivist: MeasurementArchivist
-    calendar: Calendar
+    cache: Optional[ResultCache] = None
 
     def get_route_overview(self, request: Request) -> Response:
+        if self.cache is None:
+            return self._get_route_overview(request)
+        return self.cache.get_or_compute(
+            self.archivist,
+            key=(GetRouteOverviewUseCase, request),
+            compute=lambda: self._get_route_overview(request),
+        )
+
+    def _get_route_overview(self, request: Request) -> Response:
         timeseries: Dict[str, List[IntervalMeasurement]] = defaultdict(list)
         measurements = (
             self.archivist.get_records()
@@ -27,60 +41,149 @@ class GetRouteOverviewUseCase:
         )
         if request.start_time:
             measurements = measurements.requested_after(request.start_time)
-            interval_start = request.start_time.date()
+            start_time = request.start_time
         else:
-            if timestamp := self._get_earliest_measurement(measurements):
-                interval_start = timestamp.date()
+            if timestamp := self._get_earliest_measurement(request):
+                start_time = timestamp
             else:
-                return Response(request=request, timeseries=dict())
-        interval = self.calendar.day_interval(
-            since=interval_start,
-            until=request.end_time.date() + timedelta(days=1),
-        )
+                return Response(
+                    request=request, timeseries=dict(), start_time=None, end_time=None
+                )
+        interval = request.interval
+        start_time = interval.truncate(start_time)
+        end_time = request.end_time
+        if end_time - start_time > interval.length * MAX_INTERVAL_COUNT:
+            # Only show the most recent intervals, but do not waste them
+            # on the time after the last measurement.
+            if timestamp := self._get_latest_measurement(request, measurements):
+                end_time = min(end_time, interval.truncate(timestamp) + interval.length)
+            start_time = max(
+                start_time,
+                interval.truncate(
+                    end_time - interval.length * (MAX_INTERVAL_COUNT - 1)
+                ),
+            )
         for summary in measurements.summarize_by_interval(
-            [_midnight(d) for d in interval]
+            since=start_time,
+            until=end_time,
+            interval_length=interval.length,
         ):
+            value: Optional[float]
+            if request.statistic.percentile is None:
+                value = summary.avg_elapsed
+            else:
+                value = summary.percentile(request.statistic.percentile)
+            assert summary.interval_index is not None
             timeseries[summary.method].append(
                 IntervalMeasurement(
-                    value=summary.avg_elapsed,
-                    timestamp=summary.first_measurement,
+                    value=value,
+                    timestamp=start_time + summary.interval_index * interval.length,
                 )
             )
-        return Response(request=request, timeseries=timeseries)
+        return Response(
+            request=request,
+            timeseries=timeseries,
+            start_time=start_time,
+            end_time=end_time,
+        )
 
-    def _get_earliest_measurement(
-        self, measurements: RecordedMeasurements
-    ) -> Optional[datetime]:
-        measurement = measurements.ordered_by_start_time().first()
-        if measurement:
-            return measurement.start_timestamp
-        else:
+    def _get_earliest_measurement(self, request: Request) -> Optional[datetime]:
+        first_seen = min(
+            (entry.first_seen for entry in self._get_catalog_entries(request)),
+            default=None,
+        )
+        if first_seen is None or first_seen >= request.end_time:
             return None
+        return first_seen
 
+    def _get_latest_measurement(
+        self, request: Request, measurements: RecordedMeasurements
+    ) -> Optional[datetime]:
+        last_seen = max(
+            (entry.last_seen for entry in self._get_catalog_entries(request)),
+            default=None,
+        )
+        if last_seen is None or last_seen < request.end_time:
+            return last_seen
+        # The catalog only knows the latest measurement of all time,
+        # the latest one before the end time is found in the summaries.
+        return max(
+            (summary.last_measurement for summary in measurements.summarize()),
+            default=None,
+        )
 
-@dataclass
+    def _get_catalog_entries(self, request: Request) -> List[RouteCatalogEntry]:
+        return [
+            entry
+            for entry in self.archivist.get_route_catalog()
+            if entry.name == request.route_name
+        ]
+
+
+class Statistic(enum.Enum):
+    average = None
+    p50 = 50
+    p90 = 90
+    p95 = 95
+    p99 = 99
+
+    @property
+    def percentile(self) -> Optional[int]:
+        return self.value
+
+
+@dataclass(frozen=True)
 class Request:
     route_name: str
     interval: Interval
     start_time: Optional[datetime]
     end_time: datetime
+    statistic: Statistic = Statistic.average
 
 
 @dataclass
 class Response:
     request: Request
     timeseries: Dict[str, List[IntervalMeasurement]]
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
 
 
 class Interval(enum.Enum):
+    minutely = enum.auto()
+    hourly = enum.auto()
     daily = enum.auto()
+    weekly = enum.auto()
+
+    @property
+    def length(self) -> timedelta:
+        return _INTERVAL_LENGTHS[self]
+
+    def truncate(self, timestamp: datetime) -> datetime:
+        """Return the start of the interval containing timestamp.
+        Weeks start on monday.
+        """
+        timestamp = timestamp.replace(second=0, microsecond=0)
+        if self == Interval.minutely:
+            return timestamp
+        timestamp = timestamp.replace(minute=0)
+        if self == Interval.hourly:
+            return timestamp
+        timestamp = timestamp.replace(hour=0)
+        if self == Interval.daily:
+            return timestamp
+        return timestamp - timedelta(days=timestamp.weekday())
+
+
+_INTERVAL_LENGTHS = {
+    Interval.minutely: timedelta(minutes=1),
+    Interval.hourly: timedelta(hours=1),
+    Interval.daily: timedelta(days=1),
+    Interval.weekly: timedelta(weeks=1),
+}
 
 
 @dataclass
 class IntervalMeasurement:
     timestamp: datetime
     value: Optional[float]
-
-
-def _midnight(d: date) -> datetime:
-    return datetime.combine(d, time(), tzinfo=timezone.utc)
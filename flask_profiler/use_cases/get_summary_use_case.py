@@ -6,6 +6,7 @@ from datetime import datetime
 from typing import List, Optional
 
 from flask_profiler.entities import measurement_archive
+from flask_profiler.result_cache import ResultCache
 
 
 class SortingField(enum.Enum):
@@ -27,9 +28,13 @@ class Measurement:
     average_response_time_secs: float
     min_response_time_secs: float
     max_response_time_secs: float
+    p50_response_time_secs: Optional[float]
+    p90_response_time_secs: Optional[float]
+    p95_response_time_secs: Optional[float]
+    p99_response_time_secs: Optional[float]
 
 
-@dataclass
+@dataclass(frozen=True)
 class Request:
     limit: int
     offset: int
@@ -46,13 +51,29 @@ class Response:
     measurements: List[Measurement]
     total_results: int
     request: Request
+    total_results_capped: bool = False
 
 
 @dataclass
 class GetSummaryUseCase:
+    """If count_limit is set, summaries are only counted up to that
+    number.  Responses are reused from the cache if one is given.
+    """
+
     archivist: measurement_archive.MeasurementArchivist
+    count_limit: Optional[int] = None
+    cache: Optional[ResultCache] = None
 
     def get_summary(self, request: Request) -> Response:
+        if self.cache is None:
+            return self._get_summary(request)
+        return self.cache.get_or_compute(
+            self.archivist,
+            key=(GetSummaryUseCase, request),
+            compute=lambda: self._get_summary(request),
+        )
+
+    def _get_summary(self, request: Request) -> Response:
         records = self.archivist.get_records()
         if request.method is not None:
             records = records.with_method(request.method)
@@ -71,8 +92,11 @@ class GetSummaryUseCase:
             results = results.sorted_by_route_name(
                 ascending=request.sorting_order == SortingOrder.ascending
             )
-        total_results = len(results)
-        results = results.limit(request.limit).offset(request.offset)
+        page = (
+            results.limit(request.limit)
+            .offset(request.offset)
+            .counted(cap=self.count_limit)
+        )
         return Response(
             measurements=[
                 Measurement(
@@ -82,9 +106,14 @@ class GetSummaryUseCase:
                     average_response_time_secs=measurement.avg_elapsed,
                     min_response_time_secs=measurement.min_elapsed,
                     max_response_time_secs=measurement.max_elapsed,
+                    p50_response_time_secs=measurement.percentile(50),
+                    p90_response_time_secs=measurement.percentile(90),
+                    p95_response_time_secs=measurement.percentile(95),
+                    p99_response_time_secs=measurement.percentile(99),
                 )
-                for measurement in results
+                for measurement in page.items
             ],
             request=request,
-            total_results=total_results,
+            total_results=page.total_count,
+            total_results_capped=page.is_capped,
         )
@@ -9,6 +9,7 @@ from flask_profiler.entities.measurement_archive import (
     MeasurementArchivist,
 )
 from flask_profiler.entities.request_handler import RequestHandler
+from flask_profiler.entities.sampling import Sampler
 
 
 @dataclass
@@ -28,21 +29,28 @@ class ObserveRequestHandlingUseCase:
     archivist: MeasurementArchivist
     clock: Clock
     request_handler: RequestHandler
+    sampler: Sampler
+    changes_data_version: bool = True
 
     def record_measurement(self, request: Request) -> Response:
         start_timestamp = self.clock.utc_now()
+        start_ns = self.clock.perf_counter_ns()
         try:
             response = self.request_handler.handle_request(
                 args=request.request_args, kwargs=request.request_kwargs
             )
         finally:
-            end_timestamp = self.clock.utc_now()
-            self.archivist.record_measurement(
-                Measurement(
-                    route_name=self.request_handler.name(),
-                    start_timestamp=start_timestamp,
-                    end_timestamp=end_timestamp,
-                    method=request.method,
+            elapsed_ns = self.clock.perf_counter_ns() - start_ns
+            weight = self.sampler.weight(self.request_handler.name(), elapsed_ns)
+            if weight is not None:
+                self.archivist.record_measurement(
+                    Measurement(
+                        route_name=self.request_handler.name(),
+                        start_timestamp=start_timestamp,
+                        elapsed_ns=elapsed_ns,
+                        method=request.method,
+                        weight=weight,
+                        changes_data_version=self.changes_data_version,
+                    )
                 )
-            )
         return Response(request_handler_response=response)
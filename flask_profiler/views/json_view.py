@@ -0,0 +1,12 @@
+import json
+
+from flask_profiler.presenters import json_presenter as presenter
+from flask_profiler.response import HttpResponse
+
+
+class JsonView:
+    def render_view_model(self, view_model: presenter.ViewModel) -> HttpResponse:
+        return HttpResponse(
+            content=json.dumps(view_model.content, separators=(",", ":")),
+            mimetype="application/json",
+        )
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Protocol
+
+from flask_profiler.entities.measurement_archive import Measurement
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BatchArchivist(Protocol):
+    def record_measurements(self, measurements: List[Measurement]) -> None:
+        ...
+
+    def close_connection(self) -> None:
+        ...
+
+
+@dataclass
+class WriteBehindSettings:
+    batch_size: int = 500
+    flush_interval_secs: float = 1.0
+    max_queue_size: int = 10000
+
+
+class WriteBehindQueue:
+    """Collects measurements in a bounded in-process queue and stores
+    them from a background thread.  The queue is drained whenever
+    batch_size measurements are pending or flush_interval_secs have
+    passed since the first pending measurement was queued.  If the
+    queue is full, new measurements are dropped instead of blocking
+    the request thread.
+    """
+
+    def __init__(
+        self,
+        archivist_factory: Callable[[], BatchArchivist],
+        settings: WriteBehindSettings,
+    ) -> None:
+        self.archivist_factory = archivist_factory
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._queue: queue.Queue[Optional[Measurement]] = queue.Queue(
+            maxsize=settings.max_queue_size
+        )
+        self._thread: Optional[threading.Thread] = None
+
+    def record_measurement(self, measurement: Measurement) -> None:
+        self._ensure_running()
+        try:
+            self._queue.put_nowait(measurement)
+        except queue.Full:
+            LOGGER.warning(
+                "Write-behind queue is full, dropping measurement for %s",
+                measurement.route_name,
+            )
+
+    def flush(self) -> None:
+        """Block until all measurements queued so far are stored."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def stop(self) -> None:
+        with self._lock:
+            thread = self._thread
+            if thread is None or self._pid != os.getpid():
+                return
+            self._queue.put(None)
+            thread.join()
+            self._thread = None
+
+    def _ensure_running(self) -> None:
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # We were forked, the parent's worker thread and queue
+                # contents do not exist in this process.
+                self._queue = queue.Queue(maxsize=self.settings.max_queue_size)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="flask-profiler-write-behind", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        archivist = self.archivist_factory()
+        try:
+            while True:
+                batch = self._collect_batch()
+                if batch:
+                    self._write(archivist, [m for m in batch if m is not None])
+                    for _ in batch:
+                        self._queue.task_done()
+                if batch and batch[-1] is None:
+                    return
+        finally:
+            archivist.close_connection()
+
+    def _collect_batch(self) -> List[Optional[Measurement]]:
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return batch
+        deadline = time.monotonic() + self.settings.flush_interval_secs
+        while len(batch) < self.settings.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            if item is None:
+                break
+        return batch
+
+    def _write(
+        self, archivist: BatchArchivist, measurements: List[Measurement]
+    ) -> None:
+        if not measurements:
+            return
+        LOGGER.debug("Storing %s queued measurements", len(measurements))
+        try:
+            archivist.record_measurements(measurements)
+        except Exception as e:
+            LOGGER.error("Failed to store %s measurements", len(measurements))
+            LOGGER.exception(e)
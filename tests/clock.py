@@ -5,6 +5,7 @@ from typing import Optional
 class FakeClock:
     def __init__(self) -> None:
         self.frozen_time: Optional[datetime] = None
+        self.elapsed_ns = 0
 
     def freeze_time(self, t: datetime) -> None:
         if t.tzinfo is None:
@@ -16,6 +17,7 @@ class FakeClock:
 
     def advance_clock(self, dt: timedelta) -> None:
         assert dt >= timedelta(seconds=0)
+        self.elapsed_ns += (dt // timedelta(microseconds=1)) * 1000
         if self.frozen_time:
             self.frozen_time += dt
 
@@ -23,3 +25,6 @@ class FakeClock:
         if self.frozen_time:
             return self.frozen_time
         return datetime.now(tz=timezone.utc)
+
+    def perf_counter_ns(self) -> int:
+        return self.elapsed_ns
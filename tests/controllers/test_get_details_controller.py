@@ -0,0 +1,49 @@
+from datetime import datetime, timezone
+from unittest import TestCase
+
+from flask_profiler.controllers.get_details_controller import GetDetailsController
+from flask_profiler.pagination import format_cursor
+from flask_profiler.use_cases.get_details_use_case import Cursor
+
+from .test_get_summary_controller import FakeHttpRequest
+
+
+class GetDetailsControllerTests(TestCase):
+    def test_that_by_default_no_cursor_is_detected(self) -> None:
+        controller = GetDetailsController(http_request=FakeHttpRequest())
+        request = controller.process_request()
+        assert request.after is None
+        assert request.before is None
+
+    def test_that_cursors_are_parsed_as_start_time_and_record_id(self) -> None:
+        controller = GetDetailsController(
+            http_request=FakeHttpRequest(
+                arguments=dict(after="946684800000001_12", before="0_3")
+            )
+        )
+        request = controller.process_request()
+        assert request.after == Cursor(
+            start_timestamp=datetime(2000, 1, 1, 0, 0, 0, 1, tzinfo=timezone.utc),
+            id=12,
+        )
+        assert request.before == Cursor(
+            start_timestamp=datetime(1970, 1, 1, tzinfo=timezone.utc), id=3
+        )
+
+    def test_that_formatted_cursors_are_parsed_back(self) -> None:
+        cursor = Cursor(
+            start_timestamp=datetime(2023, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc),
+            id=42,
+        )
+        controller = GetDetailsController(
+            http_request=FakeHttpRequest(arguments=dict(after=format_cursor(cursor)))
+        )
+        assert controller.process_request().after == cursor
+
+    def test_that_invalid_cursors_are_ignored(self) -> None:
+        controller = GetDetailsController(
+            http_request=FakeHttpRequest(arguments=dict(after="abc", before="12"))
+        )
+        request = controller.process_request()
+        assert request.after is None
+        assert request.before is None
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta, timezone
+from unittest import TestCase
+
+from flask_profiler.controllers.get_route_overview_controller import (
+    GetRouteOverviewController,
+)
+from flask_profiler.use_cases import get_route_overview as uc
+from tests.clock import FakeClock
+
+from .test_get_summary_controller import FakeHttpRequest
+
+
+class GetRouteOverviewControllerTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.clock = FakeClock()
+        self.clock.freeze_time(datetime(2000, 1, 1, tzinfo=timezone.utc))
+
+    def test_that_daily_interval_is_requested_by_default(self) -> None:
+        request = self.create_controller().handle_request()
+        assert request.interval == uc.Interval.daily
+
+    def test_that_interval_argument_is_parsed_properly(self) -> None:
+        examples = [
+            ("minute", uc.Interval.minutely),
+            ("hour", uc.Interval.hourly),
+            ("day", uc.Interval.daily),
+            ("week", uc.Interval.weekly),
+            ("fortnight", uc.Interval.daily),
+        ]
+        for argument, expected_interval in examples:
+            request = self.create_controller(interval=argument).handle_request()
+            assert request.interval == expected_interval
+
+    def test_that_average_is_requested_by_default(self) -> None:
+        request = self.create_controller().handle_request()
+        assert request.statistic == uc.Statistic.average
+
+    def test_that_statistic_argument_is_parsed_properly(self) -> None:
+        for statistic in uc.Statistic:
+            request = self.create_controller(statistic=statistic.name).handle_request()
+            assert request.statistic == statistic
+
+    def test_that_end_time_includes_the_current_interval(self) -> None:
+        request = self.create_controller(interval="hour").handle_request()
+        assert request.end_time == self.clock.utc_now() + timedelta(hours=1)
+
+    def test_that_end_time_is_aligned_to_the_end_of_the_current_interval(
+        self,
+    ) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1, 10, 30, tzinfo=timezone.utc))
+        request = self.create_controller(interval="hour").handle_request()
+        assert request.end_time == datetime(2000, 1, 1, 11, tzinfo=timezone.utc)
+
+    def create_controller(self, **arguments: str) -> GetRouteOverviewController:
+        return GetRouteOverviewController(
+            clock=self.clock,
+            http_request=FakeHttpRequest(
+                arguments=arguments, path=dict(route_name="route")
+            ),
+        )
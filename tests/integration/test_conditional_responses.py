@@ -0,0 +1,91 @@
+import pathlib
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from flask import Flask
+from flask_testing import TestCase
+
+from flask_profiler import init_app
+from flask_profiler.sqlite import Sqlite
+
+
+class ConditionalResponseTests(TestCase):
+    config: Dict[str, Any] = dict(profile_self=False)
+
+    def tearDown(self) -> None:
+        super().tearDown()
+        shutil.rmtree(self.data_dir)
+
+    def create_app(self) -> Flask:
+        self.data_dir = pathlib.Path(tempfile.mkdtemp())
+        app = Flask("Conditional response test app")
+        app.config["flask_profiler"] = dict(
+            enabled=True,
+            endpointRoot="profiling",
+            storage=dict(
+                FILE=str(self.data_dir / "db.sql"),
+            ),
+            basicAuth=dict(
+                enabled=False,
+            ),
+            **self.config,
+        )
+
+        @app.route("/")
+        def hello_world() -> str:
+            return "<p>Hello, World!</p>"
+
+        init_app(app)
+        return app
+
+    def test_that_unchanged_pages_are_not_sent_again(self) -> None:
+        self.client.get("/")
+        for url in [
+            "/profiling/",
+            "/profiling/details/",
+            "/profiling/route/hello_world",
+        ]:
+            response = self.client.get(url)
+            assert response.status_code == 200
+            assert response.headers["ETag"]
+            response = self.client.get(
+                url, headers={"If-None-Match": response.headers["ETag"]}
+            )
+            assert response.status_code == 304
+
+    def test_that_page_is_sent_again_after_new_measurement(self) -> None:
+        etag = self.client.get("/profiling/").headers["ETag"]
+        self.client.get("/")
+        response = self.client.get("/profiling/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_that_page_is_sent_again_after_measurements_were_deleted(self) -> None:
+        self.client.get("/")
+        etag = self.client.get("/profiling/").headers["ETag"]
+        db = Sqlite(str(self.data_dir / "db.sql"))
+        db.delete_measurements_until(datetime.now(timezone.utc), limit=10)
+        db.close_connection()
+        response = self.client.get("/profiling/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_that_pages_with_other_arguments_have_other_etags(self) -> None:
+        first = self.client.get("/profiling/").headers["ETag"]
+        second = self.client.get("/profiling/?page=2").headers["ETag"]
+        assert first != second
+
+
+class SelfProfilingConditionalResponseTests(ConditionalResponseTests):
+    """profile_self is left at its default, so the pages of the profiler
+    are measured too.
+    """
+
+    config: Dict[str, Any] = dict()
+
+    def test_that_measurements_of_profiler_pages_are_recorded(self) -> None:
+        self.client.get("/profiling/")
+        response = self.client.get("/profiling/details/")
+        assert b"flask_profiler.summary" in response.data
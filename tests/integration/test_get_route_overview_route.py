@@ -38,6 +38,15 @@ class BasicAuthTests(TestCase):
         assert self.client.get("/").status_code == 200
         assert self.client.get("/profiling/route/hello_world").status_code == 200
 
+    def test_can_access_a_routes_overview_page_with_every_interval(self) -> None:
+        assert self.client.get("/").status_code == 200
+        for interval in ["minute", "hour", "day", "week"]:
+            response = self.client.get(
+                "/profiling/route/hello_world",
+                query_string=dict(interval=interval, statistic="p95"),
+            )
+            assert response.status_code == 200
+
     def test_trying_to_access_route_details_for_non_existing_route_returns_200(
         self,
     ) -> None:
@@ -0,0 +1,85 @@
+import pathlib
+import shutil
+import tempfile
+
+from flask import Flask
+from flask_testing import TestCase
+
+from flask_profiler import init_app
+
+
+class JsonApiTests(TestCase):
+    def tearDown(self) -> None:
+        super().tearDown()
+        shutil.rmtree(self.data_dir)
+
+    def create_app(self) -> Flask:
+        self.data_dir = pathlib.Path(tempfile.mkdtemp())
+        app = Flask("JSON API test app")
+        app.config["flask_profiler"] = dict(
+            enabled=True,
+            endpointRoot="profiling",
+            profile_self=False,
+            storage=dict(
+                FILE=str(self.data_dir / "db.sql"),
+            ),
+            basicAuth=dict(
+                enabled=False,
+            ),
+        )
+
+        @app.route("/")
+        def hello_world() -> str:
+            return "<p>Hello, World!</p>"
+
+        init_app(app)
+        return app
+
+    def test_that_summary_lists_measured_routes(self) -> None:
+        self.client.get("/")
+        self.client.get("/")
+        response = self.client.get("/profiling/api/summary")
+        assert response.status_code == 200
+        assert response.mimetype == "application/json"
+        assert response.json["total_results"] == 1
+        (measurement,) = response.json["measurements"]
+        assert measurement["name"] == "hello_world"
+        assert measurement["request_count"] == 2
+
+    def test_that_details_list_every_measurement(self) -> None:
+        self.client.get("/")
+        self.client.get("/")
+        response = self.client.get("/profiling/api/details")
+        assert response.status_code == 200
+        assert response.json["total_result_count"] == 2
+        assert len(response.json["measurements"]) == 2
+
+    def test_that_details_can_be_filtered(self) -> None:
+        self.client.get("/")
+        matching = self.client.get(
+            "/profiling/api/details", query_string=dict(name="hello")
+        )
+        other = self.client.get(
+            "/profiling/api/details", query_string=dict(name="other")
+        )
+        assert len(matching.json["measurements"]) == 1
+        assert other.json["measurements"] == []
+
+    def test_that_route_overview_has_a_timeseries_per_method(self) -> None:
+        self.client.get("/")
+        response = self.client.get(
+            "/profiling/api/route/hello_world", query_string=dict(interval="hour")
+        )
+        assert response.status_code == 200
+        assert response.json["request"]["interval"] == "hourly"
+        assert len(response.json["timeseries"]["GET"]) == 1
+
+    def test_that_records_are_sent_column_oriented_on_request(self) -> None:
+        self.client.get("/")
+        self.client.get("/")
+        response = self.client.get(
+            "/profiling/api/details", query_string=dict(format="columns")
+        )
+        measurements = response.json["measurements"]
+        assert measurements["name"] == ["hello_world", "hello_world"]
+        assert len(measurements["started_at"]) == 2
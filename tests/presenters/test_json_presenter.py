@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from typing import Dict
+from unittest import TestCase
+
+from flask_profiler.presenters.json_presenter import JsonPresenter, ViewModel
+from flask_profiler.use_cases import get_route_overview as uc
+
+
+class FakeHttpRequest:
+    def __init__(self, **arguments: str) -> None:
+        self.arguments = arguments
+
+    def get_arguments(self) -> Dict[str, str]:
+        return self.arguments
+
+    def path_arguments(self) -> Dict[str, str]:
+        return dict()
+
+
+class JsonPresenterTests(TestCase):
+    TIMESTAMP = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    def test_that_datetimes_and_enums_are_encoded_as_strings(self) -> None:
+        content = self.present().content
+        assert content["start_time"] == "2000-01-01T00:00:00+00:00"
+        assert content["request"]["interval"] == "daily"
+        assert content["request"]["statistic"] == "average"
+
+    def test_that_records_are_encoded_as_objects_by_default(self) -> None:
+        content = self.present().content
+        assert content["timeseries"]["GET"] == [
+            {"timestamp": "2000-01-01T00:00:00+00:00", "value": 1.0},
+            {"timestamp": "2000-01-02T00:00:00+00:00", "value": None},
+        ]
+
+    def test_that_records_are_encoded_as_columns_on_request(self) -> None:
+        content = self.present(format="columns").content
+        assert content["timeseries"]["GET"] == {
+            "timestamp": ["2000-01-01T00:00:00+00:00", "2000-01-02T00:00:00+00:00"],
+            "value": [1.0, None],
+        }
+
+    def present(self, **arguments: str) -> ViewModel:
+        presenter = JsonPresenter(http_request=FakeHttpRequest(**arguments))
+        return presenter.present_response(
+            uc.Response(
+                request=uc.Request(
+                    route_name="route",
+                    interval=uc.Interval.daily,
+                    start_time=None,
+                    end_time=self.TIMESTAMP.replace(day=3),
+                ),
+                timeseries={
+                    "GET": [
+                        uc.IntervalMeasurement(timestamp=self.TIMESTAMP, value=1.0),
+                        uc.IntervalMeasurement(
+                            timestamp=self.TIMESTAMP.replace(day=2), value=None
+                        ),
+                    ]
+                },
+                start_time=self.TIMESTAMP,
+                end_time=self.TIMESTAMP.replace(day=3),
+            )
+        )
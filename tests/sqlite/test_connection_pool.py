@@ -0,0 +1,172 @@
+import os
+import pathlib
+import shutil
+import sqlite3
+import tempfile
+from unittest import TestCase, skipUnless
+
+from flask_profiler.sqlite import ConnectionPool, Sqlite
+from flask_profiler.sqlite.connection_pool import QueryBudget
+from flask_profiler.sqlite.select_query import FETCH_BATCH_SIZE
+
+from .test_rollups import create_measurement
+
+LONG_QUERY = (
+    "WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 100000)"
+    " SELECT COUNT(*) FROM n"
+)
+
+
+class ConnectionPoolTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data_dir = pathlib.Path(tempfile.mkdtemp())
+        self.pool = ConnectionPool(str(self.data_dir / "db.sql"), max_idle_readers=1)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        shutil.rmtree(self.data_dir)
+        super().tearDown()
+
+    def test_that_released_reader_connection_is_reused(self) -> None:
+        connection = self.pool.acquire_reader()
+        self.pool.release_reader(connection)
+        assert self.pool.acquire_reader() is connection
+
+    def test_that_readers_in_use_are_not_handed_out_twice(self) -> None:
+        connection = self.pool.acquire_reader()
+        assert self.pool.acquire_reader() is not connection
+
+    def test_that_writer_connection_is_shared(self) -> None:
+        with self.pool.writer() as first_connection:
+            pass
+        with self.pool.writer() as second_connection:
+            assert first_connection is second_connection
+
+    def test_that_readers_see_committed_writes(self) -> None:
+        with self.pool.writer() as connection:
+            connection.execute("CREATE TABLE test (x INTEGER)")
+            connection.execute("INSERT INTO test VALUES (1)")
+            connection.commit()
+        reader = self.pool.acquire_reader()
+        assert reader.execute("SELECT x FROM test").fetchone()[0] == 1
+
+    def test_that_readers_exceeding_idle_limit_are_closed_on_release(self) -> None:
+        first_connection = self.pool.acquire_reader()
+        second_connection = self.pool.acquire_reader()
+        self.pool.release_reader(first_connection)
+        self.pool.release_reader(second_connection)
+        assert self.pool.acquire_reader() is first_connection
+        assert self.pool.acquire_reader() is not second_connection
+
+    def test_that_closing_sqlite_archive_returns_connection_to_pool(self) -> None:
+        db = Sqlite(self.pool.sqlite_file, pool=self.pool)
+        connection = db.connection
+        db.close_connection()
+        assert self.pool.acquire_reader() is connection
+
+    @skipUnless(hasattr(os, "fork"), "requires os.fork")
+    def test_that_inherited_connections_are_not_used_after_fork(self) -> None:
+        connection = self.pool.acquire_reader()
+        self.pool.release_reader(connection)
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if self.pool.acquire_reader() is not connection else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
+    def test_that_readers_cannot_write(self) -> None:
+        reader = self.pool.acquire_reader()
+        with self.assertRaises(sqlite3.OperationalError):
+            reader.execute("CREATE TABLE test (x INTEGER)")
+
+    def test_that_readers_have_no_budget_by_default(self) -> None:
+        assert self.pool.acquire_reader().budget is None
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data_dir = pathlib.Path(tempfile.mkdtemp())
+        self.pool = ConnectionPool(str(self.data_dir / "db.sql"), reader_time_budget=10)
+        self.now = 0.0
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        shutil.rmtree(self.data_dir)
+        super().tearDown()
+
+    def test_that_query_exceeding_the_budget_is_interrupted(self) -> None:
+        budget = self.reader_budget()
+        with budget.running():
+            self.now = 11
+            with self.assertRaises(sqlite3.OperationalError):
+                self.reader.execute(LONG_QUERY).fetchone()
+
+    def test_that_query_within_the_budget_completes(self) -> None:
+        budget = self.reader_budget()
+        with budget.running():
+            self.now = 9
+            assert self.reader.execute(LONG_QUERY).fetchone()[0] == 100000
+
+    def test_that_queries_outside_of_the_budget_are_not_interrupted(self) -> None:
+        budget = self.reader_budget()
+        with budget.running():
+            pass
+        self.now = 11
+        assert self.reader.execute(LONG_QUERY).fetchone()[0] == 100000
+
+    def test_that_writer_has_no_budget(self) -> None:
+        with self.pool.writer() as connection:
+            assert connection.budget is None
+
+    def test_that_nested_queries_keep_the_outer_deadline(self) -> None:
+        budget = self.reader_budget()
+        with budget.running():
+            with budget.running():
+                pass
+            self.now = 11
+            with self.assertRaises(sqlite3.OperationalError):
+                self.reader.execute(LONG_QUERY).fetchone()
+
+    def test_that_budget_is_not_armed_while_caller_holds_the_iterator(
+        self,
+    ) -> None:
+        db = self.database_with_records(2 * FETCH_BATCH_SIZE)
+        records = iter(db.get_records())
+        next(records)
+        assert db.connection.budget
+        assert db.connection.budget.deadline is None
+
+    def test_that_time_spent_by_the_caller_does_not_count(self) -> None:
+        db = self.database_with_records(2 * FETCH_BATCH_SIZE)
+        assert db.connection.budget
+        db.connection.budget.clock = lambda: self.now
+        count = 0
+        for _ in db.get_records():
+            self.now += 1
+            count += 1
+        assert count == 2 * FETCH_BATCH_SIZE
+
+    def database_with_records(self, count: int) -> Sqlite:
+        db = Sqlite(str(self.data_dir / "db.sql"), pool=self.pool)
+        self.addCleanup(db.close_connection)
+        db.create_database()
+        db.record_measurements([create_measurement() for _ in range(count)])
+        return db
+
+    def reader_budget(self) -> QueryBudget:
+        self.reader = self.pool.acquire_reader()
+        budget = self.reader.budget
+        assert budget is not None
+        budget.clock = lambda: self.now
+        return budget
+
+
+class InMemoryConnectionPoolTests(TestCase):
+    def test_that_reader_and_writer_share_the_same_database(self) -> None:
+        pool = ConnectionPool(":memory:")
+        with pool.writer() as connection:
+            connection.execute("CREATE TABLE test (x INTEGER)")
+        reader = pool.acquire_reader()
+        assert reader.execute("SELECT COUNT(*) FROM test").fetchone()[0] == 0
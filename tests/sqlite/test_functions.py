@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+from hypothesis import given, strategies
+
+from flask_profiler.entities.histogram import Histogram
+from flask_profiler.sqlite import functions
+from flask_profiler.sqlite.connection_pool import ConnectionPool
+
+
+class HistogramFunctionTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.pool = ConnectionPool(":memory:")
+        self.connection = self.pool.acquire_reader()
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        super().tearDown()
+
+    @given(values=strategies.lists(strategies.floats(min_value=1e-6, max_value=1e4)))
+    def test_that_encoded_histograms_can_be_decoded(self, values: list[float]) -> None:
+        histogram = Histogram.from_values(values)
+        assert (
+            functions.decode_histogram(functions.encode_histogram(histogram))
+            == histogram
+        )
+
+    def test_that_missing_histogram_is_decoded_as_empty(self) -> None:
+        assert functions.decode_histogram(None) == Histogram()
+
+    def test_that_histogram_aggregate_is_available_on_pooled_connections(
+        self,
+    ) -> None:
+        (data,) = self.connection.execute(
+            "SELECT histogram(value) FROM (SELECT 0.5 AS value UNION ALL SELECT 1.5)"
+        ).fetchone()
+        assert functions.decode_histogram(data) == Histogram.from_values([0.5, 1.5])
+
+    def test_that_histograms_are_merged_in_sql(self) -> None:
+        a = functions.encode_histogram(Histogram.from_values([0.5]))
+        b = functions.encode_histogram(Histogram.from_values([1.5]))
+        (merged,) = self.connection.execute(
+            "SELECT histogram_merge(h) FROM (SELECT ? AS h UNION ALL SELECT ?)",
+            [a, b],
+        ).fetchone()
+        (combined,) = self.connection.execute(
+            "SELECT histogram_combine(?, ?)", [a, b]
+        ).fetchone()
+        assert merged == combined
+        assert functions.decode_histogram(merged) == Histogram.from_values([0.5, 1.5])
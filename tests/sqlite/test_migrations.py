@@ -1,7 +1,10 @@
 import sqlite3
 from unittest import TestCase
+from urllib.parse import quote
 
-from flask_profiler.sqlite.migrations import Migrations
+from flask_profiler.entities.measurement_archive import Measurement
+from flask_profiler.sqlite import Sqlite, functions
+from flask_profiler.sqlite.migrations import Migration, Migrations
 
 
 class MigrationTests(TestCase):
@@ -9,3 +12,92 @@ class MigrationTests(TestCase):
         connection = sqlite3.connect(":memory:")
         migrations = Migrations(connection)
         migrations.run_necessary_migrations()
+
+    def test_that_database_is_at_latest_version_after_migrations(self) -> None:
+        connection = sqlite3.connect(":memory:")
+        migrations = Migrations(connection)
+        migrations.run_necessary_migrations()
+        assert migrations.get_current_version(connection.cursor()) == len(
+            migrations.migration_files
+        )
+
+    def test_that_running_migrations_twice_is_possible(self) -> None:
+        connection = sqlite3.connect(":memory:")
+        Migrations(connection).run_necessary_migrations()
+        Migrations(connection).run_necessary_migrations()
+
+
+class ElapsedColumnMigrationTests(TestCase):
+    def test_that_elapsed_time_of_existing_measurements_is_backfilled(self) -> None:
+        connection = sqlite3.connect(":memory:")
+        functions.register(connection)
+        migrations = Migrations(connection)
+        cursor = connection.cursor()
+        for filename in migrations.migration_files[:5]:
+            Migration.from_filename(filename).run(cursor)
+        cursor.execute(
+            'INSERT INTO "measurements" '
+            '("route_name", "start_timestamp", "end_timestamp", "method") '
+            "VALUES (?, ?, ?, ?)",
+            ["route", 1000.25, 1001.75, "GET"],
+        )
+        connection.commit()
+        migrations.run_necessary_migrations()
+        (elapsed_ns,) = connection.execute(
+            'SELECT "elapsed_ns" FROM "measurements"'
+        ).fetchone()
+        assert elapsed_ns == 1_500_000_000
+
+
+class RouteTableMigrationTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = Sqlite(":memory:")
+        migrations = Migrations(self.db.connection)
+        cursor = self.db.connection.cursor()
+        # Rollups are backfilled by the migration that creates them.
+        for filename in migrations.migration_files[:2]:
+            Migration.from_filename(filename).run(cursor)
+        for route_name, method in [("/a b", "GET"), ("/a b", "POST"), ("/c", "GET")]:
+            cursor.execute(
+                'INSERT INTO "measurements" '
+                '("route_name", "start_timestamp", "end_timestamp", "method") '
+                "VALUES (?, ?, ?, ?)",
+                [quote(route_name), 1000.0, 1001.0, quote(method)],
+            )
+        self.db.connection.commit()
+        migrations.run_necessary_migrations()
+
+    def test_that_every_route_is_moved_to_the_routes_table(self) -> None:
+        rows = self.db.connection.execute(
+            'SELECT "route_name", "method" FROM "routes"'
+        ).fetchall()
+        assert sorted(map(tuple, rows)) == [
+            ("/a b", "GET"),
+            ("/a b", "POST"),
+            ("/c", "GET"),
+        ]
+
+    def test_that_existing_measurements_keep_their_id_and_route(self) -> None:
+        records = sorted(self.db.get_records(), key=lambda record: record.id)
+        assert [(r.id, r.name, r.method) for r in records] == [
+            (1, "/a b", "GET"),
+            (2, "/a b", "POST"),
+            (3, "/c", "GET"),
+        ]
+
+    def test_that_rollups_are_moved_to_the_new_routes(self) -> None:
+        summaries = self.db.get_records().with_name("/a b").summarize()
+        assert sorted(summary.method for summary in summaries) == ["GET", "POST"]
+
+    def test_that_new_measurements_get_ids_after_the_existing_ones(self) -> None:
+        measurement = next(iter(self.db.get_records()))
+        id_ = self.db.record_measurement(
+            Measurement(
+                route_name=measurement.name,
+                start_timestamp=measurement.start_timestamp,
+                elapsed_ns=measurement.elapsed_ns,
+                method=measurement.method,
+            )
+        )
+        assert id_ == 4
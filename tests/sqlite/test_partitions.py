@@ -0,0 +1,176 @@
+from dataclasses import replace
+from datetime import timedelta
+from typing import List
+from unittest import TestCase
+
+from flask_profiler.sqlite import Sqlite
+from flask_profiler.sqlite.partitions import Partition, Partitioning
+
+from .test_rollups import ORIGIN, assert_summaries_equal, create_measurement
+
+
+class PartitionTests(TestCase):
+    def test_that_unbounded_partition_intersects_every_window(self) -> None:
+        assert Partition(table="measurements").intersects(1, 2)
+
+    def test_that_partition_does_not_intersect_window_ending_at_its_start(
+        self,
+    ) -> None:
+        assert not Partition(table="p", since=10, until=20).intersects(0, 10)
+
+    def test_that_partition_does_not_intersect_window_starting_at_its_end(
+        self,
+    ) -> None:
+        assert not Partition(table="p", since=10, until=20).intersects(20, None)
+
+    def test_that_partitions_are_aligned_to_their_period(self) -> None:
+        partition = Partitioning(days=1).partition_for(
+            (ORIGIN + timedelta(hours=12)).timestamp()
+        )
+        assert partition.table == "measurements_20000101_1d"
+        assert partition.since == ORIGIN.timestamp()
+        assert partition.until == (ORIGIN + timedelta(days=1)).timestamp()
+
+
+class PartitionedStorageTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = Sqlite(":memory:", partitioning=Partitioning(days=1))
+        self.db.create_database()
+        self.db.record_measurements(
+            [create_measurement(offset=timedelta(hours=6 * n)) for n in range(12)]
+        )
+
+    def test_that_measurements_are_written_to_one_partition_per_day(self) -> None:
+        assert self.partition_tables() == [
+            "measurements",
+            "measurements_20000101_1d",
+            "measurements_20000102_1d",
+            "measurements_20000103_1d",
+        ]
+
+    def test_that_all_partitions_are_read(self) -> None:
+        assert len(self.db.get_records()) == 12
+
+    def test_that_ids_are_unique_across_partitions(self) -> None:
+        id_ = self.db.record_measurement(create_measurement())
+        ids = [record.id for record in self.db.get_records()]
+        assert len(set(ids)) == 13
+        assert id_ == max(ids)
+
+    def test_that_records_are_ordered_across_partitions(self) -> None:
+        records = list(self.db.get_records().ordered_by_start_time(ascending=False))
+        assert [record.start_timestamp for record in records] == [
+            ORIGIN + timedelta(hours=6 * n) for n in reversed(range(12))
+        ]
+
+    def test_that_only_partitions_in_the_time_window_are_read(self) -> None:
+        records = self.db.get_records().requested_after(
+            ORIGIN + timedelta(days=2, hours=1)
+        )
+        query = records.query.as_query()
+        assert "measurements_20000103_1d" in query
+        assert "measurements_20000102_1d" not in query
+        assert len(records) == 3
+
+    def test_that_summaries_from_rollups_equal_summaries_from_raw_rows(
+        self,
+    ) -> None:
+        records = self.db.get_records().requested_after(ORIGIN + timedelta(hours=13))
+        assert_summaries_equal(
+            records.summarize(), replace(records, rollup_conditions=None).summarize()
+        )
+
+    def test_that_partitions_before_the_cutoff_are_dropped(self) -> None:
+        deleted = self.db.delete_measurements_until(
+            ORIGIN + timedelta(days=1, hours=1), limit=1
+        )
+        assert deleted == 4
+        assert "measurements_20000101_1d" not in self.partition_tables()
+        assert "measurements_20000101_1d" not in self.sqlite_tables()
+        assert len(self.db.get_records()) == 8
+
+    def test_that_rollups_stay_exact_when_dropping_reaches_the_limit(self) -> None:
+        self.db.delete_measurements_until(ORIGIN + timedelta(days=1, hours=7), limit=1)
+        records = self.db.get_records().requested_after(
+            ORIGIN + timedelta(days=1, minutes=30)
+        )
+        assert_summaries_equal(
+            records.summarize(), replace(records, rollup_conditions=None).summarize()
+        )
+
+    def test_that_rows_of_partial_partitions_are_deleted_up_to_limit(self) -> None:
+        cutoff = ORIGIN + timedelta(days=1, hours=7)
+        assert self.db.delete_measurements_until(cutoff, limit=5) == 5
+        assert self.db.delete_measurements_until(cutoff, limit=5) == 1
+        oldest = self.db.get_records().ordered_by_start_time().first()
+        assert oldest
+        assert oldest.start_timestamp == ORIGIN + timedelta(days=1, hours=12)
+
+    def test_that_existing_partitions_are_not_created_again(self) -> None:
+        statements: List[str] = []
+        self.db.connection.set_trace_callback(statements.append)
+        self.db.record_measurements(
+            [create_measurement(offset=timedelta(hours=n)) for n in range(24)]
+        )
+        self.db.connection.set_trace_callback(None)
+        assert not [
+            statement for statement in statements if statement.startswith("CREATE")
+        ]
+
+    def test_that_every_new_partition_is_created_once_per_batch(self) -> None:
+        statements: List[str] = []
+        self.db.connection.set_trace_callback(statements.append)
+        self.db.record_measurements(
+            [create_measurement(offset=timedelta(days=5, hours=n)) for n in range(24)]
+        )
+        self.db.connection.set_trace_callback(None)
+        assert (
+            len(
+                [
+                    statement
+                    for statement in statements
+                    if statement.startswith("CREATE TABLE")
+                ]
+            )
+            == 1
+        )
+
+    def test_that_dropped_partitions_are_created_again(self) -> None:
+        self.db.delete_measurements_until(ORIGIN + timedelta(days=1), limit=1)
+        self.db.record_measurement(create_measurement(offset=timedelta(hours=1)))
+        assert "measurements_20000101_1d" in self.partition_tables()
+        assert len(self.db.get_records()) == 9
+
+    def test_that_partitions_dropped_by_other_connections_are_created_again(
+        self,
+    ) -> None:
+        with self.db.pool.writer() as connection:
+            connection.execute('DROP TABLE "measurements_20000101_1d"')
+            connection.execute(
+                """DELETE FROM "partitions" WHERE "name" = 'measurements_20000101_1d'"""
+            )
+            connection.commit()
+        self.db.record_measurement(create_measurement())
+        assert "measurements_20000101_1d" in self.sqlite_tables()
+
+    def test_that_measurements_can_be_read_without_partitioning(self) -> None:
+        db = Sqlite(":memory:", pool=self.db.pool)
+        db.record_measurement(create_measurement())
+        assert len(db.get_records()) == 13
+
+    def partition_tables(self) -> List[str]:
+        return [
+            row["name"]
+            for row in self.db.connection.execute(
+                'SELECT "name" FROM "partitions" ORDER BY "name"'
+            )
+        ]
+
+    def sqlite_tables(self) -> List[str]:
+        return [
+            row["name"]
+            for row in self.db.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )
+        ]
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+from unittest import TestCase
+
+from flask_profiler.sqlite import Sqlite
+from flask_profiler.sqlite.select_query import SelectQuery
+
+
+class QueryPlanTests(TestCase):
+    TIMESTAMP = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = Sqlite(":memory:")
+        self.db.create_database()
+
+    def test_that_summary_of_all_time_is_read_from_daily_rollups_only(self) -> None:
+        plan = self.explain(self.db.get_records().summarize())
+        assert "SCAN rollup_day" in plan
+        assert not any("measurements" in step for step in plan)
+
+    def test_that_summary_of_route_and_method_is_searched_via_primary_key(
+        self,
+    ) -> None:
+        plan = self.explain(
+            self.db.get_records().with_name("route").with_method("GET").summarize()
+        )
+        assert any(
+            step.startswith("SEARCH rollup_day USING PRIMARY KEY") for step in plan
+        )
+
+    def test_that_summary_of_time_window_reads_raw_rows_only_at_the_edges(
+        self,
+    ) -> None:
+        plan = self.explain(
+            self.db.get_records()
+            .requested_after(self.TIMESTAMP + timedelta(seconds=1))
+            .requested_before(self.TIMESTAMP + timedelta(days=2))
+            .summarize()
+        )
+        assert (
+            "SEARCH rollup_day USING INDEX rollup_day_bucket (bucket>? AND bucket<?)"
+            in plan
+        )
+        assert (
+            "SEARCH measurements USING INDEX measurements_start_timestamp (start_timestamp>? AND start_timestamp<?)"
+            in plan
+        )
+
+    def test_that_raw_edges_of_route_summary_are_read_from_covering_index(
+        self,
+    ) -> None:
+        plan = self.explain(
+            self.db.get_records()
+            .with_name("route")
+            .with_method("GET")
+            .requested_after(self.TIMESTAMP + timedelta(seconds=30))
+            .requested_before(self.TIMESTAMP + timedelta(seconds=50))
+            .summarize()
+        )
+        assert any(
+            step.startswith("SEARCH measurements USING COVERING INDEX") for step in plan
+        )
+
+    def test_that_route_overview_searches_route_by_name_and_start_time(
+        self,
+    ) -> None:
+        plan = self.explain(
+            self.db.get_records()
+            .with_name("route")
+            .summarize_by_interval(
+                since=self.TIMESTAMP,
+                until=self.TIMESTAMP + timedelta(days=10, seconds=1),
+                interval_length=timedelta(days=1),
+            )
+        )
+        assert (
+            "SEARCH rollup_day USING PRIMARY KEY (route_id=? AND bucket>? AND bucket<?)"
+            in plan
+        )
+        assert (
+            "SEARCH measurements USING COVERING INDEX measurements_summary (route_id=? AND start_timestamp>? AND start_timestamp<?)"
+            in plan
+        )
+
+    def test_that_route_is_looked_up_by_name_via_index(self) -> None:
+        plan = self.explain(self.db.get_records().with_name("route"))
+        assert (
+            "SEARCH routes USING COVERING INDEX sqlite_autoindex_routes_1 (route_name=?)"
+            in plan
+        )
+        assert (
+            "SEARCH measurements USING COVERING INDEX measurements_summary (route_id=?)"
+            in plan
+        )
+
+    def test_that_name_substring_is_resolved_on_routes_table(self) -> None:
+        plan = self.explain(self.db.get_records().with_name_containing("route"))
+        assert "SCAN routes" in plan
+        assert (
+            "SEARCH measurements USING COVERING INDEX measurements_summary (route_id=?)"
+            in plan
+        )
+
+    def test_that_summary_of_name_substring_is_searched_via_primary_key(
+        self,
+    ) -> None:
+        plan = self.explain(
+            self.db.get_records().with_name_containing("route").summarize()
+        )
+        assert "SEARCH rollup_day USING PRIMARY KEY (route_id=?)" in plan
+        assert not any("measurements" in step for step in plan)
+
+    def test_that_records_are_filtered_by_time_via_index(self) -> None:
+        plan = self.explain(self.db.get_records().requested_after(self.TIMESTAMP))
+        assert (
+            "SEARCH measurements USING INDEX measurements_start_timestamp (start_timestamp>?)"
+            in plan
+        )
+
+    def test_that_next_page_is_found_via_index_without_sorting(self) -> None:
+        plan = self.explain(
+            self.db.get_records()
+            .following(self.TIMESTAMP, 1)
+            .ordered_by_start_time()
+            .limit(20)
+        )
+        assert any("USING INDEX measurements_start_timestamp" in step for step in plan)
+        assert not any("TEMP B-TREE" in step for step in plan)
+
+    def test_that_page_of_records_is_read_via_index_without_sorting(self) -> None:
+        plan = self.explain(
+            self.db.get_records().ordered_by_start_time().offset(20).limit(21)
+        )
+        assert any("USING INDEX measurements_start_timestamp" in step for step in plan)
+        assert not any("TEMP B-TREE" in step for step in plan)
+
+    def explain(self, result: SelectQuery[Any]) -> List[str]:
+        return [
+            row["detail"]
+            for row in self.db.connection.execute(
+                "EXPLAIN QUERY PLAN " + result.query.as_query(),
+                result.query.parameters(),
+            )
+        ]
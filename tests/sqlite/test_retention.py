@@ -0,0 +1,128 @@
+import os
+import tempfile
+from dataclasses import replace
+from datetime import timedelta
+from unittest import TestCase
+
+from flask_profiler.sqlite import Sqlite, rollups
+from flask_profiler.sqlite.partitions import Partitioning
+
+from .test_rollups import ORIGIN, assert_summaries_equal, create_measurement
+
+
+class DeleteMeasurementsTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = Sqlite(":memory:")
+        self.db.create_database()
+        self.db.record_measurements(
+            [create_measurement(offset=timedelta(hours=n)) for n in range(72)]
+        )
+
+    def test_that_at_most_limit_measurements_are_deleted(self) -> None:
+        assert (
+            self.db.delete_measurements_until(ORIGIN + timedelta(days=1), limit=10)
+            == 10
+        )
+        assert len(self.db.get_records()) == 62
+
+    def test_that_the_oldest_measurements_are_deleted(self) -> None:
+        self.db.delete_measurements_until(ORIGIN + timedelta(hours=5), limit=100)
+        oldest = self.db.get_records().ordered_by_start_time().first()
+        assert oldest
+        assert oldest.start_timestamp == ORIGIN + timedelta(hours=6)
+
+    def test_that_summaries_from_rollups_still_equal_those_from_raw_rows(
+        self,
+    ) -> None:
+        self.db.delete_measurements_until(
+            ORIGIN + timedelta(days=1, hours=5), limit=100
+        )
+        records = self.db.get_records().requested_after(ORIGIN + timedelta(days=2))
+        assert_summaries_equal(
+            records.summarize(), replace(records, rollup_conditions=None).summarize()
+        )
+
+    def test_that_unbounded_summaries_equal_those_from_raw_rows(self) -> None:
+        self.db.delete_measurements_until(
+            ORIGIN + timedelta(days=1, hours=5), limit=100
+        )
+        self.assert_rollups_match_raw_rows()
+        (summary,) = self.db.get_records().summarize()
+        assert summary.count == 42
+        assert summary.first_measurement == ORIGIN + timedelta(days=1, hours=6)
+
+    def test_that_summaries_are_exact_after_a_limited_batch(self) -> None:
+        self.db.delete_measurements_until(ORIGIN + timedelta(days=2), limit=10)
+        self.assert_rollups_match_raw_rows()
+        (summary,) = self.db.get_records().summarize()
+        assert summary.count == 62
+
+    def test_that_rollup_buckets_that_were_deleted_completely_are_removed(
+        self,
+    ) -> None:
+        self.db.delete_measurements_until(ORIGIN + timedelta(days=1), limit=100)
+        (first_day,) = self.db.connection.execute(
+            f'SELECT MIN("bucket") FROM "{rollups.DAY.table}"'
+        ).fetchone()
+        assert first_day == (ORIGIN + timedelta(days=1)).timestamp()
+
+    def test_that_deleting_measurements_increases_the_data_version(self) -> None:
+        version = self.db.data_version()
+        self.db.delete_measurements_until(ORIGIN, limit=10)
+        assert self.db.data_version() > version
+
+    def test_that_data_version_is_unchanged_if_nothing_was_deleted(self) -> None:
+        version = self.db.data_version()
+        self.db.delete_measurements_until(ORIGIN - timedelta(days=1), limit=10)
+        assert self.db.data_version() == version
+
+    def test_that_nth_newest_start_timestamp_counts_from_the_newest(self) -> None:
+        assert self.db.nth_newest_start_timestamp(0) == ORIGIN + timedelta(hours=71)
+        assert self.db.nth_newest_start_timestamp(71) == ORIGIN
+        assert self.db.nth_newest_start_timestamp(72) is None
+
+    def assert_rollups_match_raw_rows(self) -> None:
+        records = self.db.get_records()
+        assert_summaries_equal(
+            records.summarize(), replace(records, rollup_conditions=None).summarize()
+        )
+        for since in [ORIGIN, ORIGIN + timedelta(days=1, minutes=30)]:
+            after = records.requested_after(since)
+            assert_summaries_equal(
+                after.summarize(), replace(after, rollup_conditions=None).summarize()
+            )
+
+
+class DeletePartitionedMeasurementsTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = Sqlite(":memory:", partitioning=Partitioning(days=1))
+        self.db.create_database()
+        self.db.record_measurements(
+            [create_measurement(offset=timedelta(hours=n)) for n in range(72)]
+        )
+
+    def test_that_summaries_are_exact_after_partitions_are_dropped(self) -> None:
+        self.db.delete_measurements_until(ORIGIN + timedelta(days=1, hours=5), limit=30)
+        records = self.db.get_records()
+        assert_summaries_equal(
+            records.summarize(), replace(records, rollup_conditions=None).summarize()
+        )
+        (summary,) = records.summarize()
+        assert summary.count == 42
+
+
+class ReclaimSpaceTests(TestCase):
+    def test_that_free_pages_are_given_back_to_the_file_system(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            db = Sqlite(os.path.join(directory, "profiler.sql"))
+            db.create_database()
+            db.record_measurements(
+                [create_measurement(offset=timedelta(seconds=n)) for n in range(5000)]
+            )
+            db.delete_measurements_until(ORIGIN + timedelta(days=1), limit=5000)
+            db.reclaim_space()
+            (free_pages,) = db.connection.execute("PRAGMA freelist_count").fetchone()
+            db.close_connection()
+        assert free_pages == 0
@@ -0,0 +1,220 @@
+import math
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from unittest import TestCase
+
+from hypothesis import given, settings, strategies
+
+from flask_profiler.entities import measurement_archive as archive
+from flask_profiler.sqlite import Sqlite, rollups
+from flask_profiler.sqlite.migrations import Migration, Migrations
+
+ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class CoverTests(TestCase):
+    def test_that_unbounded_window_is_read_from_coarsest_level_only(self) -> None:
+        assert rollups.cover(None, None, rollups.LEVELS) == [
+            rollups.TimeRange(since=None, until=None, level=rollups.DAY)
+        ]
+
+    def test_that_window_without_levels_is_read_from_raw_measurements(self) -> None:
+        assert rollups.cover(0.5, 100.5, []) == [
+            rollups.TimeRange(since=0.5, until=100.5, level=None)
+        ]
+
+    def test_that_unaligned_edges_are_read_from_finer_levels(self) -> None:
+        day = rollups.DAY.width
+        ranges = rollups.cover(day - 90.5, 2 * day + 30, rollups.LEVELS)
+        assert ranges == [
+            rollups.TimeRange(since=day - 90.5, until=day - 60, level=None),
+            rollups.TimeRange(since=day - 60, until=day, level=rollups.MINUTE),
+            rollups.TimeRange(since=day, until=2 * day, level=rollups.DAY),
+            rollups.TimeRange(since=2 * day, until=2 * day + 30, level=None),
+        ]
+
+    @given(
+        since=strategies.floats(min_value=0, max_value=1e7),
+        length=strategies.floats(min_value=0, max_value=1e7),
+    )
+    def test_that_ranges_are_contiguous_and_cover_the_window(
+        self, since: float, length: float
+    ) -> None:
+        until = since + length
+        ranges = rollups.cover(since, until, rollups.LEVELS)
+        assert ranges[0].since == since
+        assert ranges[-1].until == until
+        for previous, following in zip(ranges[:-1], ranges[1:]):
+            assert previous.until == following.since
+
+
+class RollupMaintenanceTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = Sqlite(":memory:")
+        self.db.create_database()
+
+    def test_that_recording_a_measurement_updates_every_rollup_level(self) -> None:
+        self.db.record_measurement(create_measurement(offset=timedelta(minutes=1)))
+        for level in rollups.LEVELS:
+            assert self.count_rollup_rows(level) == 1
+
+    def test_that_measurements_in_the_same_bucket_share_one_row(self) -> None:
+        self.db.record_measurements(
+            [
+                create_measurement(offset=timedelta(seconds=10)),
+                create_measurement(offset=timedelta(seconds=20)),
+            ]
+        )
+        self.db.record_measurement(create_measurement(offset=timedelta(seconds=30)))
+        assert self.count_rollup_rows(rollups.MINUTE) == 1
+        (summary,) = self.db.get_records().summarize()
+        assert summary.count == 3
+
+    def test_that_minimum_and_maximum_are_merged_across_writes(self) -> None:
+        self.db.record_measurement(create_measurement(duration=timedelta(seconds=2)))
+        self.db.record_measurement(create_measurement(duration=timedelta(seconds=1)))
+        self.db.record_measurement(create_measurement(duration=timedelta(seconds=3)))
+        (summary,) = self.db.get_records().summarize()
+        assert summary.min_elapsed == 1
+        assert summary.max_elapsed == 3
+        assert summary.avg_elapsed == 2
+
+    def count_rollup_rows(self, level: rollups.RollupLevel) -> int:
+        return self.db.connection.execute(
+            f'SELECT COUNT(*) FROM "{level.table}"'
+        ).fetchone()[0]
+
+
+class RollupConsistencyTests(TestCase):
+    @settings(deadline=None, max_examples=50)
+    @given(
+        offsets=strategies.lists(
+            strategies.integers(min_value=0, max_value=3 * 24 * 60 * 60 * 1000),
+            min_size=1,
+        ),
+        since=strategies.one_of(
+            strategies.none(),
+            strategies.integers(min_value=0, max_value=3 * 24 * 60 * 60 * 1000),
+        ),
+        length=strategies.integers(min_value=0, max_value=3 * 24 * 60 * 60 * 1000),
+    )
+    def test_that_summaries_from_rollups_equal_summaries_from_raw_rows(
+        self, offsets: List[int], since: Optional[int], length: int
+    ) -> None:
+        db = Sqlite(":memory:")
+        db.create_database()
+        db.record_measurements(
+            [
+                create_measurement(
+                    offset=timedelta(milliseconds=offset),
+                    duration=timedelta(milliseconds=offset % 1000),
+                    method=["GET", "POST"][offset % 2],
+                    weight=[1, 2.5, 10][offset % 3],
+                )
+                for offset in offsets
+            ]
+        )
+        records = db.get_records()
+        if since is not None:
+            records = records.requested_after(
+                ORIGIN + timedelta(milliseconds=since)
+            ).requested_before(ORIGIN + timedelta(milliseconds=since + length))
+        assert_summaries_equal(
+            records.summarize(), replace(records, rollup_conditions=None).summarize()
+        )
+
+    @settings(deadline=None, max_examples=50)
+    @given(
+        offsets=strategies.lists(
+            strategies.integers(min_value=0, max_value=10 * 24 * 60 * 60),
+            min_size=1,
+        ),
+        interval=strategies.sampled_from(
+            [timedelta(minutes=1), timedelta(hours=1), timedelta(days=1)]
+        ),
+    )
+    def test_that_interval_summaries_from_rollups_equal_those_from_raw_rows(
+        self, offsets: List[int], interval: timedelta
+    ) -> None:
+        db = Sqlite(":memory:")
+        db.create_database()
+        db.record_measurements(
+            [
+                create_measurement(
+                    offset=timedelta(seconds=offset),
+                    duration=timedelta(milliseconds=offset % 1000),
+                )
+                for offset in offsets
+            ]
+        )
+        records = db.get_records()
+        since = ORIGIN
+        until = ORIGIN + timedelta(days=10, seconds=1)
+        assert_summaries_equal(
+            records.summarize_by_interval(
+                since=since, until=until, interval_length=interval
+            ),
+            replace(records, rollup_conditions=None).summarize_by_interval(
+                since=since, until=until, interval_length=interval
+            ),
+        )
+
+
+class RollupMigrationTests(TestCase):
+    def test_that_existing_measurements_are_added_to_the_rollups(self) -> None:
+        db = Sqlite(":memory:")
+        cursor = db.connection.cursor()
+        for filename in ["migration_1", "migration_2"]:
+            Migration.from_filename(filename).run(cursor)
+        for offset in [0, 30, 90, 4000, 90000]:
+            start = (ORIGIN + timedelta(seconds=offset)).timestamp()
+            cursor.execute(
+                'INSERT INTO "measurements" '
+                '("route_name", "start_timestamp", "end_timestamp", "method") '
+                "VALUES (?, ?, ?, ?)",
+                ["route", start, start + 1, "GET"],
+            )
+        db.connection.commit()
+        Migrations(db.connection).run_necessary_migrations()
+        records = db.get_records()
+        assert_summaries_equal(
+            records.summarize(), replace(records, rollup_conditions=None).summarize()
+        )
+        assert (
+            db.connection.execute('SELECT COUNT(*) FROM "rollup_minute"').fetchone()[0]
+            == 4
+        )
+
+
+def create_measurement(
+    offset: timedelta = timedelta(0),
+    duration: timedelta = timedelta(seconds=1),
+    method: str = "GET",
+    weight: float = 1,
+) -> archive.Measurement:
+    return archive.Measurement(
+        route_name="route",
+        start_timestamp=ORIGIN + offset,
+        elapsed_ns=duration // timedelta(microseconds=1) * 1000,
+        method=method,
+        weight=weight,
+    )
+
+
+def assert_summaries_equal(
+    actual: archive.SummarizedMeasurements, expected: archive.SummarizedMeasurements
+) -> None:
+    actual_summaries = sorted(actual, key=lambda s: (s.method, s.first_measurement))
+    expected_summaries = sorted(expected, key=lambda s: (s.method, s.first_measurement))
+    assert len(actual_summaries) == len(expected_summaries)
+    for a, e in zip(actual_summaries, expected_summaries):
+        assert (a.method, a.name, a.count) == (e.method, e.name, e.count)
+        assert (a.first_measurement, a.last_measurement) == (
+            e.first_measurement,
+            e.last_measurement,
+        )
+        assert (a.min_elapsed, a.max_elapsed) == (e.min_elapsed, e.max_elapsed)
+        assert math.isclose(a.avg_elapsed, e.avg_elapsed, rel_tol=1e-9)
+        assert a.histogram == e.histogram
@@ -0,0 +1,104 @@
+from datetime import timedelta
+from typing import Dict, Tuple
+from unittest import TestCase
+
+from flask_profiler.entities.measurement_archive import RouteCatalogEntry
+from flask_profiler.sqlite import Sqlite
+from flask_profiler.sqlite.migrations import Migration, Migrations
+from flask_profiler.sqlite.partitions import Partitioning
+
+from .test_rollups import ORIGIN, create_measurement
+
+
+class RouteCatalogTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.db = Sqlite(":memory:")
+        self.db.create_database()
+
+    def test_that_catalog_is_empty_without_measurements(self) -> None:
+        assert self.db.get_route_catalog() == []
+
+    def test_that_recorded_measurements_are_added_to_the_totals(self) -> None:
+        self.db.record_measurements(
+            [
+                create_measurement(offset=timedelta(hours=1), weight=2),
+                create_measurement(
+                    offset=timedelta(hours=3), duration=timedelta(seconds=3)
+                ),
+            ]
+        )
+        self.db.record_measurement(create_measurement(offset=timedelta(hours=2)))
+        entry = self.catalog()["route", "GET"]
+        assert entry.first_seen == ORIGIN + timedelta(hours=1)
+        assert entry.last_seen == ORIGIN + timedelta(hours=3)
+        assert entry.total_count == 4
+        assert entry.total_elapsed == 6
+
+    def test_that_every_method_has_its_own_entry(self) -> None:
+        self.db.record_measurements(
+            [create_measurement(method="GET"), create_measurement(method="POST")]
+        )
+        assert set(self.catalog()) == {("route", "GET"), ("route", "POST")}
+
+    def test_that_deleted_measurements_are_subtracted_from_the_totals(self) -> None:
+        self.db.record_measurements(
+            [create_measurement(offset=timedelta(hours=n)) for n in range(4)]
+        )
+        self.db.delete_measurements_until(ORIGIN + timedelta(hours=1), limit=10)
+        entry = self.catalog()["route", "GET"]
+        assert entry.first_seen == ORIGIN + timedelta(hours=2)
+        assert entry.last_seen == ORIGIN + timedelta(hours=3)
+        assert entry.total_count == 2
+        assert entry.total_elapsed == 2
+
+    def test_that_routes_without_measurements_are_removed(self) -> None:
+        self.db.record_measurements(
+            [
+                create_measurement(method="POST"),
+                create_measurement(offset=timedelta(hours=1)),
+            ]
+        )
+        self.db.delete_measurements_until(ORIGIN, limit=10)
+        assert set(self.catalog()) == {("route", "GET")}
+
+    def test_that_dropped_partitions_are_subtracted_from_the_totals(self) -> None:
+        db = Sqlite(":memory:", partitioning=Partitioning(days=1))
+        db.create_database()
+        db.record_measurements(
+            [create_measurement(offset=timedelta(hours=6 * n)) for n in range(8)]
+        )
+        db.delete_measurements_until(ORIGIN + timedelta(days=1), limit=1)
+        (entry,) = db.get_route_catalog()
+        assert entry.first_seen == ORIGIN + timedelta(days=1)
+        assert entry.total_count == 4
+
+    def catalog(self) -> Dict[Tuple[str, str], RouteCatalogEntry]:
+        return {
+            (entry.name, entry.method): entry for entry in self.db.get_route_catalog()
+        }
+
+
+class RouteCatalogMigrationTests(TestCase):
+    def test_that_existing_measurements_are_added_to_the_catalog(self) -> None:
+        db = Sqlite(":memory:")
+        migrations = Migrations(db.connection)
+        cursor = db.connection.cursor()
+        for filename in migrations.migration_files[:8]:
+            Migration.from_filename(filename).run(cursor)
+        cursor.execute(
+            """INSERT INTO "routes" ("route_name", "method") VALUES ('route', 'GET')"""
+        )
+        start = ORIGIN.timestamp()
+        for bucket, count in [(0, 2), (60, 3)]:
+            cursor.execute(
+                'INSERT INTO "rollup_minute" VALUES (1, ?, ?, ?, 1, 1, ?, ?, NULL)',
+                [start + bucket, count, count, start + bucket, start + bucket + 30],
+            )
+        db.connection.commit()
+        migrations.run_necessary_migrations()
+        (entry,) = db.get_route_catalog()
+        assert entry.first_seen == ORIGIN
+        assert entry.last_seen == ORIGIN + timedelta(seconds=90)
+        assert entry.total_count == 5
+        assert entry.total_elapsed == 5
@@ -1,3 +1,4 @@
+import sqlite3
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from unittest import TestCase
@@ -6,6 +7,7 @@ from hypothesis import example, given, strategies
 
 from flask_profiler.entities import measurement_archive as archive
 from flask_profiler.sqlite import Sqlite
+from flask_profiler.sqlite.select_query import FETCH_BATCH_SIZE
 
 
 class SqliteTests(TestCase):
@@ -23,11 +25,10 @@ class SqliteTests(TestCase):
     ) -> archive.Measurement:
         if start_timestamp is None:
             start_timestamp = datetime(2000, 1, 1)
-        end_timestamp = start_timestamp + duration
         return archive.Measurement(
             route_name=route_name,
             start_timestamp=start_timestamp,
-            end_timestamp=end_timestamp,
+            elapsed_ns=duration // timedelta(microseconds=1) * 1000,
             method=method,
         )
 
@@ -69,6 +70,37 @@ class RecordMeasurementTests(SqliteTests):
         measurement = list(self.db.get_records().with_id(id_))[0]
         assert measurement.method == method
 
+    def test_that_all_measurements_of_a_batch_are_recorded(self) -> None:
+        self.db.record_measurements(
+            [self.create_measurement(route_name=str(n)) for n in range(3)]
+        )
+        assert len(self.db.get_records()) == 3
+
+    def test_that_large_batches_stay_below_999_bound_parameters(self) -> None:
+        with self.db.pool.writer() as connection:
+            connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        self.db.record_measurements([self.create_measurement() for _ in range(250)])
+        assert len(self.db.get_records()) == 250
+
+    def test_that_data_version_increases_with_every_recording(self) -> None:
+        version = self.db.data_version()
+        self.db.record_measurements([self.create_measurement() for _ in range(3)])
+        self.db.record_measurement(self.create_measurement())
+        assert self.db.data_version() == version + 2
+
+    def test_that_data_version_can_stay_unchanged_by_a_recording(self) -> None:
+        version = self.db.data_version()
+        measurement = self.create_measurement()
+        measurement.changes_data_version = False
+        self.db.record_measurement(measurement)
+        assert self.db.data_version() == version
+        self.db.record_measurements([measurement, self.create_measurement()])
+        assert self.db.data_version() == version + 1
+
+    def test_that_recording_an_empty_batch_is_possible(self) -> None:
+        self.db.record_measurements([])
+        assert not self.db.get_records()
+
 
 class GetRecordsTests(SqliteTests):
     def test_after_inserting_a_measurement_there_is_at_least_one_record_present_in_db(
@@ -91,6 +123,35 @@ class GetRecordsTests(SqliteTests):
         records = self.db.get_records().with_name_containing(route_name)
         assert records.with_id(id_)
 
+    def test_that_wildcards_in_substrings_only_match_themselves(self) -> None:
+        self.db.record_measurements(
+            [
+                self.create_measurement(route_name="a_b"),
+                self.create_measurement(route_name="axb"),
+            ]
+        )
+        records = self.db.get_records().with_name_containing("_")
+        assert [record.name for record in records] == ["a_b"]
+
+    def test_that_substrings_match_regardless_of_case(self) -> None:
+        self.db.record_measurements(
+            [
+                self.create_measurement(route_name="/Users/List"),
+                self.create_measurement(route_name="/orders"),
+            ]
+        )
+        records = self.db.get_records().with_name_containing("users/l")
+        assert [record.name for record in records] == ["/Users/List"]
+
+    def test_that_every_route_is_stored_only_once(self) -> None:
+        self.db.record_measurements([self.create_measurement()] * 2)
+        self.db.record_measurement(self.create_measurement())
+        self.db.record_measurement(self.create_measurement(method="POST"))
+        assert (
+            self.db.connection.execute('SELECT COUNT(*) FROM "routes"').fetchone()[0]
+            == 2
+        )
+
     @given(method=strategies.text())
     @example(method=":")
     def test_can_retrieve_measurement_when_filtering_by_exact_method_name(
@@ -309,11 +370,174 @@ class GetRecordsTests(SqliteTests):
         assert measurement
         assert measurement.start_timestamp.year == 2001
 
+    def test_that_ties_in_start_time_are_ordered_by_id(self) -> None:
+        ids = [self.db.record_measurement(self.create_measurement()) for _ in range(3)]
+        records = self.db.get_records().ordered_by_start_time(ascending=False)
+        assert [record.id for record in records] == ids[::-1]
+
+    def test_that_following_records_start_after_the_given_record(self) -> None:
+        first_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 2))
+        )
+        second_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 1))
+        )
+        third_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 2))
+        )
+        records = (
+            self.db.get_records()
+            .following(datetime(2000, 1, 1), second_id)
+            .ordered_by_start_time()
+        )
+        assert [record.id for record in records] == [first_id, third_id]
+
+    def test_that_preceding_records_start_before_the_given_record(self) -> None:
+        first_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 2))
+        )
+        second_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 1))
+        )
+        third_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 2))
+        )
+        assert third_id is not None
+        records = (
+            self.db.get_records()
+            .preceding(datetime(2000, 1, 2), third_id)
+            .ordered_by_start_time()
+        )
+        assert [record.id for record in records] == [second_id, first_id]
+
+    def test_that_records_follow_the_position_of_a_deleted_record(self) -> None:
+        first_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 1))
+        )
+        second_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 2))
+        )
+        self.db.delete_measurements_until(datetime(2000, 1, 1, 12), limit=10)
+        records = self.db.get_records().following(datetime(2000, 1, 1), first_id)
+        assert [record.id for record in records] == [second_id]
+
+    def test_that_the_position_of_a_record_is_found_from_its_start_time(
+        self,
+    ) -> None:
+        record_id = self.db.record_measurement(
+            self.create_measurement(start_timestamp=datetime(2000, 1, 1, 0, 0, 0, 1))
+        )
+        record = self.db.get_records().with_id(record_id).first()
+        assert record
+        assert not list(
+            self.db.get_records().following(record.start_timestamp, record.id)
+        )
+        assert not list(
+            self.db.get_records().preceding(record.start_timestamp, record.id)
+        )
+
+
+class WeightTests(SqliteTests):
+    def test_that_weight_of_record_is_retrieved(self) -> None:
+        measurement = self.create_measurement()
+        measurement.weight = 4
+        self.db.record_measurement(measurement)
+        record = self.db.get_records().first()
+        assert record
+        assert record.weight == 4
+
+    def test_that_summary_counts_are_weighted(self) -> None:
+        measurement = self.create_measurement()
+        measurement.weight = 100
+        self.db.record_measurement(measurement)
+        self.db.record_measurement(self.create_measurement())
+        (summary,) = self.db.get_records().summarize()
+        assert summary.count == 101
+
+    def test_that_average_is_weighted(self) -> None:
+        slow = self.create_measurement(duration=timedelta(seconds=4))
+        slow.weight = 1
+        fast = self.create_measurement(duration=timedelta(seconds=1))
+        fast.weight = 3
+        self.db.record_measurements([slow, fast])
+        for records in [
+            self.db.get_records(),
+            self.db.get_records().requested_after(datetime(1999, 12, 31, 23, 59, 30)),
+        ]:
+            (summary,) = records.summarize()
+            assert summary.avg_elapsed == 7 / 4
+
+
+class IterationTests(SqliteTests):
+    def test_that_all_rows_are_returned_across_fetch_batches(self) -> None:
+        count = FETCH_BATCH_SIZE * 2 + 1
+        self.db.record_measurements([self.create_measurement()] * count)
+        assert sum(1 for _ in self.db.get_records()) == count
+
+    def test_that_other_queries_can_run_while_iterating(self) -> None:
+        self.db.record_measurements(
+            [self.create_measurement()] * (FETCH_BATCH_SIZE + 1)
+        )
+        records = self.db.get_records()
+        iterated = 0
+        for record in records:
+            assert records.with_id(record.id).first() == record
+            iterated += 1
+        assert iterated == FETCH_BATCH_SIZE + 1
+
+
+class CountedTests(SqliteTests):
+    def test_that_total_count_ignores_limit_and_offset(self) -> None:
+        self.db.record_measurements([self.create_measurement()] * 5)
+        page = self.db.get_records().offset(1).limit(2).counted()
+        assert len(page.items) == 2
+        assert page.total_count == 5
+        assert not page.is_capped
+
+    def test_that_page_past_the_end_is_still_counted(self) -> None:
+        self.db.record_measurements([self.create_measurement()] * 5)
+        page = self.db.get_records().offset(10).limit(2).counted()
+        assert not page.items
+        assert page.total_count == 5
+
+    def test_that_count_stops_at_cap(self) -> None:
+        self.db.record_measurements([self.create_measurement()] * 5)
+        page = self.db.get_records().limit(2).counted(cap=3)
+        assert len(page.items) == 2
+        assert page.total_count == 3
+        assert page.is_capped
+
+    def test_that_count_below_cap_is_exact(self) -> None:
+        self.db.record_measurements([self.create_measurement()] * 3)
+        page = self.db.get_records().limit(2).counted(cap=3)
+        assert page.total_count == 3
+        assert not page.is_capped
+
+    def test_that_items_keep_their_order(self) -> None:
+        for day in [3, 1, 2]:
+            self.db.record_measurement(
+                self.create_measurement(start_timestamp=datetime(2000, 1, day))
+            )
+        page = self.db.get_records().ordered_by_start_time().offset(1).counted()
+        assert [record.start_timestamp.day for record in page.items] == [2, 3]
+
+    def test_that_summaries_can_be_counted(self) -> None:
+        for name in ["a", "b", "c"]:
+            self.db.record_measurement(self.create_measurement(route_name=name))
+        page = self.db.get_records().summarize().sorted_by_route_name().limit(1)
+        counted = page.counted()
+        assert [summary.name for summary in counted.items] == ["a"]
+        assert counted.total_count == 3
+
 
 class SummarizeByIntervalTests(SqliteTests):
+    FIFTY_YEARS = timedelta(days=50 * 365)
+
     def test_with_empty_db_no_summaries_are_returned(self) -> None:
         summaries = self.db.get_records().summarize_by_interval(
-            [datetime(2000, 1, 1), datetime(2100, 1, 1)]
+            since=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            until=datetime(2100, 1, 1, tzinfo=timezone.utc),
+            interval_length=timedelta(days=365),
         )
         assert not summaries
 
@@ -329,11 +553,9 @@ class SummarizeByIntervalTests(SqliteTests):
             )
         )
         summaries = self.db.get_records().summarize_by_interval(
-            [
-                datetime(2000, 1, 1, tzinfo=timezone.utc),
-                datetime(2050, 1, 1, tzinfo=timezone.utc),
-                datetime(2100, 1, 1, tzinfo=timezone.utc),
-            ]
+            since=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            until=datetime(2100, 1, 1, tzinfo=timezone.utc),
+            interval_length=self.FIFTY_YEARS,
         )
         assert len(summaries) == 2
 
@@ -359,11 +581,9 @@ class SummarizeByIntervalTests(SqliteTests):
             )
         )
         summaries = self.db.get_records().summarize_by_interval(
-            [
-                datetime(2000, 1, 1, tzinfo=timezone.utc),
-                datetime(2050, 1, 1, tzinfo=timezone.utc),
-                datetime(2100, 1, 1, tzinfo=timezone.utc),
-            ]
+            since=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            until=datetime(2100, 1, 1, tzinfo=timezone.utc),
+            interval_length=self.FIFTY_YEARS,
         )
         assert len(summaries) == 2
 
@@ -387,11 +607,9 @@ class SummarizeByIntervalTests(SqliteTests):
         )
         summary_1, summary_2 = list(
             self.db.get_records().summarize_by_interval(
-                [
-                    datetime(2000, 1, 1, tzinfo=timezone.utc),
-                    datetime(2050, 1, 1, tzinfo=timezone.utc),
-                    datetime(2100, 1, 1, tzinfo=timezone.utc),
-                ]
+                since=datetime(2000, 1, 1, tzinfo=timezone.utc),
+                until=datetime(2100, 1, 1, tzinfo=timezone.utc),
+                interval_length=self.FIFTY_YEARS,
             )
         )
         assert summary_1.count == 2
@@ -399,6 +617,68 @@ class SummarizeByIntervalTests(SqliteTests):
     def test_can_get_values_for_interval_of_length_100(self) -> None:
         start_date = datetime(2000, 1, 1, tzinfo=timezone.utc)
         results = self.db.get_records().summarize_by_interval(
-            [start_date + timedelta(days=n) for n in range(100)]
+            since=start_date,
+            until=start_date + timedelta(days=100),
+            interval_length=timedelta(days=1),
         )
         assert not results
+
+    def test_that_summaries_are_ordered_by_interval(self) -> None:
+        for day in [3, 1, 2]:
+            self.db.record_measurement(
+                self.create_measurement(
+                    start_timestamp=datetime(2000, 1, day, 12, tzinfo=timezone.utc)
+                )
+            )
+        summaries = self.db.get_records().summarize_by_interval(
+            since=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            until=datetime(2000, 1, 4, tzinfo=timezone.utc),
+            interval_length=timedelta(days=1),
+        )
+        assert [summary.first_measurement.day for summary in summaries] == [1, 2, 3]
+
+    def test_that_summaries_carry_the_index_of_their_interval(self) -> None:
+        for day in [1, 3]:
+            self.db.record_measurement(
+                self.create_measurement(
+                    start_timestamp=datetime(2000, 1, day, 12, tzinfo=timezone.utc)
+                )
+            )
+        summaries = self.db.get_records().summarize_by_interval(
+            since=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            until=datetime(2000, 1, 4, tzinfo=timezone.utc),
+            interval_length=timedelta(days=1),
+        )
+        assert [summary.interval_index for summary in summaries] == [0, 2]
+
+    def test_that_measurement_at_interval_boundary_belongs_to_later_interval(
+        self,
+    ) -> None:
+        for timestamp in [
+            datetime(2000, 1, 1, 23, 59, tzinfo=timezone.utc),
+            datetime(2000, 1, 2, tzinfo=timezone.utc),
+        ]:
+            self.db.record_measurement(
+                self.create_measurement(start_timestamp=timestamp)
+            )
+        summaries = self.db.get_records().summarize_by_interval(
+            since=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            until=datetime(2000, 1, 3, tzinfo=timezone.utc),
+            interval_length=timedelta(days=1),
+        )
+        assert [summary.count for summary in summaries] == [1, 1]
+
+    def test_that_query_does_not_grow_with_the_number_of_intervals(self) -> None:
+        since = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        records = self.db.get_records()
+        short_range = records.summarize_by_interval(
+            since=since,
+            until=since + timedelta(days=2),
+            interval_length=timedelta(days=1),
+        )
+        long_range = records.summarize_by_interval(
+            since=since,
+            until=since + timedelta(days=3650),
+            interval_length=timedelta(days=1),
+        )
+        assert str(short_range.query) == str(long_range.query)
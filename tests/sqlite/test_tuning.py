@@ -0,0 +1,63 @@
+import pathlib
+import shutil
+import tempfile
+from unittest import TestCase
+
+from flask_profiler.sqlite import ConnectionPool
+from flask_profiler.sqlite.tuning import PROFILES, Tuning, parse_tuning
+
+
+class ParseTuningTests(TestCase):
+    def test_that_no_tuning_is_applied_by_default(self) -> None:
+        assert parse_tuning(None) is None
+
+    def test_that_profiles_can_be_selected_by_name(self) -> None:
+        assert parse_tuning("fast") == PROFILES["fast"]
+
+    def test_that_settings_of_profile_can_be_overridden(self) -> None:
+        tuning = parse_tuning(dict(profile="balanced", cache_size=-1))
+        assert tuning
+        assert tuning.cache_size == -1
+        assert tuning.journal_mode == PROFILES["balanced"].journal_mode
+
+    def test_that_settings_can_be_given_without_profile(self) -> None:
+        assert parse_tuning(dict(synchronous="OFF")) == Tuning(synchronous="OFF")
+
+    def test_that_unknown_profiles_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            parse_tuning("unknown profile")
+
+    def test_that_unknown_settings_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            parse_tuning(dict(unknown_setting=1))
+
+
+class ApplyTuningTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.data_dir = pathlib.Path(tempfile.mkdtemp())
+        self.pool = ConnectionPool(
+            str(self.data_dir / "db.sql"), tuning=PROFILES["balanced"]
+        )
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        shutil.rmtree(self.data_dir)
+        super().tearDown()
+
+    def test_that_writer_connection_uses_journal_mode_of_profile(self) -> None:
+        with self.pool.writer() as connection:
+            journal_mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+        assert journal_mode == "wal"
+
+    def test_that_reader_connections_use_cache_size_of_profile(self) -> None:
+        connection = self.pool.acquire_reader()
+        cache_size = connection.execute("PRAGMA cache_size").fetchone()[0]
+        assert cache_size == PROFILES["balanced"].cache_size
+
+    def test_that_reader_connections_use_synchronous_setting_of_profile(
+        self,
+    ) -> None:
+        connection = self.pool.acquire_reader()
+        synchronous = connection.execute("PRAGMA synchronous").fetchone()[0]
+        assert synchronous == 1
@@ -0,0 +1,53 @@
+from unittest import TestCase
+
+from hypothesis import given, strategies
+
+from flask_profiler.entities.histogram import Histogram
+
+
+class HistogramTests(TestCase):
+    def test_that_empty_histogram_has_no_percentiles(self) -> None:
+        assert Histogram().percentile(50) is None
+
+    def test_that_percentile_of_single_value_is_close_to_that_value(self) -> None:
+        histogram = Histogram.from_values([0.25])
+        percentile = histogram.percentile(99)
+        assert percentile is not None
+        assert abs(percentile - 0.25) / 0.25 < 0.05
+
+    def test_that_tail_percentile_is_not_affected_by_many_fast_requests(self) -> None:
+        histogram = Histogram.from_values([0.01] * 98 + [2.0] * 2)
+        p50 = histogram.percentile(50)
+        p99 = histogram.percentile(99)
+        assert p50 is not None and p50 < 0.011
+        assert p99 is not None and p99 > 1.9
+
+    def test_that_zero_and_negative_values_are_counted(self) -> None:
+        histogram = Histogram.from_values([0, -1])
+        assert histogram.total == 2
+
+    @given(
+        a=strategies.lists(strategies.floats(min_value=1e-6, max_value=1e4)),
+        b=strategies.lists(strategies.floats(min_value=1e-6, max_value=1e4)),
+    )
+    def test_that_merged_histogram_equals_histogram_of_all_values(
+        self, a: list[float], b: list[float]
+    ) -> None:
+        assert Histogram.from_values(a).merge(
+            Histogram.from_values(b)
+        ) == Histogram.from_values(a + b)
+
+    @given(
+        values=strategies.lists(
+            strategies.floats(min_value=1e-6, max_value=1e4), min_size=1
+        ),
+        p=strategies.sampled_from([50, 90, 95, 99]),
+    )
+    def test_that_percentiles_have_a_relative_error_below_5_percent(
+        self, values: list[float], p: int
+    ) -> None:
+        estimate = Histogram.from_values(values).percentile(p)
+        rank = max(1, -(-len(values) * p // 100))
+        exact = sorted(values)[rank - 1]
+        assert estimate is not None
+        assert abs(estimate - exact) / exact < 0.05
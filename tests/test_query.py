@@ -0,0 +1,73 @@
+from unittest import TestCase
+
+from flask_profiler import query as q
+
+
+class ParameterBindingTests(TestCase):
+    def test_that_literals_are_rendered_as_placeholders(self) -> None:
+        assert q.Literal("value").as_expression() == "?"
+
+    def test_that_literal_values_are_returned_as_parameters(self) -> None:
+        assert q.Literal("value").parameters() == ["value"]
+
+    def test_that_queries_with_different_values_render_to_the_same_sql(
+        self,
+    ) -> None:
+        assert str(self.create_select(name="a", limit=1)) == str(
+            self.create_select(name="b", limit=2)
+        )
+
+    def test_that_parameters_are_ordered_like_their_placeholders(self) -> None:
+        query = q.Select(
+            selector=q.SelectorList(
+                [q.Alias(q.Literal(1), q.Identifier("x")), q.Identifier("y")]
+            ),
+            from_clause=q.Identifier("table"),
+            where_clause=q.BinaryOp("=", q.Identifier("y"), q.Literal(2)),
+            order_by=[q.Asc(q.BinaryOp("+", q.Identifier("y"), q.Literal(3)))],
+            limit_clause=4,
+            offset_clause=5,
+        )
+        assert query.parameters() == [1, 2, 3, 4, 5]
+
+    def test_that_parameters_of_subqueries_are_included(self) -> None:
+        query = q.Select(
+            selector=q.All(),
+            from_clause=q.Alias(
+                self.create_select(name="a", limit=1), q.Identifier("sub")
+            ),
+            where_clause=q.BinaryOp("=", q.Identifier("y"), q.Literal(2)),
+        )
+        assert query.parameters() == ["a", 1, 2]
+
+    def test_that_insert_parameters_are_ordered_by_row(self) -> None:
+        statement = q.Insert(
+            into=q.Identifier("table"),
+            rows=[[q.Literal(1), q.Literal(2)], [q.Literal(3), q.Literal(4)]],
+        )
+        assert statement.parameters() == [1, 2, 3, 4]
+
+    def test_that_pragma_values_are_rendered_inline(self) -> None:
+        statement = q.Pragma(name="journal_mode", value=q.Literal("WAL"))
+        assert str(statement) == "PRAGMA journal_mode = 'WAL'"
+        assert not statement.parameters()
+
+    def test_that_window_aggregates_span_the_whole_result(self) -> None:
+        window = q.Window(q.Aggregate("COUNT", q.All()))
+        assert window.as_expression() == "COUNT(*) OVER ()"
+
+    def test_that_delete_conditions_follow_the_where_keyword(self) -> None:
+        statement = q.Delete(
+            table=q.Identifier("table"),
+            where=q.BinaryOp("<", q.Identifier("x"), q.Literal(1)),
+        )
+        assert str(statement) == 'DELETE FROM "table" WHERE ("x") < (?)'
+        assert statement.parameters() == [1]
+
+    def create_select(self, name: str, limit: int) -> q.Select:
+        return q.Select(
+            selector=q.All(),
+            from_clause=q.Identifier("table"),
+            where_clause=q.BinaryOp("=", q.Identifier("name"), q.Literal(name)),
+            limit_clause=limit,
+        )
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from typing import List
+from unittest import TestCase
+
+from flask_profiler.result_cache import ResultCache, ResultCacheSettings
+
+from .clock import FakeClock
+
+
+class FakeArchivist:
+    def __init__(self) -> None:
+        self.version = 0
+
+    def data_version(self) -> int:
+        return self.version
+
+
+class ResultCacheTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.clock = FakeClock()
+        self.archivist = FakeArchivist()
+        self.cache = ResultCache(
+            ResultCacheSettings(max_entries=2, ttl_secs=10), clock=self.clock
+        )
+        self.computed: List[str] = []
+
+    def test_that_value_is_computed_once_for_the_same_key(self) -> None:
+        assert self.get("a") == "a"
+        assert self.get("a") == "a"
+        assert self.computed == ["a"]
+
+    def test_that_entries_are_reused_within_ttl_despite_new_data_version(
+        self,
+    ) -> None:
+        self.get("a")
+        self.archivist.version = 1
+        self.clock.advance_clock(timedelta(seconds=9))
+        self.get("a")
+        assert self.computed == ["a"]
+
+    def test_that_entries_with_new_data_version_expire_after_ttl(self) -> None:
+        self.get("a")
+        self.archivist.version = 1
+        self.clock.advance_clock(timedelta(seconds=10))
+        self.get("a")
+        assert self.computed == ["a", "a"]
+
+    def test_that_entries_are_reused_after_ttl_while_data_is_unchanged(
+        self,
+    ) -> None:
+        self.get("a")
+        self.clock.advance_clock(timedelta(seconds=30))
+        self.get("a")
+        assert self.computed == ["a"]
+
+    def test_that_reused_entries_stay_fresh_for_another_ttl(self) -> None:
+        self.get("a")
+        self.clock.advance_clock(timedelta(seconds=30))
+        self.get("a")
+        self.archivist.version = 1
+        self.clock.advance_clock(timedelta(seconds=9))
+        self.get("a")
+        assert self.computed == ["a"]
+
+    def test_that_least_recently_used_entry_is_evicted(self) -> None:
+        self.get("a")
+        self.get("b")
+        self.get("a")
+        self.get("c")
+        self.get("a")
+        self.get("b")
+        assert self.computed == ["a", "b", "c", "b"]
+
+    def get(self, key: str) -> str:
+        def compute() -> str:
+            self.computed.append(key)
+            return key
+
+        return self.cache.get_or_compute(self.archivist, key=key, compute=compute)
@@ -0,0 +1,98 @@
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional
+from unittest import TestCase
+
+from flask_profiler.retention import RetentionJob, RetentionSettings, parse_retention
+
+from .clock import FakeClock
+
+ORIGIN = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class FakePruningArchivist:
+    def __init__(self, start_timestamps: List[datetime]) -> None:
+        self.start_timestamps = sorted(start_timestamps)
+        self.batches: List[int] = []
+        self.reclaimed_space = False
+
+    def nth_newest_start_timestamp(self, n: int) -> Optional[datetime]:
+        if n >= len(self.start_timestamps):
+            return None
+        return self.start_timestamps[-n - 1]
+
+    def delete_measurements_until(self, timestamp: datetime, limit: int) -> int:
+        count = len([t for t in self.start_timestamps if t <= timestamp][:limit])
+        del self.start_timestamps[:count]
+        self.batches.append(count)
+        return count
+
+    def reclaim_space(self) -> None:
+        self.reclaimed_space = True
+
+    def close_connection(self) -> None:
+        pass
+
+
+class RetentionJobTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.clock = FakeClock()
+        self.clock.freeze_time(ORIGIN + timedelta(days=10))
+        self.archivist = FakePruningArchivist(
+            [ORIGIN + timedelta(days=n) for n in range(10)]
+        )
+
+    def create_job(self, **settings: Any) -> RetentionJob:
+        return RetentionJob(
+            archivist_factory=lambda: self.archivist,
+            settings=RetentionSettings(**settings),
+            clock=self.clock,
+        )
+
+    def test_that_measurements_older_than_max_age_are_deleted(self) -> None:
+        job = self.create_job(max_age=timedelta(days=3, hours=12))
+        assert job.prune(self.archivist) == 7
+        assert self.archivist.start_timestamps[0] == ORIGIN + timedelta(days=7)
+
+    def test_that_only_the_newest_max_rows_measurements_are_kept(self) -> None:
+        job = self.create_job(max_rows=4)
+        job.prune(self.archivist)
+        assert len(self.archivist.start_timestamps) == 4
+
+    def test_that_the_stricter_limit_wins(self) -> None:
+        job = self.create_job(max_age=timedelta(days=8, hours=12), max_rows=2)
+        job.prune(self.archivist)
+        assert len(self.archivist.start_timestamps) == 2
+
+    def test_that_measurements_are_deleted_in_batches(self) -> None:
+        job = self.create_job(max_rows=0, batch_size=4)
+        assert job.prune(self.archivist) == 10
+        assert self.archivist.batches == [4, 4, 2]
+
+    def test_that_space_is_reclaimed_after_deleting(self) -> None:
+        self.create_job(max_rows=5).prune(self.archivist)
+        assert self.archivist.reclaimed_space
+
+    def test_that_nothing_is_reclaimed_if_nothing_was_deleted(self) -> None:
+        assert not self.create_job(max_rows=20).prune(self.archivist)
+        assert not self.archivist.reclaimed_space
+
+    def test_that_background_job_prunes_right_after_it_was_started(self) -> None:
+        job = self.create_job(max_rows=1, interval_secs=60)
+        self.addCleanup(job.stop)
+        job.ensure_running()
+        deadline = time.monotonic() + 5
+        while len(self.archivist.start_timestamps) > 1:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+
+class ParseRetentionTests(TestCase):
+    def test_that_retention_is_disabled_by_default(self) -> None:
+        assert not parse_retention(None).is_enabled
+
+    def test_that_max_age_is_given_in_days(self) -> None:
+        settings = parse_retention({"max_age_days": 1.5})
+        assert settings.max_age == timedelta(days=1, hours=12)
+        assert settings.is_enabled
@@ -0,0 +1,147 @@
+import random
+from typing import Any
+from unittest import TestCase
+
+from flask_profiler.sampling import (
+    SamplingPolicy,
+    ThroughputEstimator,
+    parse_sampling,
+)
+
+
+class SamplingPolicyTests(TestCase):
+    def test_that_every_request_is_recorded_by_default(self) -> None:
+        assert SamplingPolicy().weight("route", 0) == 1
+
+    def test_that_sampled_requests_stand_for_the_skipped_ones(self) -> None:
+        policy = SamplingPolicy(rate=0.25, draw=lambda: 0.1)
+        assert policy.weight("route", 0) == 4
+
+    def test_that_requests_outside_of_the_sample_are_not_recorded(self) -> None:
+        policy = SamplingPolicy(rate=0.25, draw=lambda: 0.5)
+        assert policy.weight("route", 0) is None
+
+    def test_that_route_rates_override_the_global_rate(self) -> None:
+        policy = SamplingPolicy(rate=0, route_rates=dict(checkout=1))
+        assert policy.weight("checkout", 0) == 1
+        assert policy.weight("health", 0) is None
+
+    def test_that_slow_requests_are_always_recorded_with_weight_1(self) -> None:
+        policy = SamplingPolicy(
+            rate=0.01,
+            always_record_slower_than_ns=500_000_000,
+            draw=lambda: 0.5,
+        )
+        assert policy.weight("route", 500_000_000) == 1
+        assert policy.weight("route", 499_999_999) is None
+
+
+class FakeTime:
+    def __init__(self) -> None:
+        self.seconds = 1000.0
+
+    def __call__(self) -> float:
+        return self.seconds
+
+
+class ThroughputEstimatorTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.time = FakeTime()
+        self.estimator = ThroughputEstimator(window_secs=10, now=self.time)
+
+    def test_that_requests_of_the_current_window_are_counted(self) -> None:
+        for _ in range(49):
+            self.estimator.observe("route")
+        assert self.estimator.observe("route") == 5
+
+    def test_that_previous_window_counts_by_its_overlap(self) -> None:
+        for _ in range(100):
+            self.estimator.observe("route")
+        self.time.seconds += 12.5
+        # 75% of the previous window overlaps the sliding window
+        assert self.estimator.observe("route") == (100 * 0.75 + 1) / 10
+
+    def test_that_old_windows_are_forgotten(self) -> None:
+        for _ in range(100):
+            self.estimator.observe("route")
+        self.time.seconds += 60
+        assert self.estimator.observe("route") == 0.1
+
+    def test_that_routes_are_estimated_separately(self) -> None:
+        for _ in range(100):
+            self.estimator.observe("busy")
+        assert self.estimator.observe("quiet") == 0.1
+
+
+class AdaptiveSamplingTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.time = FakeTime()
+
+    def test_that_quiet_routes_are_fully_recorded(self) -> None:
+        policy = self.create_policy(target_per_second=10)
+        assert policy.weight("route", 0) == 1
+
+    def test_that_busy_routes_are_sampled_down_to_the_target(self) -> None:
+        policy = self.create_policy(target_per_second=1)
+        for _ in range(99):
+            policy.weight("route", 0)
+        assert policy.weight("route", 0) == 10
+
+    def test_that_recorded_weights_add_up_to_the_number_of_requests(self) -> None:
+        generator = random.Random(0)
+        policy = self.create_policy(target_per_second=5, draw=generator.random)
+        total_weight = 0.0
+        for _ in range(60):
+            self.time.seconds += 1
+            for _ in range(1000):
+                total_weight += policy.weight("route", 0) or 0
+        assert abs(total_weight - 60000) / 60000 < 0.05
+
+    def test_that_fixed_rate_is_an_upper_bound(self) -> None:
+        policy = self.create_policy(target_per_second=10, rate=0.5, draw=lambda: 0)
+        assert policy.weight("route", 0) == 2
+
+    def create_policy(self, **kwargs: Any) -> SamplingPolicy:
+        kwargs.setdefault("draw", lambda: 0)
+        return SamplingPolicy(
+            throughput=ThroughputEstimator(window_secs=10, now=self.time), **kwargs
+        )
+
+
+class ParseSamplingTests(TestCase):
+    def test_that_no_sampling_is_configured_by_default(self) -> None:
+        policy = parse_sampling(None)
+        assert policy.rate == 1
+        assert not policy.route_rates
+        assert policy.always_record_slower_than_ns is None
+
+    def test_that_all_settings_are_parsed(self) -> None:
+        policy = parse_sampling(
+            dict(rate=0.1, routes=dict(health=0.01), always_record_slower_than_ms=250)
+        )
+        assert policy.rate == 0.1
+        assert policy.route_rates == dict(health=0.01)
+        assert policy.always_record_slower_than_ns == 250_000_000
+
+    def test_that_rates_outside_of_0_and_1_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            parse_sampling(dict(rate=2))
+        with self.assertRaises(ValueError):
+            parse_sampling(dict(routes=dict(health=-0.1)))
+
+    def test_that_adaptive_settings_are_parsed(self) -> None:
+        policy = parse_sampling(
+            dict(target_per_route_per_second=5, adaptive_window_secs=30)
+        )
+        assert policy.target_per_second == 5
+        assert policy.throughput.window_secs == 30
+
+    def test_that_non_positive_target_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            parse_sampling(dict(target_per_route_per_second=0))
+
+    def test_that_unknown_settings_are_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            parse_sampling(dict(ratio=0.5))
@@ -0,0 +1,105 @@
+import threading
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+from unittest import TestCase
+
+from flask_profiler.entities.measurement_archive import Measurement
+from flask_profiler.write_behind import WriteBehindQueue, WriteBehindSettings
+
+
+class FakeBatchArchivist:
+    def __init__(self) -> None:
+        self.batches: List[List[Measurement]] = []
+        self.is_closed = False
+
+    def record_measurements(self, measurements: List[Measurement]) -> None:
+        self.batches.append(list(measurements))
+
+    def close_connection(self) -> None:
+        self.is_closed = True
+
+
+class WriteBehindQueueTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.archivist = FakeBatchArchivist()
+
+    def create_queue(
+        self,
+        batch_size: int = 10,
+        max_queue_size: int = 100,
+        archivist_factory: Optional[Callable[[], FakeBatchArchivist]] = None,
+    ) -> WriteBehindQueue:
+        write_behind = WriteBehindQueue(
+            archivist_factory=archivist_factory or (lambda: self.archivist),
+            settings=WriteBehindSettings(
+                batch_size=batch_size,
+                flush_interval_secs=0.01,
+                max_queue_size=max_queue_size,
+            ),
+        )
+        self.addCleanup(write_behind.stop)
+        return write_behind
+
+    def create_measurement(self) -> Measurement:
+        timestamp = datetime(2000, 1, 1, tzinfo=timezone.utc)
+        return Measurement(
+            route_name="test route",
+            start_timestamp=timestamp,
+            elapsed_ns=0,
+            method="GET",
+        )
+
+    def test_that_nothing_is_stored_if_nothing_was_recorded(self) -> None:
+        write_behind = self.create_queue()
+        write_behind.flush()
+        assert not self.archivist.batches
+
+    def test_that_recorded_measurements_are_stored_after_flush(self) -> None:
+        write_behind = self.create_queue()
+        for _ in range(3):
+            write_behind.record_measurement(self.create_measurement())
+        write_behind.flush()
+        assert sum(map(len, self.archivist.batches)) == 3
+
+    def test_that_batches_do_not_exceed_batch_size(self) -> None:
+        write_behind = self.create_queue(batch_size=2)
+        for _ in range(5):
+            write_behind.record_measurement(self.create_measurement())
+        write_behind.flush()
+        assert all(len(batch) <= 2 for batch in self.archivist.batches)
+        assert sum(map(len, self.archivist.batches)) == 5
+
+    def test_that_pending_measurements_are_stored_when_queue_is_stopped(
+        self,
+    ) -> None:
+        write_behind = self.create_queue()
+        write_behind.record_measurement(self.create_measurement())
+        write_behind.stop()
+        assert sum(map(len, self.archivist.batches)) == 1
+
+    def test_that_archivist_connection_is_closed_when_queue_is_stopped(
+        self,
+    ) -> None:
+        write_behind = self.create_queue()
+        write_behind.record_measurement(self.create_measurement())
+        write_behind.stop()
+        assert self.archivist.is_closed
+
+    def test_that_measurements_are_dropped_when_queue_is_full(self) -> None:
+        flusher_released = threading.Event()
+
+        def blocked_archivist() -> FakeBatchArchivist:
+            flusher_released.wait()
+            return self.archivist
+
+        write_behind = self.create_queue(
+            max_queue_size=2, archivist_factory=blocked_archivist
+        )
+        self.addCleanup(flusher_released.set)
+        with self.assertLogs("flask_profiler.write_behind", level="WARNING"):
+            for _ in range(5):
+                write_behind.record_measurement(self.create_measurement())
+        flusher_released.set()
+        write_behind.flush()
+        assert sum(map(len, self.archivist.batches)) == 2
@@ -1,14 +1,33 @@
 from __future__ import annotations
 
 import itertools
+import operator
 from collections import defaultdict
 from dataclasses import dataclass, replace
-from datetime import datetime
-from typing import Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from typing_extensions import Self
 
-from flask_profiler.entities.measurement_archive import Measurement, Record, Summary
+from flask_profiler.entities.histogram import Histogram
+from flask_profiler.entities.measurement_archive import (
+    CountedItems,
+    Measurement,
+    Record,
+    RouteCatalogEntry,
+    Summary,
+)
 
 T = TypeVar("T")
 IteratorBasedDataT = TypeVar("IteratorBasedDataT", bound="IteratorBasedData")
@@ -17,8 +36,11 @@ IteratorBasedDataT = TypeVar("IteratorBasedDataT", bound="IteratorBasedData")
 class FakeMeasurementArchivist:
     def __init__(self) -> None:
         self.records: List[Record] = list()
+        self.version = 0
 
     def record_measurement(self, measurement: Measurement) -> int:
+        if measurement.changes_data_version:
+            self.version += 1
         id_ = len(self.records)
         self.records.append(
             Record(
@@ -26,7 +48,8 @@ class FakeMeasurementArchivist:
                 name=measurement.route_name,
                 method=measurement.method,
                 start_timestamp=measurement.start_timestamp,
-                end_timestamp=measurement.end_timestamp,
+                elapsed_ns=measurement.elapsed_ns,
+                weight=measurement.weight,
             )
         )
         return id_
@@ -34,21 +57,55 @@ class FakeMeasurementArchivist:
     def get_records(self) -> RecordedMeasurements:
         return RecordedMeasurements(items=lambda: iter(self.records))
 
+    def data_version(self) -> int:
+        return self.version
+
+    def get_route_catalog(self) -> List[RouteCatalogEntry]:
+        groups: Dict[Tuple[str, str], List[Record]] = defaultdict(list)
+        for record in self.records:
+            groups[record.name, record.method].append(record)
+        return [
+            RouteCatalogEntry(
+                name=name,
+                method=method,
+                first_seen=min(record.start_timestamp for record in records),
+                last_seen=max(record.start_timestamp for record in records),
+                total_count=sum(record.weight for record in records),
+                total_elapsed=sum(record.elapsed * record.weight for record in records),
+            )
+            for (name, method), records in groups.items()
+        ]
+
 
 @dataclass
 class IteratorBasedData(Generic[T]):
     items: Callable[[], Iterator[T]]
+    unpaginated: Optional[Callable[[], Iterator[T]]] = None
 
     def __iter__(self) -> Iterator[T]:
         return self.items()
 
     def limit(self: IteratorBasedDataT, n: int) -> IteratorBasedDataT:
-        return replace(self, items=lambda: itertools.islice(self.items(), 0, n))
+        return replace(
+            self,
+            items=lambda: itertools.islice(self.items(), 0, n),
+            unpaginated=self.unpaginated or self.items,
+        )
 
     def offset(self: IteratorBasedDataT, n: int) -> IteratorBasedDataT:
         return replace(
             self,
-            items=lambda: itertools.islice(self.items(), n),
+            items=lambda: itertools.islice(self.items(), n, None),
+            unpaginated=self.unpaginated or self.items,
+        )
+
+    def counted(self, cap: Optional[int] = None) -> CountedItems[T]:
+        total_count = sum(1 for _ in (self.unpaginated or self.items)())
+        is_capped = cap is not None and total_count > cap
+        return CountedItems(
+            items=list(self.items()),
+            total_count=cap if cap is not None and is_capped else total_count,
+            is_capped=is_capped,
         )
 
     def first(self) -> Optional[T]:
@@ -73,7 +130,10 @@ class RecordedMeasurements(IteratorBasedData[Record]):
 
     def with_name_containing(self, substring: str) -> RecordedMeasurements:
         return replace(
-            self, items=lambda: filter(lambda i: substring in i.name, self.items())
+            self,
+            items=lambda: filter(
+                lambda i: substring.lower() in i.name.lower(), self.items()
+            ),
         )
 
     def with_name(self, name: str) -> RecordedMeasurements:
@@ -97,13 +157,14 @@ class RecordedMeasurements(IteratorBasedData[Record]):
         )
 
     def summarize_by_interval(
-        self, timestamps: List[datetime]
+        self, since: datetime, until: datetime, interval_length: timedelta
     ) -> SummarizedMeasurements:
         return SummarizedMeasurements(
             items=lambda: iter(
                 IntervalSummaryBuilder.from_iterator(
-                    self.items(),
-                    timestamps=timestamps,
+                    self.requested_after(since).requested_before(until),
+                    since=since,
+                    interval_length=interval_length,
                 )
             ),
         )
@@ -111,12 +172,27 @@ class RecordedMeasurements(IteratorBasedData[Record]):
     def with_id(self, id_: int) -> RecordedMeasurements:
         return replace(self, items=lambda: filter(lambda i: i.id == id_, self.items()))
 
+    def preceding(self, start_timestamp: datetime, id_: int) -> RecordedMeasurements:
+        return self._relative_to((start_timestamp, id_), operator.lt)
+
+    def following(self, start_timestamp: datetime, id_: int) -> RecordedMeasurements:
+        return self._relative_to((start_timestamp, id_), operator.gt)
+
+    def _relative_to(
+        self, key: Tuple[datetime, int], compare: Callable[[Any, Any], bool]
+    ) -> RecordedMeasurements:
+        return RecordedMeasurements(
+            items=lambda: (
+                r for r in self.items() if compare((r.start_timestamp, r.id), key)
+            )
+        )
+
     def ordered_by_start_time(self, ascending: bool = True) -> RecordedMeasurements:
         return replace(
             self,
             items=lambda: sorted(
                 list(self.items()),
-                key=lambda measurement: measurement.start_timestamp,
+                key=lambda measurement: (measurement.start_timestamp, measurement.id),
                 reverse=not ascending,
             ),
         )
@@ -167,19 +243,7 @@ class SummaryBuilder:
 
     def __iter__(self) -> Iterator[Summary]:
         for key, records in self.summaries.items():
-            elapsed_times = [r.elapsed for r in records]
-            first_measurement = min(map(lambda r: r.start_timestamp, records))
-            last_measurement = max(map(lambda r: r.start_timestamp, records))
-            yield Summary(
-                name=key.name,
-                method=key.method,
-                min_elapsed=min(elapsed_times),
-                max_elapsed=max(elapsed_times),
-                avg_elapsed=sum(elapsed_times) / len(elapsed_times),
-                count=len(elapsed_times),
-                first_measurement=first_measurement,
-                last_measurement=last_measurement,
-            )
+            yield summarize_records(name=key.name, method=key.method, records=records)
 
     def record_key(self, record: Record) -> SummaryKey:
         return self.SummaryKey(
@@ -195,52 +259,57 @@ class IntervalSummaryBuilder:
         name: str
         interval_index: int
 
-    def __init__(self, timestamps: List[datetime]) -> None:
+    def __init__(self, since: datetime, interval_length: timedelta) -> None:
         self.summaries: Dict[
             IntervalSummaryBuilder.SummaryKey, List[Record]
         ] = defaultdict(list)
-        self.timestamps = timestamps
+        self.since = since
+        self.interval_length = interval_length
 
     def add_record(self, record: Record) -> None:
         self.summaries[self.record_key(record)].append(record)
 
     @classmethod
     def from_iterator(
-        cls, records: Iterator[Record], timestamps: List[datetime]
+        cls, records: Iterable[Record], since: datetime, interval_length: timedelta
     ) -> IntervalSummaryBuilder:
-        builder = cls(timestamps)
+        builder = cls(since=since, interval_length=interval_length)
         for r in records:
-            if (
-                r.start_timestamp < builder.timestamps[0]
-                or r.start_timestamp >= builder.timestamps[-1]
-            ):
-                continue
             builder.add_record(r)
         return builder
 
     def __iter__(self) -> Iterator[Summary]:
-        for key, records in self.summaries.items():
-            elapsed_times = [r.elapsed for r in records]
-            first_measurement = min(map(lambda r: r.start_timestamp, records))
-            last_measurement = max(map(lambda r: r.start_timestamp, records))
-            yield Summary(
-                name=key.name,
-                method=key.method,
-                min_elapsed=min(elapsed_times),
-                max_elapsed=max(elapsed_times),
-                avg_elapsed=sum(elapsed_times) / len(elapsed_times),
-                count=len(elapsed_times),
-                first_measurement=first_measurement,
-                last_measurement=last_measurement,
+        for key, records in sorted(
+            self.summaries.items(), key=lambda item: item[0].interval_index
+        ):
+            yield replace(
+                summarize_records(name=key.name, method=key.method, records=records),
+                interval_index=key.interval_index,
             )
 
     def record_key(self, record: Record) -> SummaryKey:
-        interval_index = 0
-        for timestamp in self.timestamps:
-            if record.start_timestamp >= timestamp:
-                interval_index += 1
+        interval_index = (record.start_timestamp - self.since) // self.interval_length
         return self.SummaryKey(
             name=record.name,
             method=record.method,
             interval_index=interval_index,
         )
+
+
+def summarize_records(name: str, method: str, records: List[Record]) -> Summary:
+    elapsed_times = [r.elapsed for r in records]
+    total_weight = sum(r.weight for r in records)
+    histogram = Histogram()
+    for record in records:
+        histogram.add(record.elapsed, count=record.weight)
+    return Summary(
+        name=name,
+        method=method,
+        min_elapsed=min(elapsed_times),
+        max_elapsed=max(elapsed_times),
+        avg_elapsed=sum(r.elapsed * r.weight for r in records) / total_weight,
+        count=round(total_weight),
+        first_measurement=min(r.start_timestamp for r in records),
+        last_measurement=max(r.start_timestamp for r in records),
+        histogram=histogram,
+    )
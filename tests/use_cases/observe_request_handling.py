@@ -1,6 +1,7 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from flask_profiler.entities.request_handler import RequestHandler
+from flask_profiler.sampling import SamplingPolicy
 from flask_profiler.use_cases.observe_request_handling_use_case import (
     ObserveRequestHandlingUseCase,
 )
@@ -13,6 +14,7 @@ from .measurement_archive import FakeMeasurementArchivist
 class ObserveRequestHandlingUseCaseFactory:
     archivist: FakeMeasurementArchivist
     clock: FakeClock
+    sampler: SamplingPolicy = field(default_factory=SamplingPolicy)
 
     def create_use_case(
         self, request_handler: RequestHandler
@@ -21,4 +23,5 @@ class ObserveRequestHandlingUseCaseFactory:
             clock=self.clock,
             archivist=self.archivist,
             request_handler=request_handler,
+            sampler=self.sampler,
         )
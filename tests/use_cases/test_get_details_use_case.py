@@ -1,3 +1,4 @@
+from dataclasses import replace
 from datetime import datetime, timezone
 
 from flask_profiler.use_cases import get_details_use_case as use_case
@@ -63,6 +64,89 @@ class UseCaseTests(TestCase):
         response = self.use_case.get_details(request)
         assert response.total_result_count == 2
 
+    def test_that_measurements_are_ordered_by_start_time(self) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 2, tzinfo=timezone.utc))
+        self.record_request()
+        self.clock.freeze_time(datetime(2000, 1, 1, tzinfo=timezone.utc))
+        self.record_request()
+        response = self.use_case.get_details(use_case.Request(limit=10, offset=0))
+        assert [m.started_at.day for m in response.measurements] == [1, 2]
+
+    def test_that_first_page_has_no_previous_cursor(self) -> None:
+        for _ in range(3):
+            self.record_request()
+        response = self.use_case.get_details(use_case.Request(limit=2, offset=0))
+        assert response.previous_cursor is None
+        assert response.next_cursor is not None
+
+    def test_that_last_page_has_no_next_cursor(self) -> None:
+        for _ in range(2):
+            self.record_request()
+        response = self.use_case.get_details(use_case.Request(limit=2, offset=0))
+        assert response.next_cursor is None
+
+    def test_that_pages_can_be_walked_forward_and_backward_with_cursors(
+        self,
+    ) -> None:
+        for day in range(1, 6):
+            self.clock.freeze_time(datetime(2000, 1, day, tzinfo=timezone.utc))
+            self.record_request()
+        first_page = self.use_case.get_details(use_case.Request(limit=2, offset=0))
+        second_page = self.use_case.get_details(
+            use_case.Request(limit=2, offset=0, after=first_page.next_cursor)
+        )
+        third_page = self.use_case.get_details(
+            use_case.Request(limit=2, offset=0, after=second_page.next_cursor)
+        )
+        assert [m.started_at.day for m in second_page.measurements] == [3, 4]
+        assert [m.started_at.day for m in third_page.measurements] == [5]
+        assert third_page.next_cursor is None
+        previous_page = self.use_case.get_details(
+            use_case.Request(limit=2, offset=0, before=third_page.previous_cursor)
+        )
+        assert [m.started_at.day for m in previous_page.measurements] == [3, 4]
+        first_page_again = self.use_case.get_details(
+            use_case.Request(limit=2, offset=0, before=previous_page.previous_cursor)
+        )
+        assert [m.started_at.day for m in first_page_again.measurements] == [1, 2]
+        assert first_page_again.previous_cursor is None
+
+    def test_that_total_result_count_is_capped_at_count_limit(self) -> None:
+        for _ in range(3):
+            self.record_request()
+        use_case_with_limit = replace(self.use_case, count_limit=2)
+        response = use_case_with_limit.get_details(use_case.Request(limit=10, offset=0))
+        assert response.total_result_count == 2
+        assert response.total_result_count_capped
+        assert len(response.measurements) == 3
+
+    def test_that_pages_reached_via_cursor_are_not_counted(self) -> None:
+        for _ in range(5):
+            self.record_request()
+        first_page = self.use_case.get_details(use_case.Request(limit=2, offset=0))
+        second_page = self.use_case.get_details(
+            use_case.Request(limit=2, offset=0, after=first_page.next_cursor)
+        )
+        assert second_page.total_result_count is None
+
+    def test_that_cursor_without_a_record_at_its_position_still_finds_a_page(
+        self,
+    ) -> None:
+        for day in range(1, 6):
+            self.clock.freeze_time(datetime(2000, 1, day, tzinfo=timezone.utc))
+            self.record_request()
+        cursor = use_case.Cursor(
+            start_timestamp=datetime(2000, 1, 2, 12, tzinfo=timezone.utc), id=0
+        )
+        next_page = self.use_case.get_details(
+            use_case.Request(limit=2, offset=0, after=cursor)
+        )
+        previous_page = self.use_case.get_details(
+            use_case.Request(limit=2, offset=0, before=cursor)
+        )
+        assert [m.started_at.day for m in next_page.measurements] == [3, 4]
+        assert [m.started_at.day for m in previous_page.measurements] == [1, 2]
+
     def record_request(self) -> None:
         request_handler = self.request_handler_factory.create_request_handler()
         observe_request_use_case = (
@@ -37,6 +37,16 @@ class GetRouteOverviewTests(TestCase):
         request = self.create_request()
         self.use_case.get_route_overview(request)
 
+    def test_that_measurements_after_the_end_time_are_not_shown(self) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 2, tzinfo=timezone.utc))
+        self.record_measurement()
+        request = self.create_request(
+            end_time=datetime(2000, 1, 1, tzinfo=timezone.utc)
+        )
+        response = self.use_case.get_route_overview(request)
+        assert not response.timeseries
+        assert response.start_time is None
+
     def test_can_specify_interval_daily(self) -> None:
         self.record_measurement()
         request = self.create_request(interval=use_case.Interval.daily)
@@ -129,12 +139,110 @@ class GetRouteOverviewTests(TestCase):
         response = self.use_case.get_route_overview(request)
         assert response.timeseries["GET"][0].value == 3.0
 
+    def test_that_measurements_in_different_hours_are_separate_datapoints_for_hourly_interval(
+        self,
+    ) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1, 10, 30, tzinfo=timezone.utc))
+        self.record_measurement(method="GET", duration=timedelta(seconds=3))
+        self.clock.freeze_time(datetime(2000, 1, 1, 11, 30, tzinfo=timezone.utc))
+        self.record_measurement(method="GET", duration=timedelta(seconds=1))
+        request = self.create_request(
+            interval=use_case.Interval.hourly,
+            end_time=datetime(2000, 1, 1, 12, tzinfo=timezone.utc),
+        )
+        response = self.use_case.get_route_overview(request)
+        assert [m.value for m in response.timeseries["GET"]] == [3.0, 1.0]
+
+    def test_that_datapoints_are_placed_at_the_start_of_their_interval(
+        self,
+    ) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1, 10, 30, tzinfo=timezone.utc))
+        self.record_measurement()
+        self.clock.freeze_time(datetime(2000, 1, 1, 11, 45, tzinfo=timezone.utc))
+        self.record_measurement()
+        request = self.create_request(
+            interval=use_case.Interval.hourly,
+            end_time=datetime(2000, 1, 1, 12, tzinfo=timezone.utc),
+        )
+        response = self.use_case.get_route_overview(request)
+        assert [m.timestamp for m in response.timeseries["GET"]] == [
+            datetime(2000, 1, 1, 10, tzinfo=timezone.utc),
+            datetime(2000, 1, 1, 11, tzinfo=timezone.utc),
+        ]
+
+    def test_that_measurements_in_the_same_minute_are_averaged_for_minutely_interval(
+        self,
+    ) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1, 10, 30, 10, tzinfo=timezone.utc))
+        self.record_measurement(method="GET", duration=timedelta(seconds=3))
+        self.clock.freeze_time(datetime(2000, 1, 1, 10, 30, 50, tzinfo=timezone.utc))
+        self.record_measurement(method="GET", duration=timedelta(seconds=1))
+        request = self.create_request(
+            interval=use_case.Interval.minutely,
+            end_time=datetime(2000, 1, 1, 11, tzinfo=timezone.utc),
+        )
+        response = self.use_case.get_route_overview(request)
+        assert [m.value for m in response.timeseries["GET"]] == [2.0]
+
+    def test_that_response_starts_at_the_beginning_of_the_week_for_weekly_interval(
+        self,
+    ) -> None:
+        # 2000-01-05 was a wednesday
+        self.clock.freeze_time(datetime(2000, 1, 5, 12, tzinfo=timezone.utc))
+        self.record_measurement()
+        request = self.create_request(interval=use_case.Interval.weekly)
+        response = self.use_case.get_route_overview(request)
+        assert response.start_time == datetime(2000, 1, 3, tzinfo=timezone.utc)
+
+    def test_that_number_of_intervals_in_response_is_capped(self) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1, tzinfo=timezone.utc))
+        for _ in range(use_case.MAX_INTERVAL_COUNT + 10):
+            self.record_measurement()
+            self.clock.advance_clock(timedelta(minutes=1))
+        request = self.create_request(
+            interval=use_case.Interval.minutely, end_time=self.clock.utc_now()
+        )
+        response = self.use_case.get_route_overview(request)
+        assert response.start_time and response.end_time
+        assert (
+            response.end_time - response.start_time
+            <= timedelta(minutes=1) * use_case.MAX_INTERVAL_COUNT
+        )
+        assert len(response.timeseries["GET"]) <= use_case.MAX_INTERVAL_COUNT
+
+    def test_that_capped_intervals_end_with_the_latest_measurement(self) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1, 10, 30, tzinfo=timezone.utc))
+        self.record_measurement()
+        request = self.create_request(
+            interval=use_case.Interval.hourly,
+            start_time=datetime(1990, 1, 1, tzinfo=timezone.utc),
+        )
+        response = self.use_case.get_route_overview(request)
+        assert response.end_time == datetime(2000, 1, 1, 11, tzinfo=timezone.utc)
+        assert len(response.timeseries["GET"]) == 1
+
+    def test_that_percentile_is_reported_if_requested(self) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1, tzinfo=timezone.utc))
+        for _ in range(9):
+            self.record_measurement(duration=timedelta(seconds=1))
+        self.record_measurement(duration=timedelta(seconds=10))
+        request = self.create_request(
+            start_time=datetime(2000, 1, 1, tzinfo=timezone.utc),
+            end_time=datetime(2000, 1, 2, tzinfo=timezone.utc),
+            statistic=use_case.Statistic.p99,
+        )
+        response = self.use_case.get_route_overview(request)
+        value = response.timeseries["GET"][0].value
+        assert value is not None
+        assert abs(value - 10) / 10 < 0.05
+
     def create_request(
         self,
         name: str = "test route",
         interval: Optional[use_case.Interval] = None,
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
+        statistic: use_case.Statistic = use_case.Statistic.average,
     ) -> use_case.Request:
         if start_time is not None and start_time.tzinfo is None:
             start_time = start_time.astimezone(timezone.utc)
@@ -149,6 +257,7 @@ class GetRouteOverviewTests(TestCase):
             interval=interval,
             start_time=start_time,
             end_time=end_time,
+            statistic=statistic,
         )
 
     def record_measurement(
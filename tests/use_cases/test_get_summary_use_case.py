@@ -1,6 +1,9 @@
+from dataclasses import replace
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
+from flask_profiler.result_cache import ResultCache, ResultCacheSettings
+from flask_profiler.sampling import SamplingPolicy
 from flask_profiler.use_cases import get_summary_use_case as use_case
 from flask_profiler.use_cases import observe_request_handling_use_case as observe
 
@@ -35,6 +38,47 @@ class UseCaseTests(TestCase):
         response = self.use_case.get_summary(self.get_uc_request())
         assert response.total_results == 1
 
+    def test_that_total_results_are_capped_at_count_limit(self) -> None:
+        self.record_request(route_name="a")
+        self.record_request(route_name="b")
+        use_case_with_limit = replace(self.use_case, count_limit=1)
+        response = use_case_with_limit.get_summary(self.get_uc_request())
+        assert response.total_results == 1
+        assert response.total_results_capped
+
+    def test_that_name_filter_ignores_letter_case(self) -> None:
+        self.record_request(route_name="Checkout")
+        self.record_request(route_name="health")
+        response = self.use_case.get_summary(
+            replace(self.get_uc_request(), name_filter="cHECK")
+        )
+        assert [m.name for m in response.measurements] == ["Checkout"]
+
+    def test_that_cached_response_is_reused_after_new_measurement_within_ttl(
+        self,
+    ) -> None:
+        use_case_with_cache = replace(
+            self.use_case,
+            cache=ResultCache(ResultCacheSettings(ttl_secs=10), clock=self.clock),
+        )
+        self.record_request(route_name="a")
+        first_response = use_case_with_cache.get_summary(self.get_uc_request())
+        # Like a visit of the summary page that is itself profiled.
+        self.record_request(route_name="summary")
+        assert use_case_with_cache.get_summary(self.get_uc_request()) is first_response
+        self.clock.advance_clock(timedelta(seconds=10))
+        response = use_case_with_cache.get_summary(self.get_uc_request())
+        assert response.total_results == 2
+
+    def test_that_request_count_is_weighted_by_sampling_rate(self) -> None:
+        self.observe_request_use_case_factory.sampler = SamplingPolicy(
+            rate=0.25, draw=lambda: 0
+        )
+        self.record_request()
+        self.record_request()
+        response = self.use_case.get_summary(self.get_uc_request())
+        assert response.measurements[0].request_count == 8
+
     def test_can_exclude_records_from_summary_via_requested_before(self) -> None:
         self.clock.freeze_time(datetime(2000, 1, 2))
         self.record_request()
@@ -127,6 +171,19 @@ class UseCaseTests(TestCase):
             )
         )
 
+    def test_that_tail_percentile_reflects_slow_requests(self) -> None:
+        self.clock.freeze_time(datetime(2000, 1, 1))
+        for _ in range(98):
+            self.record_request(duration=timedelta(milliseconds=10))
+        for _ in range(2):
+            self.record_request(duration=timedelta(seconds=2))
+        response = self.use_case.get_summary(self.get_uc_request())
+        (measurement,) = response.measurements
+        assert measurement.p50_response_time_secs is not None
+        assert measurement.p99_response_time_secs is not None
+        assert measurement.p50_response_time_secs < 0.011
+        assert measurement.p99_response_time_secs > 1.9
+
     def get_uc_request(
         self,
         requested_before: Optional[datetime] = None,
@@ -137,6 +194,6 @@ class UseCaseTests(TestCase):
             sorting_field=sorting_field,
             sorting_order=sorting_order,
             limit=10,
-            offset=10,
+            offset=0,
             requested_before=requested_before,
         )
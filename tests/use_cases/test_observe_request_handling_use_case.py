@@ -1,6 +1,10 @@
-from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
 
+from flask_profiler.sampling import SamplingPolicy
 from flask_profiler.use_cases import observe_request_handling_use_case as use_case
+from tests.clock import FakeClock
 
 from .base_test_case import TestCase
 
@@ -33,6 +37,43 @@ class ObserveRequestHandlingUseCaseTests(TestCase):
         assert latest_handler_call
         assert latest_handler_call.kwargs == expected_kwargs
 
+    def test_that_requests_outside_of_the_sample_are_not_recorded(self) -> None:
+        self.use_case.sampler = SamplingPolicy(rate=0.5, draw=lambda: 0.9)
+        self.use_case.record_measurement(self.create_request())
+        assert not self.injector.get_measurement_archivist().records
+
+    def test_that_sampled_requests_are_recorded_with_their_weight(self) -> None:
+        self.use_case.sampler = SamplingPolicy(rate=0.5, draw=lambda: 0.1)
+        self.use_case.record_measurement(self.create_request())
+        (record,) = self.injector.get_measurement_archivist().records
+        assert record.weight == 2
+
+    def test_that_elapsed_time_is_taken_from_the_monotonic_clock(self) -> None:
+        clock = self.injector.get_clock()
+        clock.freeze_time(datetime(2000, 1, 1, tzinfo=timezone.utc))
+        use_case = self.use_case_factory.create_use_case(
+            request_handler=self.request_handler_factory.create_request_handler(
+                duration=timedelta(milliseconds=1500)
+            )
+        )
+        use_case.record_measurement(self.create_request())
+        (record,) = self.injector.get_measurement_archivist().records
+        assert record.elapsed_ns == 1_500_000_000
+        assert record.start_timestamp == datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+    def test_that_wall_clock_changes_do_not_affect_elapsed_time(self) -> None:
+        clock = self.injector.get_clock()
+        clock.freeze_time(datetime(2000, 1, 1, tzinfo=timezone.utc))
+        request_handler = WallClockResettingHandler(
+            clock=clock, reset_to=datetime(1999, 1, 1, tzinfo=timezone.utc)
+        )
+        use_case = self.use_case_factory.create_use_case(
+            request_handler=request_handler
+        )
+        use_case.record_measurement(self.create_request())
+        (record,) = self.injector.get_measurement_archivist().records
+        assert record.elapsed_ns == 0
+
     def create_request(
         self, args: Optional[Tuple] = None, kwargs: Optional[Dict] = None
     ) -> use_case.Request:
@@ -41,3 +82,15 @@ class ObserveRequestHandlingUseCaseTests(TestCase):
             request_kwargs=kwargs or dict(),
             method="",
         )
+
+
+@dataclass
+class WallClockResettingHandler:
+    clock: FakeClock
+    reset_to: datetime
+
+    def handle_request(self, args: Any, kwargs: Any) -> None:
+        self.clock.freeze_time(self.reset_to)
+
+    def name(self) -> str:
+        return "wall clock resetting handler"